@@ -0,0 +1,6 @@
+"""Performance benchmarks for the SafeDrive detection loop.
+
+Run from the project root::
+
+    python -m benchmarks.pipeline --frames 300
+"""
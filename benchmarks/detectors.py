@@ -0,0 +1,202 @@
+"""Micro-benchmarks of the per-frame detectors, before and after.
+
+Times each detector on one face / one hand shaped like the
+``fake_landmarks`` / ``fake_hand_landmarks`` fixtures of
+``tests/conftest.py`` (478 and 21 landmarks), in two flavours:
+
+* ``landmarks`` — the MediaPipe-object functions (``detect_eyes_closed``...);
+* ``array`` — the ``*_array`` functions the live loop, the recorder and
+  the replays use on the ``(478, 3)`` / ``(21, 3)`` arrays.
+
+Each flavour is timed against the pre-optimisation implementation kept in
+:mod:`benchmarks.reference_detectors` (``before``) and the current one
+(``after``).  The report gives the best per-call time over ``--repeat``
+runs, the speedup and the bytes allocated per call, then the cost of one
+:meth:`DriverState.update` (the per-frame state machine that offline
+replays run millions of times).
+
+On a single frame the object functions stay slightly cheaper than the
+array ones (a Python attribute read costs less than ``ndarray.item``),
+but the live loop holds arrays, not MediaPipe objects: the ``array``
+speedup is the one it sees.
+
+Usage::
+
+    python -m benchmarks.detectors
+    python -m benchmarks.detectors --number 20000 --repeat 7
+"""
+
+import argparse
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from safedrive.config import DetectionConfig
+from safedrive.constants import (
+    CHIN, FOREHEAD, LEFT_EAR, LEFT_EYE_BOTTOM, LEFT_EYE_TOP, LEFT_TEMPLE,
+    MOUTH_INNER_BOTTOM, MOUTH_INNER_TOP, MOUTH_LEFT, MOUTH_RIGHT, NOSE_TIP,
+    RIGHT_EAR, RIGHT_EYE_BOTTOM, RIGHT_EYE_TOP, RIGHT_TEMPLE,
+)
+from safedrive.detectors.eye_detector import detect_eyes_closed, detect_eyes_closed_array
+from safedrive.detectors.head_detector import HeadState, check_head_position, check_head_position_array
+from safedrive.detectors.mouth_detector import detect_yawning, detect_yawning_array
+from safedrive.detectors.phone_detector import detect_phone_usage, detect_phone_usage_array
+from safedrive.landmarks import face_to_array, landmarks_to_array
+from safedrive.session import DriverState, extract_features
+from tests.conftest import make_landmark
+from benchmarks import reference_detectors as ref
+
+IMAGE_HEIGHT, IMAGE_WIDTH = 480, 640
+FLAVOURS = ("landmarks", "array")
+VERSIONS = ("before", "after")
+
+
+def fake_inputs():
+    """Return ``(face_landmarks, hand_landmarks, face_array, hand_array)``.
+
+    Same shapes as the conftest fixtures, with an open-eyed, forward-facing
+    face and a phone-holding hand so every branch is exercised.
+    """
+    face = [make_landmark(0.5, 0.5) for _ in range(478)]
+    for idx, (x, y) in {
+        LEFT_EYE_TOP: (0.45, 0.40), LEFT_EYE_BOTTOM: (0.45, 0.43),
+        RIGHT_EYE_TOP: (0.55, 0.40), RIGHT_EYE_BOTTOM: (0.55, 0.43),
+        MOUTH_INNER_TOP: (0.5, 0.60), MOUTH_INNER_BOTTOM: (0.5, 0.62),
+        MOUTH_LEFT: (0.45, 0.61), MOUTH_RIGHT: (0.55, 0.61),
+        NOSE_TIP: (0.5, 0.5), FOREHEAD: (0.5, 0.3), CHIN: (0.5, 0.7),
+        LEFT_EAR: (0.6, 0.5), RIGHT_EAR: (0.4, 0.5),
+        LEFT_TEMPLE: (0.58, 0.4), RIGHT_TEMPLE: (0.42, 0.4),
+    }.items():
+        face[idx] = make_landmark(x, y)
+    hand = SimpleNamespace(landmark=[make_landmark(0.5 + 0.01 * i, 0.5) for i in range(21)])
+    return face, hand, face_to_array(face), landmarks_to_array(hand.landmark)
+
+
+def cases(det=None) -> Dict[str, Dict[str, Dict[str, Callable[[], object]]]]:
+    """Return ``{detector: {flavour: {"before" | "after": zero-argument callable}}}``."""
+    det = det or DetectionConfig()
+    face, hand, face_arr, hand_arr = fake_inputs()
+    eye_t, mar_t, open_t = det.eye_closed_threshold, det.mouth_aspect_ratio_threshold, det.mouth_open_threshold
+    rot_t, tilt_t = det.head_rotation_threshold, det.head_tilt_threshold
+    head_out = HeadState()
+
+    return {
+        "eyes": {
+            # The object version was not rewritten: before == after.
+            "landmarks": {"before": lambda: detect_eyes_closed(face, eye_t),
+                          "after": lambda: detect_eyes_closed(face, eye_t)},
+            "array": {"before": lambda: ref.detect_eyes_closed_array(face_arr, eye_t),
+                      "after": lambda: detect_eyes_closed_array(face_arr, eye_t)},
+        },
+        "mouth": {
+            "landmarks": {"before": lambda: detect_yawning(face, mar_t, open_t),
+                          "after": lambda: detect_yawning(face, mar_t, open_t)},
+            "array": {"before": lambda: ref.detect_yawning_array(face_arr, mar_t, open_t),
+                      "after": lambda: detect_yawning_array(face_arr, mar_t, open_t)},
+        },
+        "head": {
+            "landmarks": {"before": lambda: ref.check_head_position(face, rot_t, tilt_t),
+                          "after": lambda: check_head_position(face, rot_t, tilt_t, out=head_out)},
+            "array": {"before": lambda: ref.check_head_position_array(face_arr, rot_t, tilt_t),
+                      "after": lambda: check_head_position_array(face_arr, rot_t, tilt_t, out=head_out)},
+        },
+        "phone": {
+            "landmarks": {"before": lambda: ref.detect_phone_usage(hand, IMAGE_HEIGHT, IMAGE_WIDTH),
+                          "after": lambda: detect_phone_usage(hand, IMAGE_HEIGHT, IMAGE_WIDTH)},
+            "array": {"before": lambda: ref.detect_phone_usage_array(hand_arr, IMAGE_HEIGHT, IMAGE_WIDTH),
+                      "after": lambda: detect_phone_usage_array(hand_arr, IMAGE_HEIGHT, IMAGE_WIDTH)},
+        },
+    }
+
+
+def allocated_bytes(fn: Callable[[], object], calls: int = 100) -> float:
+    """Average bytes allocated per call (traced peak, results included)."""
+    fn()  # warm caches / lazy imports outside the trace
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in range(calls):
+            fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return max(peak - base, 0) / calls
+
+
+def run(number: int = 10000, repeat: int = 5, det=None) -> Dict[str, Dict[str, Dict[str, Dict[str, float]]]]:
+    """Benchmark every case.
+
+    Returns ``{detector: {flavour: {"before" | "after": {"us": best µs per
+    call, "bytes": bytes per call}}}}``.
+    """
+    results = {}
+    for name, flavours in cases(det).items():
+        results[name] = {}
+        for flavour, versions in flavours.items():
+            results[name][flavour] = {}
+            for version, fn in versions.items():
+                best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+                results[name][flavour][version] = {"us": best * 1e6, "bytes": allocated_bytes(fn)}
+    return results
+
+
+def speedup(row: Dict[str, Dict[str, float]]) -> float:
+    """``before / after`` time of one ``{"before": ..., "after": ...}`` result."""
+    return row["before"]["us"] / row["after"]["us"] if row["after"]["us"] > 0 else float("nan")
+
+
+def run_session(number: int = 10000, repeat: int = 5, det=None) -> Dict[str, float]:
+    """Time :meth:`DriverState.update` on a precomputed frame.
+
+    Returns ``{"us": best µs per update, "frames_per_s": ..., "bytes": bytes per update}``.
+    """
+    det = det or DetectionConfig()
+    _, _, face_arr, hand_arr = fake_inputs()
+    features = extract_features(face_arr, [hand_arr], IMAGE_HEIGHT, IMAGE_WIDTH, det)
+    state = DriverState(det)
+    clock = iter(range(1 << 62))  # strictly increasing timestamps
+
+    def update():
+        return state.update(features, next(clock) / 30.0)
+
+    best = min(timeit.repeat(update, number=number, repeat=repeat)) / number
+    return {"us": best * 1e6, "frames_per_s": 1.0 / best if best > 0 else float("inf"),
+            "bytes": allocated_bytes(update)}
+
+
+def format_report(results) -> str:
+    """One row per detector: µs per call before / after, speedup, bytes per call after."""
+    header = f"{'detector':<8}"
+    for flavour in FLAVOURS:
+        header += f" {flavour + ' before us':>19} {'after us':>9} {'speedup':>8} {'B/call':>7}"
+    lines = [header]
+    for name, row in results.items():
+        line = f"{name:<8}"
+        for flavour in FLAVOURS:
+            r = row[flavour]
+            line += (f" {r['before']['us']:>19.2f} {r['after']['us']:>9.2f}"
+                     f" {speedup(r):>7.1f}x {r['after']['bytes']:>7.0f}")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="SafeDrive detector micro-benchmarks")
+    parser.add_argument("--number", type=int, default=10000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (best is kept)")
+    args = parser.parse_args(argv)
+    print(f"numpy {np.__version__}, {args.number} calls x {args.repeat} runs")
+    print(format_report(run(args.number, args.repeat)))
+    session = run_session(args.number, args.repeat)
+    print(f"DriverState.update: {session['us']:.2f} us ({session['frames_per_s']:,.0f} frames/s), "
+          f"{session['bytes']:.0f} B/call")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""End-to-end benchmark of the per-frame detection stages.
+
+Replays a recorded clip (video file or image directory) — or synthetic
+frames when no clip is given — through the same stages as ``main.py``:
+``cvtColor``, FaceMesh, Hands, landmark conversion, the four detectors,
+the driver state / ``determine_alert_level`` and HUD drawing.  Everything
+runs sequentially on one thread, headless, so each stage is timed in
+isolation.
+
+Reports per-stage p50/mean/p95 time, FPS and memory (peak RSS), and compares
+them with a stored baseline: a stage whose p50 is slower than the baseline
+by more than ``--tolerance`` (relative, default 25%) *and* by more than
+``--min-delta-ms`` (absolute, default 0.01 ms) fails the run (exit code
+1).  The absolute floor keeps scheduler noise on the micro-second detector
+stages from failing the check, while still catching a detector that falls
+back to the old array code (~0.02 ms instead of ~0.003 ms).
+
+Baselines store absolute timings, so they are only meaningful on the
+machine (and load) they were recorded on: the files in ``baselines/`` are
+a reference x86-64 run, and CI or a developer box should record its own
+with ``--update-baseline`` before comparing.  Repeated runs on a shared
+machine vary by up to 2x; use ``--frames 1000`` or more for a baseline.
+
+Usage::
+
+    python -m benchmarks.pipeline --input clip.mp4
+    python -m benchmarks.pipeline --synthetic-landmarks --frames 500
+    python -m benchmarks.pipeline --input clip.mp4 --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from safedrive.config import load_config
+from safedrive.detectors.eye_detector import detect_eyes_closed_array
+from safedrive.detectors.head_detector import check_head_position_array
+from safedrive.detectors.mouth_detector import detect_yawning_array
+from safedrive.detectors.phone_detector import detect_phone_usage_array
+from safedrive.landmarks import FACE_LANDMARKS, HAND_LANDMARKS, face_to_array, hands_to_arrays
+from safedrive.session import DriverState, FrameFeatures
+from safedrive.sources import open_source
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+#: Stages in execution order.
+STAGES = (
+    "read", "cvtColor", "face_mesh", "hands", "landmarks",
+    "eyes", "mouth", "head", "phone", "alert_level", "render",
+)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (``None`` if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+class SyntheticSource:
+    """Deterministic 640x480 frames at *fps*, no camera or file needed.
+
+    Like ``cv2.VideoCapture.read``, ``read(image=buf)`` fills *buf* in
+    place when its shape matches.
+    """
+
+    live = False
+
+    def __init__(self, frames: int, width: int = 640, height: int = 480, fps: float = 30.0):
+        self._frames = frames
+        self._fps = fps
+        self._i = -1
+        base = np.linspace(0, 255, width, dtype=np.float32)
+        self._image = np.repeat(np.tile(base, (height, 1))[..., None], 3, axis=2).astype(np.uint8)
+        self._width = width
+
+    def isOpened(self) -> bool:
+        return True
+
+    def read(self, image=None):
+        if self._i + 1 >= self._frames:
+            return False, None
+        self._i += 1
+        if image is None or image.shape != self._image.shape:
+            image = np.empty_like(self._image)
+        # np.roll without its temporary: frame i is the base shifted right by i
+        shift = self._i % self._width
+        image[:, shift:] = self._image[:, :self._width - shift]
+        image[:, :shift] = self._image[:, self._width - shift:]
+        return True, image
+
+    def timestamp(self) -> float:
+        return self._i / self._fps
+
+    def release(self) -> None:
+        pass
+
+
+class SyntheticLandmarks:
+    """Stand-in for FaceMesh / Hands: jittered landmark arrays.
+
+    Used with ``--synthetic-landmarks`` to benchmark everything except the
+    MediaPipe graphs (e.g. on machines without the MediaPipe models); the
+    ``landmarks`` conversion stage is then skipped.
+    """
+
+    def __init__(self, seed: int = 0):
+        self._rng = np.random.default_rng(seed)
+        self._face = self._rng.uniform(0.35, 0.65, (FACE_LANDMARKS, 3)).astype(np.float32)
+        self._hand = self._rng.uniform(0.45, 0.55, (HAND_LANDMARKS, 3)).astype(np.float32)
+
+    def face(self) -> np.ndarray:
+        return self._face + self._rng.normal(0, 0.002, self._face.shape).astype(np.float32)
+
+    def hands(self) -> List[np.ndarray]:
+        return [self._hand + self._rng.normal(0, 0.002, self._hand.shape).astype(np.float32)]
+
+
+def run(source, cfg, frames: int = 0, synthetic: bool = False, warmup: int = 10) -> Dict[str, object]:
+    """Benchmark up to *frames* frames of *source* (``0`` = all).
+
+    The first *warmup* frames (lazy initialisation, cold caches) are
+    processed but left out of the statistics.
+
+    Returns ``{"frames", "fps", "peak_rss_mb", "stages": {name: {p50_ms, mean_ms, p95_ms}}}``.
+    """
+    from main import render  # the live loop's HUD stage
+
+    det = cfg.detection
+    levels = cfg.alert.levels
+    if synthetic:
+        fake = SyntheticLandmarks()
+        face_mesh = hands_model = None
+    else:
+        from safedrive.inference import create_face_mesh, create_hands
+
+        face_mesh, hands_model = create_face_mesh(), create_hands()
+    state = DriverState(det)
+    times: Dict[str, List[float]] = {name: [] for name in STAGES}
+    clock = time.perf_counter
+
+    def timed(stage, fn, *args):
+        t0 = clock()
+        out = fn(*args)
+        times[stage].append(clock() - t0)
+        return out
+
+    n = 0
+    image = rgb = None  # reused like main.py's frame pool (one frame in flight here)
+    wall0 = clock()
+    try:
+        while not frames or n < frames:
+            ok, image = timed("read", source.read, image)
+            if not ok:
+                break
+            h, w = image.shape[:2]
+            rgb = timed("cvtColor", cv2.cvtColor, image, cv2.COLOR_BGR2RGB, rgb)
+            if synthetic:
+                face = timed("face_mesh", fake.face)
+                hands = timed("hands", fake.hands)
+                hand_protos = []
+            else:
+                face_res = timed("face_mesh", face_mesh.process, rgb)
+                hand_res = timed("hands", hands_model.process, rgb)
+                t0 = clock()
+                face = None
+                if face_res.multi_face_landmarks:
+                    face = face_to_array(face_res.multi_face_landmarks[0].landmark)
+                hand_protos = list(hand_res.multi_hand_landmarks or [])
+                hands = hands_to_arrays(hand_protos)
+                times["landmarks"].append(clock() - t0)
+
+            if face is not None:
+                eyes = timed("eyes", detect_eyes_closed_array, face, det.eye_closed_threshold)
+                yawn = timed("mouth", detect_yawning_array, face,
+                             det.mouth_aspect_ratio_threshold, det.mouth_open_threshold)
+                head = timed("head", check_head_position_array, face,
+                             det.head_rotation_threshold, det.head_tilt_threshold)
+            t0 = clock()
+            flags = [detect_phone_usage_array(hand, h, w) for hand in hands]
+            times["phone"].append(clock() - t0)
+
+            features = FrameFeatures(phone=any(flags)) if face is None else FrameFeatures(True, eyes, yawn, head, any(flags))
+            level = timed("alert_level", state.update, features, source.timestamp())
+
+            result = {"face": features.face, "phone_detected": features.phone,
+                      "phone_hands": [hl for hl, flag in zip(hand_protos, flags) if flag],
+                      "phone_time": state.phone_time}
+            if features.face:
+                result.update(
+                    level=level, color=tuple(levels[level]["color"]),
+                    eyes_closed=features.eyes_closed, elapsed=state.eyes_closed_time,
+                    is_yawning=features.is_yawning, head_state=features.head_state,
+                    yawn_count=state.yawn_count, consecutive_yawns=state.consecutive_yawns,
+                )
+            timed("render", render, image, result, det)
+            n += 1
+            if n == warmup:
+                for samples in times.values():
+                    samples.clear()
+                wall0 = clock()
+    finally:
+        source.release()
+        for model in (face_mesh, hands_model):
+            if model is not None:
+                model.close()
+    wall = clock() - wall0
+    measured = n - warmup if n > warmup else n
+
+    stages = {}
+    for name in STAGES:
+        if times[name]:
+            ms = np.asarray(times[name]) * 1000.0
+            stages[name] = {
+                "p50_ms": float(np.percentile(ms, 50)),
+                "mean_ms": float(ms.mean()),
+                "p95_ms": float(np.percentile(ms, 95)),
+            }
+    return {
+        "frames": measured,
+        "fps": measured / wall if wall > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+
+def compare(results: Dict[str, object], baseline: Dict[str, object], tolerance: float = 0.25,
+            min_delta_ms: float = 0.01) -> List[str]:
+    """Return human-readable regressions of *results* against *baseline*.
+
+    A stage regresses when its median time exceeds the baseline by more than
+    *tolerance* (relative) and *min_delta_ms* (absolute, to ignore noise on
+    micro-second stages); FPS and peak RSS use the same relative tolerance.
+    """
+    failures = []
+    for name, base in baseline.get("stages", {}).items():
+        cur = results["stages"].get(name)
+        if cur is None:
+            continue
+        limit = base["p50_ms"] * (1.0 + tolerance)
+        if cur["p50_ms"] > limit and cur["p50_ms"] - base["p50_ms"] > min_delta_ms:
+            failures.append(f"{name}: {cur['p50_ms']:.3f} ms > {base['p50_ms']:.3f} ms (+{tolerance:.0%})")
+    if baseline.get("fps") and results["fps"] < baseline["fps"] / (1.0 + tolerance):
+        failures.append(f"fps: {results['fps']:.1f} < {baseline['fps']:.1f} (-{tolerance:.0%})")
+    base_rss, cur_rss = baseline.get("peak_rss_mb"), results.get("peak_rss_mb")
+    if base_rss and cur_rss and cur_rss > base_rss * (1.0 + tolerance):
+        failures.append(f"peak_rss: {cur_rss:.0f} MiB > {base_rss:.0f} MiB (+{tolerance:.0%})")
+    return failures
+
+
+def format_report(results: Dict[str, object]) -> str:
+    lines = [f"{'stage':<12} {'p50 ms':>9} {'mean ms':>9} {'p95 ms':>9}"]
+    for name, s in results["stages"].items():
+        lines.append(f"{name:<12} {s['p50_ms']:>9.3f} {s['mean_ms']:>9.3f} {s['p95_ms']:>9.3f}")
+    rss = results["peak_rss_mb"]
+    lines.append(f"{results['frames']} frames, {results['fps']:.1f} FPS, "
+                 f"peak RSS {'n/a' if rss is None else f'{rss:.0f} MiB'}")
+    return "\n".join(lines)
+
+
+def default_baseline_path(synthetic: bool) -> str:
+    kind = "synthetic" if synthetic else "mediapipe"
+    return os.path.join(BASELINE_DIR, f"pipeline_{kind}_{platform.machine() or 'unknown'}.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SafeDrive end-to-end stage benchmark")
+    parser.add_argument("--input", default=None, help="Video file or image directory (default: synthetic frames)")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate for image directories")
+    parser.add_argument("--frames", type=int, default=300, help="Frames to process (0 = whole clip)")
+    parser.add_argument("--config", default=None, help="Path to config.yaml")
+    parser.add_argument("--synthetic-landmarks", action="store_true",
+                        help="Skip the MediaPipe graphs and feed jittered landmarks")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON (default: benchmarks/baselines/...)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=0.01,
+                        help="Stage slowdowns below this many ms are ignored")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    cfg = load_config(args.config)
+    if args.input:
+        source = open_source(args.input, fps=args.fps)
+        if not source.isOpened():
+            print(f"Cannot open input: {args.input}", file=sys.stderr)
+            return 2
+    else:
+        source = SyntheticSource(args.frames or 300, fps=args.fps)
+
+    results = run(source, cfg, args.frames, synthetic=args.synthetic_landmarks)
+    results["input"] = args.input or "synthetic"
+    print(format_report(results))
+
+    path = args.baseline or default_baseline_path(args.synthetic_landmarks)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Baseline written: {path}")
+        return 0
+    if not os.path.exists(path):
+        print(f"No baseline at {path} (run with --update-baseline to create it)")
+        return 0
+    with open(path, "r", encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    failures = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if failures:
+        print("REGRESSIONS vs " + path)
+        for line in failures:
+            print("  " + line)
+        return 1
+    print(f"OK vs baseline {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
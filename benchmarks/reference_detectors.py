@@ -0,0 +1,109 @@
+"""Single-frame detectors as they were before the plain-float fast paths.
+
+Kept verbatim as the "before" side of :mod:`benchmarks.detectors`: the
+object versions built per-call dicts / ``np.array`` points, and the
+``*_array`` versions ran the vectorised batch helpers on one frame.
+``detect_eyes_closed`` and ``detect_yawning`` were not rewritten and are
+not copied here.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from safedrive.constants import CHIN, FOREHEAD, LEFT_EAR, LEFT_TEMPLE, NOSE_TIP, RIGHT_EAR, RIGHT_TEMPLE
+from safedrive.detectors.eye_detector import eye_openings_array
+from safedrive.detectors.head_detector import head_pose_array
+from safedrive.detectors.mouth_detector import mouth_opening_array
+from safedrive.detectors.phone_detector import fingertip_distances_array
+
+
+def detect_eyes_closed_array(face: np.ndarray, threshold: float) -> bool:
+    left, right = eye_openings_array(face)
+    return bool(left < threshold and right < threshold)
+
+
+def detect_yawning_array(face: np.ndarray, mar_threshold: float, open_threshold: float) -> bool:
+    mar, height = mouth_opening_array(face)
+    return bool(mar > mar_threshold and height > open_threshold)
+
+
+def check_head_position(landmarks, rotation_threshold: float, tilt_threshold: float) -> Dict[str, object]:
+    nose = landmarks[NOSE_TIP]
+    left_ear = landmarks[LEFT_EAR]
+    right_ear = landmarks[RIGHT_EAR]
+    forehead = landmarks[FOREHEAD]
+    chin = landmarks[CHIN]
+    left_temple = landmarks[LEFT_TEMPLE]
+    right_temple = landmarks[RIGHT_TEMPLE]
+
+    # Horizontal rotation
+    ear_diff = abs(left_ear.x - right_ear.x)
+    temple_diff = abs(left_temple.x - right_temple.x)
+    rotation = (ear_diff + temple_diff) / 2
+
+    # Vertical tilt
+    vertical_angle = abs(forehead.y - chin.y)
+
+    head_state: Dict[str, object] = {
+        "turned": False,
+        "tilted": False,
+        "direction_h": None,
+        "direction_v": None,
+    }
+
+    if rotation > rotation_threshold:
+        head_state["turned"] = True
+        head_state["direction_h"] = "gauche" if left_ear.x > right_ear.x else "droite"
+
+    if vertical_angle > tilt_threshold:
+        head_state["tilted"] = True
+        head_state["direction_v"] = "bas" if nose.y > (forehead.y + chin.y) / 2 else "haut"
+
+    return head_state
+
+
+def check_head_position_array(face: np.ndarray, rotation_threshold: float, tilt_threshold: float) -> Dict[str, object]:
+    rotation, vertical_angle, ear_dx, nose_offset = head_pose_array(face)
+    turned = bool(rotation > rotation_threshold)
+    tilted = bool(vertical_angle > tilt_threshold)
+    return {
+        "turned": turned,
+        "tilted": tilted,
+        "direction_h": ("gauche" if ear_dx > 0 else "droite") if turned else None,
+        "direction_v": ("bas" if nose_offset > 0 else "haut") if tilted else None,
+    }
+
+
+def detect_phone_usage(hand_landmarks, image_height: int, image_width: int) -> bool:
+    if not hand_landmarks:
+        return False
+
+    lm = hand_landmarks.landmark
+    thumb = np.array([lm[4].x * image_width, lm[4].y * image_height])
+    index = np.array([lm[8].x * image_width, lm[8].y * image_height])
+    middle = np.array([lm[12].x * image_width, lm[12].y * image_height])
+    ring = np.array([lm[16].x * image_width, lm[16].y * image_height])
+    pinky = np.array([lm[20].x * image_width, lm[20].y * image_height])
+
+    distances = [
+        np.linalg.norm(thumb - index),
+        np.linalg.norm(index - middle),
+        np.linalg.norm(middle - ring),
+        np.linalg.norm(ring - pinky),
+    ]
+
+    avg_distance = np.mean(distances)
+    max_distance = np.max(distances)
+
+    fingers_close = avg_distance < image_width * 0.15
+    fingers_aligned = max_distance < image_width * 0.25
+
+    return bool(fingers_close and fingers_aligned)
+
+
+def detect_phone_usage_array(hand, image_height: int, image_width: int) -> bool:
+    if hand is None:
+        return False
+    distances = fingertip_distances_array(hand, image_height, image_width)
+    return bool(distances.mean() < image_width * 0.15 and distances.max() < image_width * 0.25)
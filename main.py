@@ -1,12 +1,14 @@
 """SafeDrive — drowsiness and distraction detector.
 
-This is the slim entry-point (~80 lines).  All logic lives in the
-``safedrive`` package.
+Entry point of the live / replay loop: it wires the capture, inference
+and render stages together; detection logic lives in the ``safedrive``
+package.
 """
 
 import argparse
 import logging
 import time
+from collections import Counter
 
 import cv2
 import mediapipe as mp
@@ -15,150 +17,269 @@ from safedrive.config import load_config
 from safedrive.logger import setup_logging
 from safedrive.alert_system import AlertSystem
 from safedrive import display
-from safedrive.detectors.eye_detector import detect_eyes_closed
-from safedrive.detectors.mouth_detector import detect_yawning
-from safedrive.detectors.head_detector import check_head_position
-from safedrive.detectors.phone_detector import detect_phone_usage
+from safedrive.inference import ConcurrentLandmarker, HandScheduler, create_face_mesh, create_hands
+from safedrive.roi import DownscaledSolution, RoiFaceMesh
+from safedrive.pipeline import EOS, CaptureThread, DropQueue, FramePool, LatencyStats, StageWorker, release_frame
+from safedrive.session import DriverState, extract_features
+from safedrive.sources import open_source
+from safedrive.landmarks import face_to_array, hands_to_arrays
+from safedrive.detectors.phone_detector import detect_phone_usage_array
+from safedrive.phone_classifier import BatchedPhoneClassifier, create_phone_classifier, create_phone_detector
+from safedrive.telemetry import Telemetry, TelemetryExporter
+from safedrive.journal import EventJournal
+from safedrive.recorder import SessionRecorder
+from safedrive.detectors.eye_detector import eye_openings
+from safedrive.detectors.mouth_detector import mouth_opening
 
 logger = logging.getLogger(__name__)
 
 
-def determine_alert_level(eyes_closed_time, is_yawning, head_state, phone_time, cfg):
-    danger = 0
-    if eyes_closed_time > cfg.eyes_closed_time_threshold * 0.8:
-        danger += 2
-    elif eyes_closed_time > cfg.eyes_closed_time_threshold * 0.5:
-        danger += 1
-    if is_yawning:
-        danger += 1
-    if head_state["turned"] and head_state["tilted"]:
-        danger += 2
-    elif head_state["turned"] or head_state["tilted"]:
-        danger += 1
-    if phone_time > cfg.phone_detection_threshold:
-        danger += 3
-    elif phone_time > 0:
-        danger += 1
-    if danger >= 3:
-        return "DANGER"
-    if danger >= 1:
-        return "WARNING"
-    return "NORMAL"
+def render(image, result, det):
+    """Render stage: draw the HUD for an analysed frame onto *image*."""
+    h, w = image.shape[:2]
+    for hl in result["phone_hands"]:
+        mp.solutions.drawing_utils.draw_landmarks(
+            image, hl, mp.solutions.hands.HAND_CONNECTIONS,
+            mp.solutions.drawing_utils.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2),
+            mp.solutions.drawing_utils.DrawingSpec(color=(0, 0, 255), thickness=2),
+        )
+
+    if not result["face"]:
+        display.draw_no_face(image)
+        return
+
+    level, color = result["level"], result["color"]
+    display.draw_alert_level(image, level, color)
+    if result["eyes_closed"]:
+        display.draw_eye_timer(image, max(0, det.eyes_closed_time_threshold - result["elapsed"]), color)
+    if result["is_yawning"]:
+        display.draw_yawn(image, result["consecutive_yawns"])
+    display.draw_head_state(image, result["head_state"])
+    display.draw_yawn_total(image, result["yawn_count"])
+    if result["phone_detected"]:
+        display.draw_phone_warning(image, result["phone_time"])
+    if level == "DANGER":
+        display.draw_danger_border(image, w, h, color)
 
 
 def main():
     parser = argparse.ArgumentParser(description="SafeDrive detector")
     parser.add_argument("--config", default=None, help="Path to config.yaml")
+    parser.add_argument("--input", default=None,
+                        help="Video file or image-sequence directory to replay instead of the camera")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="Frame rate assumed for image-sequence directories")
+    parser.add_argument("--headless", action="store_true",
+                        help="No display and no sound; process frames as fast as possible")
+    parser.add_argument("--stats-interval", type=float, default=10.0,
+                        help="Seconds between per-stage latency log lines (0 = off)")
     args = parser.parse_args()
 
     cfg = load_config(args.config)
-    setup_logging()
+    setup_logging(cfg.logging.dir or None, asynchronous=cfg.logging.asynchronous)
     det = cfg.detection
 
-    face_mesh = mp.solutions.face_mesh.FaceMesh(
-        max_num_faces=1, refine_landmarks=True,
-        min_detection_confidence=0.5, min_tracking_confidence=0.5,
-    )
-    hands = mp.solutions.hands.Hands(
-        max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.5,
+    cam = cfg.camera
+    if cam.face_roi:
+        face_factory = lambda: RoiFaceMesh(create_face_mesh(), create_face_mesh(static_image_mode=True),
+                                           cam.roi_size, search_width=cam.inference_width)
+    else:
+        face_factory = lambda: DownscaledSolution(create_face_mesh(), cam.inference_width)
+    landmarker = ConcurrentLandmarker(
+        face_factory, lambda: DownscaledSolution(create_hands(), cam.inference_width),
     )
+    scheduler = HandScheduler(det.hand_model_interval, det.hand_model_max_gap)
+    phone_classifier = create_phone_classifier(cfg.phone_model)
+    phone_detector = None
+    if phone_classifier is not None:
+        phone_detector = create_phone_detector(cfg.phone_model, phone_classifier)
+    # Only the micro-batching service has a thread to stop and stats to report.
+    phone_service = phone_classifier if isinstance(phone_classifier, BatchedPhoneClassifier) else None
     alert = AlertSystem(cfg.alert.alarm_path, cfg.alert.levels)
-    alert.start()
+    if not args.headless:
+        alert.start()
 
-    cap = cv2.VideoCapture(cfg.camera.index)
+    cap = open_source(args.input, cam.index, args.fps)
+    if cap.live and not cap.isOpened():
+        logger.warning("Camera %d unavailable, trying index 0", cam.index)
+        cap = open_source(None, 0)
     if not cap.isOpened():
-        logger.warning("Camera %d unavailable, trying index 0", cfg.camera.index)
-        cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        logger.error("Cannot access any camera.")
+        if args.input:
+            logger.error("Cannot open input: %s", args.input)
+        else:
+            logger.error("Cannot access any camera.")
+        landmarker.close()
+        alert.stop()
+        if phone_service is not None:
+            phone_service.close()
         return
+    if cap.live and cam.width > 0 and cam.height > 0:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, cam.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cam.height)
+        logger.info("Capture resolution: %dx%d",
+                    int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
 
     logger.info("SafeDrive started")
-    eyes_closed_start = None
-    yawn_count = 0
-    last_yawn_time = time.time()
-    consecutive_yawns = 0
-    phone_start = None
+    telemetry = Telemetry(cfg.telemetry.enabled)
+    stats = LatencyStats(telemetry if telemetry.enabled else None)
+    state = DriverState(det)
+    last_level = None
+    journal = None
+    if cfg.journal.path:
+        jcfg = cfg.journal
+        journal = EventJournal(jcfg.path, jcfg.max_bytes, jcfg.max_age, jcfg.max_files,
+                               jcfg.flush_interval).start()
+    recorder = None
+    rgb = None  # reused RGB buffer; nothing keeps it past analyse()
+
+    def analyse(frame):
+        """Inference stage: MediaPipe, detectors and alarm decision."""
+        nonlocal last_level, recorder, rgb
+        image = frame.image
+        h, w = image.shape[:2]
+        with telemetry.stage("cvtColor"):
+            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb)
+        now = frame.timestamp
+        marks = landmarker.process(rgb, run_hands=scheduler.should_run(now, state.phone_start is not None))
+        scheduler.observe(marks)
+        stats.record("face_mesh", marks.face_ms / 1000.0)
+        if marks.hands_ran:
+            stats.record("hands", marks.hands_ms / 1000.0)
+
+        with telemetry.stage("landmarks"):
+            hands = hands_to_arrays(marks.hands)
+            face = face_to_array(marks.face) if marks.face is not None else None
+        if phone_detector is not None:
+            runs, t0 = phone_detector.runs, time.perf_counter()
+            phone_flags = phone_detector.detect(rgb, face, hands)
+            if phone_detector.runs != runs:
+                stats.record("phone_model", time.perf_counter() - t0)
+        else:
+            phone_flags = [detect_phone_usage_array(hand, h, w) for hand in hands]
+        with telemetry.stage("detectors"):
+            features = extract_features(face, hands, h, w, det, phone=any(phone_flags))
+            level = state.update(features, now)
+        telemetry.incr("frames")
+        if not features.face:
+            telemetry.incr("frames_no_face")
+        if level != last_level:
+            telemetry.incr("alert_transitions", level=level or "NO_FACE")
+            if journal is not None:
+                journal.level_change(now, level)
+            last_level = level
+        if journal is not None and face is not None:
+            journal.sample(now, level, *eye_openings(face), mouth_opening(face)[0])
+        if cfg.recorder.path:
+            if recorder is None:  # frame size known from the first frame
+                recorder = SessionRecorder(cfg.recorder.path, h, w, cfg.recorder.chunk_frames,
+                                           cfg.recorder.max_hands).start()
+            recorder.record(now, face, hands, level)
+        result = {"face": features.face, "phone_detected": features.phone,
+                  "phone_hands": [hl for hl, flag in zip(marks.hands, phone_flags) if flag]}
+
+        if features.face:
+            # The alarm is driven from here so it never waits on the display.
+            alert.update(level)
+            result.update(
+                level=level, color=alert.get_color(level),
+                eyes_closed=features.eyes_closed, elapsed=state.eyes_closed_time,
+                is_yawning=features.is_yawning, head_state=features.head_state,
+                yawn_count=state.yawn_count, consecutive_yawns=state.consecutive_yawns,
+            )
+        result["phone_time"] = state.phone_time
+        frame.result = result
+        level_counts[result.get("level", "NO_FACE")] += 1
+
+    # Live: drop stale frames.  Replay: process every frame, in order.
+    depth = 1 if cap.live else 8
+    capture_q = DropQueue(maxsize=depth, drop=cap.live, on_drop=release_frame)
+    render_q = None if args.headless else DropQueue(maxsize=depth, drop=cap.live, on_drop=release_frame)
+    # Frame buffers are recycled: capture reads into a free one, render (or
+    # inference when headless) releases it.  Enough for every frame in
+    # flight: both queues plus one being read, analysed and rendered.
+    pool = FramePool(2 * depth + 3)
+    capture = CaptureThread(cap, capture_q, stats, clock=cap.timestamp, pool=pool)
+    inference = StageWorker("inference", analyse, capture_q, render_q, stats)
+    level_counts = Counter()
+
+    def count_drops(t):
+        t.set("frames_dropped", capture_q.dropped, queue="capture")
+        if render_q is not None:
+            t.set("frames_dropped", render_q.dropped, queue="render")
+        t.set("frame_allocations", pool.allocations)
+
+    telemetry.add_collector(count_drops)
+    exporter = None
+    if telemetry.enabled:
+        tcfg = cfg.telemetry
+        exporter = TelemetryExporter(telemetry, tcfg.path or None, tcfg.interval, tcfg.port)
+        exporter.start()
+
+    def report():
+        logger.info("Latency: %s | dropped capture=%d render=%d | frame allocations=%d",
+                    stats.summary(), capture_q.dropped, render_q.dropped if render_q else 0,
+                    pool.allocations)
+        if phone_service is not None:
+            logger.info(phone_service.summary())
 
     try:
-        while cap.isOpened():
-            ok, image = cap.read()
-            if not ok:
+        started = time.monotonic()
+        capture.start()
+        inference.start()
+        last_report = time.monotonic()
+        while True:
+            if args.stats_interval and time.monotonic() - last_report >= args.stats_interval:
+                report()
+                last_report = time.monotonic()
+
+            if render_q is None:
+                inference.join(timeout=0.5)
+                if not inference.is_alive():
+                    break
+                continue
+
+            frame = render_q.get(timeout=0.1)
+            if frame is EOS:
                 break
-            h, w = image.shape[:2]
-            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            face_res = face_mesh.process(rgb)
-            hand_res = hands.process(rgb)
-            now = time.time()
-
-            phone_detected = False
-            if hand_res.multi_hand_landmarks:
-                for hl in hand_res.multi_hand_landmarks:
-                    if detect_phone_usage(hl, h, w):
-                        phone_detected = True
-                        if phone_start is None:
-                            phone_start = now
-                        mp.solutions.drawing_utils.draw_landmarks(
-                            image, hl, mp.solutions.hands.HAND_CONNECTIONS,
-                            mp.solutions.drawing_utils.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2),
-                            mp.solutions.drawing_utils.DrawingSpec(color=(0, 0, 255), thickness=2),
-                        )
-            if not phone_detected:
-                phone_start = None
-            phone_time = (now - phone_start) if phone_start else 0
-
-            if face_res.multi_face_landmarks:
-                lm = face_res.multi_face_landmarks[0].landmark
-                eyes_closed = detect_eyes_closed(lm, det.eye_closed_threshold)
-                is_yawning = detect_yawning(lm, det.mouth_aspect_ratio_threshold, det.mouth_open_threshold)
-                head_state = check_head_position(lm, det.head_rotation_threshold, det.head_tilt_threshold)
-
-                if is_yawning and now - last_yawn_time > 3.0:
-                    yawn_count += 1
-                    consecutive_yawns += 1
-                    last_yawn_time = now
-                elif not is_yawning and now - last_yawn_time > 10.0:
-                    consecutive_yawns = 0
-
-                if eyes_closed:
-                    if eyes_closed_start is None:
-                        eyes_closed_start = now
-                    elapsed = now - eyes_closed_start
-                else:
-                    elapsed = 0
-                    eyes_closed_start = None
-
-                level = determine_alert_level(
-                    elapsed if eyes_closed_start else 0,
-                    consecutive_yawns >= 2, head_state, phone_time, det,
-                )
-                color = alert.get_color(level)
-                alert.update(level)
-
-                display.draw_alert_level(image, level, color)
-                if eyes_closed:
-                    display.draw_eye_timer(image, max(0, det.eyes_closed_time_threshold - elapsed), color)
-                if is_yawning:
-                    display.draw_yawn(image, consecutive_yawns)
-                display.draw_head_state(image, head_state)
-                display.draw_yawn_total(image, yawn_count)
-                if phone_detected:
-                    display.draw_phone_warning(image, phone_time)
-                if level == "DANGER":
-                    display.draw_danger_border(image, w, h, color)
-            else:
-                display.draw_no_face(image)
-                eyes_closed_start = None
-
-            cv2.imshow("SafeDrive", image)
-            if cv2.waitKey(1) & 0xFF == ord("q"):
+            if frame is None:
+                continue
+
+            t0 = time.perf_counter()
+            render(frame.image, frame.result, det)
+            cv2.imshow("SafeDrive", frame.image)
+            key = cv2.waitKey(1) & 0xFF
+            frame.release()  # imshow has copied it: capture may reuse the buffer
+            stats.record("render", time.perf_counter() - t0)
+            if key == ord("q"):
                 break
+    except KeyboardInterrupt:
+        pass
     finally:
+        capture.stop()
+        inference.stop()
+        capture.join(timeout=1.0)
+        inference.join(timeout=1.0)
         cap.release()
-        cv2.destroyAllWindows()
+        if not args.headless:
+            cv2.destroyAllWindows()
         alert.stop()
-        face_mesh.close()
-        hands.close()
+        landmarker.close()
+        if phone_service is not None:
+            phone_service.close()
+        if exporter is not None:
+            exporter.stop()
+        if journal is not None:
+            journal.close()
+            logger.info("Journal: %d events written, %d dropped", journal.written, journal.dropped)
+        if recorder is not None:
+            recorder.close()
+            logger.info("Recorded %d frames to %s (%d dropped)", recorder.recorded,
+                        recorder.session_dir, recorder.dropped)
+        report()
+        frames = sum(level_counts.values())
+        wall = time.monotonic() - started
+        logger.info("Processed %d frames in %.1fs (%.1f FPS) | %s", frames, wall,
+                    frames / wall if wall > 0 else 0.0, dict(level_counts))
         logger.info("SafeDrive stopped")
 
 
@@ -0,0 +1,37 @@
+"""Command-line entry point: ``python -m safedrive <command>``.
+
+Commands:
+    batch       Process a directory of recorded drives in parallel.
+    supervise   Run several camera streams in one process.
+    replay      Replay recorded landmark sessions and sweep detection thresholds.
+"""
+
+import argparse
+
+from safedrive import batch, replay, supervisor
+from safedrive.logger import setup_logging
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="safedrive", description="SafeDrive tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = sub.add_parser("batch", help="Process recorded drives in parallel")
+    batch.add_arguments(batch_parser)
+    batch_parser.set_defaults(func=batch.run)
+
+    sup_parser = sub.add_parser("supervise", help="Run several camera streams in one process")
+    supervisor.add_arguments(sup_parser)
+    sup_parser.set_defaults(func=supervisor.run)
+
+    replay_parser = sub.add_parser("replay", help="Replay landmark sessions and sweep thresholds")
+    replay.add_arguments(replay_parser)
+    replay_parser.set_defaults(func=replay.run)
+
+    args = parser.parse_args(argv)
+    setup_logging()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Parallel batch processing of recorded drives.
+
+Fans a directory of recordings (video files and/or image-sequence
+sub-directories) out across a :class:`~concurrent.futures.ProcessPoolExecutor`.
+Each worker process creates its FaceMesh/Hands instances once, in the pool
+initializer, and reuses them for every drive it is given; their graphs are
+``reset()`` before each drive so MediaPipe's tracking state never carries
+over from one drive into the next (results do not depend on scheduling).
+
+Results are written to a single columnar ``.npz`` file:
+
+* ``frame_*`` columns — one row per analysed frame (``frame_drive`` is the
+  index into ``drive_path``);
+* ``drive_*`` columns — one row per drive (yawn count, phone episodes,
+  time spent in WARNING/DANGER, errors).
+
+Usage::
+
+    python -m safedrive batch --input-dir recordings/ --output results.npz --workers 8
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from safedrive.config import load_config
+from safedrive.inference import create_face_mesh, create_hands
+from safedrive.landmarks import face_to_array, hands_to_arrays
+from safedrive.session import DriverState, extract_features
+from safedrive.sources import IMAGE_EXTENSIONS, open_source
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".webm")
+
+#: Level codes stored in ``frame_level``.
+LEVELS = ("NO_FACE", "NORMAL", "WARNING", "DANGER")
+_LEVEL_CODE = {name: i for i, name in enumerate(LEVELS)}
+
+# Per-process MediaPipe models, created once by _init_worker().
+_worker: Dict[str, object] = {}
+
+
+def find_drives(input_dir: str) -> List[str]:
+    """Return video files and image-sequence directories under *input_dir*."""
+    drives = []
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        if os.path.isdir(path):
+            if any(f.lower().endswith(IMAGE_EXTENSIONS) for f in os.listdir(path)):
+                drives.append(path)
+        elif name.lower().endswith(VIDEO_EXTENSIONS):
+            drives.append(path)
+    return drives
+
+
+def _init_worker(cfg) -> None:
+    # One core per process: keep OpenCV from spawning its own thread pool.
+    cv2.setNumThreads(1)
+    _worker["cfg"] = cfg
+    _worker["face_mesh"] = create_face_mesh()
+    _worker["hands"] = create_hands()
+
+
+def _episodes(mask: np.ndarray, ts: np.ndarray):
+    """Return ``(count, total_seconds)`` of contiguous ``True`` runs in *mask*."""
+    if not mask.any():
+        return 0, 0.0
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return len(starts), float((ts[ends] - ts[starts]).sum())
+
+
+def process_drive(path: str, fps: float = 30.0) -> Dict[str, object]:
+    """Analyse one recording in the current worker; return its timeline."""
+    cfg = _worker["cfg"]
+    det = cfg.detection
+    state = DriverState(det)
+
+    ts, levels, eyes, yawns, phones = [], [], [], [], []
+    source = open_source(path, fps=fps)
+    face_mesh, hands = _worker["face_mesh"], _worker["hands"]
+    t0 = time.perf_counter()
+    try:
+        if not source.isOpened():
+            raise IOError(f"cannot open {path}")
+        # Never inherit the previous drive's tracking state.
+        face_mesh.reset()
+        hands.reset()
+        while True:
+            ok, image = source.read()
+            if not ok:
+                break
+            now = source.timestamp()
+            h, w = image.shape[:2]
+            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            face_res = face_mesh.process(rgb)
+            hand_res = hands.process(rgb)
+
+            face = None
+            if face_res.multi_face_landmarks:
+                face = face_to_array(face_res.multi_face_landmarks[0].landmark)
+            hand_arrays = hands_to_arrays(hand_res.multi_hand_landmarks or [])
+            features = extract_features(face, hand_arrays, h, w, det)
+            level = state.update(features, now)
+
+            ts.append(now)
+            levels.append(_LEVEL_CODE[level or "NO_FACE"])
+            eyes.append(features.eyes_closed)
+            yawns.append(features.is_yawning)
+            phones.append(features.phone)
+        error = ""
+    except Exception as exc:  # reported per drive, never kills the pool
+        error = repr(exc)
+    finally:
+        source.release()
+
+    return {
+        "path": path,
+        "timestamp": np.asarray(ts, dtype=np.float64),
+        "level": np.asarray(levels, dtype=np.int8),
+        "eyes_closed": np.asarray(eyes, dtype=bool),
+        "yawning": np.asarray(yawns, dtype=bool),
+        "phone": np.asarray(phones, dtype=bool),
+        "yawn_count": state.yawn_count,
+        "seconds": time.perf_counter() - t0,
+        "error": error,
+    }
+
+
+def write_results(results: List[Dict[str, object]], output: str) -> None:
+    """Write per-frame and per-drive columns to *output* (``.npz``)."""
+    results = sorted(results, key=lambda r: r["path"])
+    cols: Dict[str, np.ndarray] = {}
+    n = [len(r["timestamp"]) for r in results]
+    cols["frame_drive"] = np.repeat(np.arange(len(results), dtype=np.int32), n)
+    for key in ("timestamp", "level", "eyes_closed", "yawning", "phone"):
+        cols[f"frame_{key}"] = (
+            np.concatenate([r[key] for r in results]) if results else np.empty(0)
+        )
+
+    phone_eps = [_episodes(r["phone"], r["timestamp"]) for r in results]
+    cols["drive_path"] = np.array([r["path"] for r in results], dtype=str)
+    cols["drive_frames"] = np.array(n, dtype=np.int64)
+    cols["drive_duration"] = np.array(
+        [float(r["timestamp"][-1] - r["timestamp"][0]) if len(r["timestamp"]) else 0.0 for r in results]
+    )
+    cols["drive_yawn_count"] = np.array([r["yawn_count"] for r in results], dtype=np.int64)
+    cols["drive_phone_episodes"] = np.array([c for c, _ in phone_eps], dtype=np.int64)
+    cols["drive_phone_seconds"] = np.array([s for _, s in phone_eps])
+    for name in ("WARNING", "DANGER"):
+        cols[f"drive_{name.lower()}_seconds"] = np.array(
+            [_episodes(r["level"] == _LEVEL_CODE[name], r["timestamp"])[1] for r in results]
+        )
+    cols["drive_processing_seconds"] = np.array([r["seconds"] for r in results])
+    cols["drive_error"] = np.array([r["error"] for r in results], dtype=str)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    np.savez_compressed(output, level_names=np.array(LEVELS), **cols)
+
+
+def run_batch(drives: List[str], cfg, output: str, workers: Optional[int] = None, fps: float = 30.0) -> None:
+    """Process *drives* on a process pool and write the columnar results."""
+    results = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cfg,)) as pool:
+        futures = {pool.submit(process_drive, path, fps): path for path in drives}
+        for i, fut in enumerate(as_completed(futures), 1):
+            res = fut.result()
+            results.append(res)
+            if res["error"]:
+                logger.error("[%d/%d] %s failed: %s", i, len(drives), res["path"], res["error"])
+            else:
+                logger.info("[%d/%d] %s: %d frames in %.1fs", i, len(drives), res["path"],
+                            len(res["timestamp"]), res["seconds"])
+    write_results(results, output)
+    logger.info("Wrote %s (%d drives in %.1fs)", output, len(results), time.perf_counter() - t0)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--input-dir", required=True, help="Directory of recorded drives")
+    parser.add_argument("--output", default="batch_results.npz", help="Output .npz file")
+    parser.add_argument("--config", default=None, help="Path to config.yaml")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate for image-sequence directories")
+
+
+def run(args: argparse.Namespace) -> None:
+    cfg = load_config(args.config)
+    drives = find_drives(args.input_dir)
+    if not drives:
+        logger.error("No recordings found in %s", args.input_dir)
+        return
+    logger.info("Processing %d drives", len(drives))
+    run_batch(drives, cfg, args.output, args.workers, args.fps)
@@ -14,6 +14,12 @@ class DetectionConfig:
     head_tilt_threshold: float = 0.1
     eyes_closed_time_threshold: float = 20.0
     phone_detection_threshold: float = 5.0
+    # Hands model scheduling while no phone is suspected: run every Nth
+    # frame, and at least every ``hand_model_max_gap`` seconds (0 = no
+    # bound).  The defaults run it on every frame; raise the interval
+    # (e.g. 3 / 0.2) to save CPU.
+    hand_model_interval: int = 1
+    hand_model_max_gap: float = 0.0
 
 
 @dataclass
@@ -21,6 +27,68 @@ class CameraConfig:
     index: int = 0
     width: int = 0
     height: int = 0
+    # Run FaceMesh on an upscaled crop around the previously tracked face
+    # (``roi_size`` px square) instead of the full frame.
+    face_roi: bool = False
+    roi_size: int = 256
+    # Downscale full-frame inputs (Hands, face search) to this width; 0 = off.
+    inference_width: int = 0
+
+
+@dataclass
+class PhoneModelConfig:
+    # ONNX phone classifier confirming the heuristic; empty path = heuristic only.
+    path: str = ""
+    threads: int = 1
+    input_size: int = 224
+    threshold: float = 0.5
+    # CNN time allowed per frame (ms); extra hands keep the heuristic verdict.
+    latency_budget_ms: float = 10.0
+    # Micro-batching of hand crops (across hands and streams): collection
+    # window in ms (0 = direct calls in the single-camera loop) and batch cap.
+    batch_window_ms: float = 0.0
+    max_batch: int = 8
+
+
+@dataclass
+class TelemetryConfig:
+    # Per-stage histograms and counters (no-op when disabled).
+    enabled: bool = False
+    # JSON-lines file receiving a snapshot every ``interval`` s; empty = none.
+    path: str = ""
+    interval: float = 10.0
+    # Prometheus text on http://127.0.0.1:<port>/metrics; 0 = off.
+    port: int = 0
+
+
+@dataclass
+class LoggingConfig:
+    # Directory of safedrive.log; empty = console only.
+    dir: str = ""
+    # Queue records to a listener thread instead of writing from the caller.
+    asynchronous: bool = False
+
+
+@dataclass
+class JournalConfig:
+    # Binary event journal (levels, eye/mouth values); empty path = off.
+    path: str = ""
+    # Rotation by size (bytes) and age (s); oldest files beyond max_files
+    # are deleted (0 = keep all).
+    max_bytes: int = 8388608
+    max_age: float = 3600.0
+    max_files: int = 0
+    # Seconds between background batch writes.
+    flush_interval: float = 1.0
+
+
+@dataclass
+class RecorderConfig:
+    # Landmark session recordings (.npz shards); empty path = off.
+    path: str = ""
+    # Frames per shard and hand slots per frame.
+    chunk_frames: int = 900
+    max_hands: int = 2
 
 
 @dataclass
@@ -38,6 +106,11 @@ class AppConfig:
     detection: DetectionConfig = field(default_factory=DetectionConfig)
     camera: CameraConfig = field(default_factory=CameraConfig)
     alert: AlertConfig = field(default_factory=AlertConfig)
+    phone_model: PhoneModelConfig = field(default_factory=PhoneModelConfig)
+    telemetry: TelemetryConfig = field(default_factory=TelemetryConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    journal: JournalConfig = field(default_factory=JournalConfig)
+    recorder: RecorderConfig = field(default_factory=RecorderConfig)
 
 
 def _resolve_path(path: str, project_root: str) -> str:
@@ -80,6 +153,24 @@ def load_config(yaml_path: str | None = None, project_root: str | None = None) -
             if hasattr(cfg.camera, key):
                 setattr(cfg.camera, key, value)
 
+        # Phone model overrides
+        phone = data.get("phone_model", {})
+        for key, value in phone.items():
+            if hasattr(cfg.phone_model, key):
+                setattr(cfg.phone_model, key, value)
+
+        # Telemetry overrides
+        tel = data.get("telemetry", {})
+        for key, value in tel.items():
+            if hasattr(cfg.telemetry, key):
+                setattr(cfg.telemetry, key, value)
+
+        # Logging / journal / recorder overrides
+        for section in ("logging", "journal", "recorder"):
+            for key, value in data.get(section, {}).items():
+                if hasattr(getattr(cfg, section), key):
+                    setattr(getattr(cfg, section), key, value)
+
         # Alert overrides
         alert = data.get("alert", {})
         if "alarm_path" in alert:
@@ -89,5 +180,15 @@ def load_config(yaml_path: str | None = None, project_root: str | None = None) -
 
     # Resolve alarm_path to absolute
     cfg.alert.alarm_path = _resolve_path(cfg.alert.alarm_path, project_root)
+    if cfg.phone_model.path:
+        cfg.phone_model.path = _resolve_path(cfg.phone_model.path, project_root)
+    if cfg.telemetry.path:
+        cfg.telemetry.path = _resolve_path(cfg.telemetry.path, project_root)
+    if cfg.logging.dir:
+        cfg.logging.dir = _resolve_path(cfg.logging.dir, project_root)
+    if cfg.journal.path:
+        cfg.journal.path = _resolve_path(cfg.journal.path, project_root)
+    if cfg.recorder.path:
+        cfg.recorder.path = _resolve_path(cfg.recorder.path, project_root)
 
     return cfg
@@ -0,0 +1,68 @@
+"""Batched detector evaluation over recorded landmark sequences.
+
+Used to re-score recorded sessions against new thresholds without running
+the per-frame Python detectors: every feature is computed for all frames
+at once with NumPy.
+
+Usage::
+
+    from safedrive.detectors.batch import score_sequence
+    scores = score_sequence(faces, hands, cfg.detection, 480, 640)
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from safedrive.detectors.eye_detector import detect_eyes_closed_batch, eye_openings_array
+from safedrive.detectors.head_detector import check_head_position_batch
+from safedrive.detectors.mouth_detector import detect_yawning_batch, mouth_opening_array
+from safedrive.detectors.phone_detector import detect_phone_usage_batch
+
+
+def score_sequence(
+    faces: np.ndarray,
+    hands: Optional[np.ndarray],
+    det,
+    image_height: int,
+    image_width: int,
+) -> Dict[str, np.ndarray]:
+    """Return per-frame features and flags for a landmark sequence.
+
+    Parameters
+    ----------
+    faces : np.ndarray
+        ``(T, 478, 3)`` face landmarks, ``NaN`` where no face was found.
+    hands : np.ndarray | None
+        ``(T, H, 21, 3)`` hand landmarks (``H`` hand slots), ``NaN`` for
+        empty slots.  ``None`` skips phone detection.
+    det : DetectionConfig
+        Thresholds to score against.
+    image_height, image_width
+        Frame size used by the phone heuristic.
+
+    Returns
+    -------
+    dict
+        ``(T,)`` arrays: ``face``, ``left_eye``, ``right_eye``,
+        ``eyes_closed``, ``mar``, ``mouth_height``, ``yawning``,
+        ``rotation``, ``vertical_angle``, ``turned``, ``tilted``,
+        ``turned_left``, ``tilted_down`` and ``phone``.
+    """
+    left, right = eye_openings_array(faces)
+    mar, height = mouth_opening_array(faces)
+    out = {
+        "face": ~np.isnan(faces[:, 0, 0]),
+        "left_eye": left,
+        "right_eye": right,
+        "eyes_closed": detect_eyes_closed_batch(faces, det.eye_closed_threshold),
+        "mar": mar,
+        "mouth_height": height,
+        "yawning": detect_yawning_batch(faces, det.mouth_aspect_ratio_threshold, det.mouth_open_threshold),
+    }
+    out.update(check_head_position_batch(faces, det.head_rotation_threshold, det.head_tilt_threshold))
+    if hands is None:
+        out["phone"] = np.zeros(len(faces), dtype=bool)
+    else:
+        out["phone"] = detect_phone_usage_batch(hands, image_height, image_width).any(axis=-1)
+    return out
@@ -1,57 +1,182 @@
 """Head position / rotation detection.
 
 Uses MediaPipe Face Mesh landmarks around the ears, temples, forehead, chin
-and nose to estimate horizontal rotation and vertical tilt.
+and nose to estimate horizontal rotation and vertical tilt.  The ``*_array``
+variants take the ``(478, 3)`` array from :mod:`safedrive.landmarks` instead.
 """
 
 from typing import Dict, Optional
 
+import numpy as np
+
 from safedrive.constants import (
     NOSE_TIP, LEFT_EAR, RIGHT_EAR,
     FOREHEAD, CHIN, LEFT_TEMPLE, RIGHT_TEMPLE,
 )
 
 
+class HeadState:
+    """Head state of one frame, as returned by :func:`check_head_position`.
+
+    A fixed-layout record (``__slots__``) instead of a per-frame dict; it
+    still supports the dict reads the callers use (``state["turned"]``,
+    ``state.get(...)``) and compares equal to the equivalent dict.  Pass an
+    existing instance as ``out`` to the detectors to reuse it.
+
+    Attributes
+    ----------
+    turned, tilted : bool
+    direction_h : str | None
+        ``"gauche"`` / ``"droite"`` when *turned*.
+    direction_v : str | None
+        ``"bas"`` / ``"haut"`` when *tilted*.
+    """
+
+    __slots__ = ("turned", "tilted", "direction_h", "direction_v")
+
+    def __init__(self, turned: bool = False, tilted: bool = False,
+                 direction_h: Optional[str] = None, direction_v: Optional[str] = None):
+        self.turned = turned
+        self.tilted = tilted
+        self.direction_h = direction_h
+        self.direction_v = direction_v
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self) -> Dict[str, object]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __eq__(self, other):
+        if isinstance(other, HeadState):
+            return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"HeadState({fields})"
+
+
+def _store(out: Optional[HeadState], turned: bool, tilted: bool,
+           direction_h: Optional[str], direction_v: Optional[str]) -> HeadState:
+    if out is None:
+        return HeadState(turned, tilted, direction_h, direction_v)
+    out.turned = turned
+    out.tilted = tilted
+    out.direction_h = direction_h
+    out.direction_v = direction_v
+    return out
+
+
 def check_head_position(
     landmarks,
     rotation_threshold: float,
     tilt_threshold: float,
-) -> Dict[str, object]:
-    """Return a dict describing the head state.
+    out: Optional[HeadState] = None,
+) -> HeadState:
+    """Return the :class:`HeadState` of the face.
 
     Keys:
         turned (bool), tilted (bool),
         direction_h (str | None), direction_v (str | None)
+
+    *out*, when given, is overwritten and returned instead of allocating a
+    new record.
     """
-    nose = landmarks[NOSE_TIP]
-    left_ear = landmarks[LEFT_EAR]
-    right_ear = landmarks[RIGHT_EAR]
-    forehead = landmarks[FOREHEAD]
-    chin = landmarks[CHIN]
-    left_temple = landmarks[LEFT_TEMPLE]
-    right_temple = landmarks[RIGHT_TEMPLE]
+    left_ear_x = landmarks[LEFT_EAR].x
+    right_ear_x = landmarks[RIGHT_EAR].x
+    forehead_y = landmarks[FOREHEAD].y
+    chin_y = landmarks[CHIN].y
 
     # Horizontal rotation
-    ear_diff = abs(left_ear.x - right_ear.x)
-    temple_diff = abs(left_temple.x - right_temple.x)
-    rotation = (ear_diff + temple_diff) / 2
+    ear_diff = abs(left_ear_x - right_ear_x)
+    temple_diff = abs(landmarks[LEFT_TEMPLE].x - landmarks[RIGHT_TEMPLE].x)
+    turned = (ear_diff + temple_diff) / 2 > rotation_threshold
 
     # Vertical tilt
-    vertical_angle = abs(forehead.y - chin.y)
+    tilted = abs(forehead_y - chin_y) > tilt_threshold
 
-    head_state: Dict[str, object] = {
-        "turned": False,
-        "tilted": False,
-        "direction_h": None,
-        "direction_v": None,
-    }
+    return _store(
+        out, turned, tilted,
+        ("gauche" if left_ear_x > right_ear_x else "droite") if turned else None,
+        ("bas" if landmarks[NOSE_TIP].y > (forehead_y + chin_y) / 2 else "haut") if tilted else None,
+    )
+
+
+_HEAD_IDX = np.array([NOSE_TIP, LEFT_EAR, RIGHT_EAR, FOREHEAD, CHIN, LEFT_TEMPLE, RIGHT_TEMPLE])
 
-    if rotation > rotation_threshold:
-        head_state["turned"] = True
-        head_state["direction_h"] = "gauche" if left_ear.x > right_ear.x else "droite"
 
-    if vertical_angle > tilt_threshold:
-        head_state["tilted"] = True
-        head_state["direction_v"] = "bas" if nose.y > (forehead.y + chin.y) / 2 else "haut"
+def head_pose_array(face: np.ndarray):
+    """Return head-pose features from a ``(..., 478, 3)`` array.
+
+    Returns ``(rotation, vertical_angle, ear_dx, nose_offset)`` where
+    ``ear_dx = left_ear.x - right_ear.x`` (positive = turned left) and
+    ``nose_offset`` is the nose height relative to the forehead/chin
+    midpoint (positive = tilted down).
+    """
+    pts = face[..., _HEAD_IDX, :2]
+    x, y = pts[..., 0], pts[..., 1]
+    ear_dx = x[..., 1] - x[..., 2]
+    rotation = (np.abs(ear_dx) + np.abs(x[..., 5] - x[..., 6])) / 2
+    vertical_angle = np.abs(y[..., 3] - y[..., 4])
+    nose_offset = y[..., 0] - (y[..., 3] + y[..., 4]) / 2
+    return rotation, vertical_angle, ear_dx, nose_offset
+
+
+def check_head_position_array(
+    face: np.ndarray,
+    rotation_threshold: float,
+    tilt_threshold: float,
+    out: Optional[HeadState] = None,
+) -> HeadState:
+    """Array version of :func:`check_head_position` for a single ``(478, 3)`` face.
 
-    return head_state
+    Reads the seven landmarks as Python floats rather than going through
+    :func:`head_pose_array`, which is tuned for batches.
+    """
+    item = face.item
+    ear_dx = item(LEFT_EAR, 0) - item(RIGHT_EAR, 0)
+    turned = (abs(ear_dx) + abs(item(LEFT_TEMPLE, 0) - item(RIGHT_TEMPLE, 0))) / 2 > rotation_threshold
+    tilted = abs(item(FOREHEAD, 1) - item(CHIN, 1)) > tilt_threshold
+    direction_v = None
+    if tilted:
+        # Midpoint summed in the array's precision, like head_pose_array, so
+        # a nose exactly between forehead and chin gets the same direction.
+        mid = float(face[FOREHEAD, 1] + face[CHIN, 1]) / 2
+        direction_v = "bas" if item(NOSE_TIP, 1) > mid else "haut"
+    return _store(out, turned, tilted, ("gauche" if ear_dx > 0 else "droite") if turned else None, direction_v)
+
+
+def check_head_position_batch(
+    faces: np.ndarray,
+    rotation_threshold: float,
+    tilt_threshold: float,
+) -> Dict[str, np.ndarray]:
+    """Per-frame :func:`check_head_position` over a ``(T, 478, 3)`` tensor.
+
+    Returns a dict of ``(T,)`` arrays: ``rotation``, ``vertical_angle``,
+    ``turned``, ``tilted``, ``turned_left`` (``direction_h == "gauche"``)
+    and ``tilted_down`` (``direction_v == "bas"``).  The direction flags
+    are only meaningful where ``turned`` / ``tilted`` is set.
+    """
+    rotation, vertical_angle, ear_dx, nose_offset = head_pose_array(faces)
+    return {
+        "rotation": rotation,
+        "vertical_angle": vertical_angle,
+        "turned": rotation > rotation_threshold,
+        "tilted": vertical_angle > tilt_threshold,
+        "turned_left": ear_dx > 0,
+        "tilted_down": nose_offset > 0,
+    }
@@ -1,10 +1,15 @@
 """Mouth / yawning detection.
 
 Uses MediaPipe Face Mesh landmarks to compute the Mouth Aspect Ratio (MAR).
+The ``*_array`` variants take the ``(478, 3)`` array from
+:mod:`safedrive.landmarks` instead (plain-float math for a single face,
+vectorised helpers for batches).
 """
 
 from typing import Tuple
 
+import numpy as np
+
 from safedrive.constants import MOUTH_INNER_TOP, MOUTH_INNER_BOTTOM, MOUTH_LEFT, MOUTH_RIGHT
 
 
@@ -49,3 +54,46 @@ def detect_yawning(
         MOUTH_RIGHT,
     )
     return mar > mar_threshold and height > open_threshold
+
+
+_MOUTH_IDX = np.array([MOUTH_INNER_TOP, MOUTH_INNER_BOTTOM, MOUTH_LEFT, MOUTH_RIGHT])
+
+
+def mouth_opening_array(face: np.ndarray):
+    """Return ``(mar, vertical_distance)`` from a ``(..., 478, 3)`` array.
+
+    Like :func:`calculate_mouth_opening`, both values are ``0`` where the
+    horizontal distance is zero.
+    """
+    pts = face[..., _MOUTH_IDX, :2]
+    vertical = np.abs(pts[..., 0, 1] - pts[..., 1, 1])
+    horizontal = np.abs(pts[..., 2, 0] - pts[..., 3, 0])
+    degenerate = horizontal == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mar = np.where(degenerate, 0.0, vertical / horizontal)
+    return mar, np.where(degenerate, 0.0, vertical)
+
+
+def mouth_opening(face: np.ndarray) -> Tuple[float, float]:
+    """Return ``(mar, vertical_distance)`` of a single ``(478, 3)`` face as floats.
+
+    Same convention as :func:`calculate_mouth_opening` (``(0.0, 0.0)`` when
+    the mouth corners coincide).
+    """
+    height = abs(face.item(MOUTH_INNER_TOP, 1) - face.item(MOUTH_INNER_BOTTOM, 1))
+    width = abs(face.item(MOUTH_LEFT, 0) - face.item(MOUTH_RIGHT, 0))
+    if width == 0:
+        return (0.0, 0.0)
+    return (height / width, height)
+
+
+def detect_yawning_array(face: np.ndarray, mar_threshold: float, open_threshold: float) -> bool:
+    """Array version of :func:`detect_yawning` for a single ``(478, 3)`` face."""
+    mar, height = mouth_opening(face)
+    return mar > mar_threshold and height > open_threshold
+
+
+def detect_yawning_batch(faces: np.ndarray, mar_threshold: float, open_threshold: float) -> np.ndarray:
+    """Per-frame :func:`detect_yawning` over a ``(T, 478, 3)`` tensor."""
+    mar, height = mouth_opening_array(faces)
+    return (mar > mar_threshold) & (height > open_threshold)
@@ -3,10 +3,30 @@
 Detects whether a hand is likely holding a phone based on finger-tip
 proximity and alignment.  This is a rough heuristic — it can produce
 false positives when the hand is in a similar posture without a phone.
+
+Single hands are scored with plain-float math on the five finger tips;
+the ``*_batch`` variant vectorises over ``(..., 21, 3)`` tensors.
 """
 
+import math
+
 import numpy as np
 
+_TIPS = (4, 8, 12, 16, 20)
+
+
+def _tips_hold_phone(tips, image_height: int, image_width: int) -> bool:
+    """Heuristic on the five normalised ``(x, y)`` finger tips, thumb first."""
+    total = longest = 0.0
+    px, py = tips[0]
+    for x, y in tips[1:]:
+        d = math.hypot((x - px) * image_width, (y - py) * image_height)
+        total += d
+        if d > longest:
+            longest = d
+        px, py = x, y
+    return total / 4 < image_width * 0.15 and longest < image_width * 0.25
+
 
 def detect_phone_usage(hand_landmarks, image_height: int, image_width: int) -> bool:
     """Return ``True`` when finger tips are close and aligned.
@@ -22,23 +42,36 @@ def detect_phone_usage(hand_landmarks, image_height: int, image_width: int) -> b
         return False
 
     lm = hand_landmarks.landmark
-    thumb = np.array([lm[4].x * image_width, lm[4].y * image_height])
-    index = np.array([lm[8].x * image_width, lm[8].y * image_height])
-    middle = np.array([lm[12].x * image_width, lm[12].y * image_height])
-    ring = np.array([lm[16].x * image_width, lm[16].y * image_height])
-    pinky = np.array([lm[20].x * image_width, lm[20].y * image_height])
-
-    distances = [
-        np.linalg.norm(thumb - index),
-        np.linalg.norm(index - middle),
-        np.linalg.norm(middle - ring),
-        np.linalg.norm(ring - pinky),
-    ]
-
-    avg_distance = np.mean(distances)
-    max_distance = np.max(distances)
-
-    fingers_close = avg_distance < image_width * 0.15
-    fingers_aligned = max_distance < image_width * 0.25
-
-    return bool(fingers_close and fingers_aligned)
+    return _tips_hold_phone([(lm[i].x, lm[i].y) for i in _TIPS], image_height, image_width)
+
+
+_TIP_IDX = np.array(_TIPS)
+
+
+def fingertip_distances_array(hand: np.ndarray, image_height: int, image_width: int) -> np.ndarray:
+    """Return the 4 consecutive finger-tip distances (pixels).
+
+    *hand* is a ``(..., 21, 3)`` array; the result has shape ``(..., 4)``
+    (thumb-index, index-middle, middle-ring, ring-pinky).
+    """
+    tips = hand[..., _TIP_IDX, :2] * np.array([image_width, image_height], dtype=hand.dtype)
+    diff = tips[..., 1:, :] - tips[..., :-1, :]
+    return np.sqrt((diff * diff).sum(axis=-1))
+
+
+def detect_phone_usage_array(hand, image_height: int, image_width: int) -> bool:
+    """Array version of :func:`detect_phone_usage` for a ``(21, 3)`` hand."""
+    if hand is None:
+        return False
+    item = hand.item
+    return _tips_hold_phone([(item(i, 0), item(i, 1)) for i in _TIPS], image_height, image_width)
+
+
+def detect_phone_usage_batch(hands: np.ndarray, image_height: int, image_width: int) -> np.ndarray:
+    """Per-hand :func:`detect_phone_usage` over a ``(..., 21, 3)`` tensor.
+
+    Typically ``(T, 21, 3)`` for one hand slot or ``(T, 2, 21, 3)`` for
+    both; missing hands should be ``NaN`` and come out ``False``.
+    """
+    distances = fingertip_distances_array(hands, image_height, image_width)
+    return (distances.mean(axis=-1) < image_width * 0.15) & (distances.max(axis=-1) < image_width * 0.25)
@@ -0,0 +1,210 @@
+"""Concurrent MediaPipe inference.
+
+FaceMesh and Hands are independent graphs that release the GIL while they
+run, so each one is given its own single-thread executor.  Both models read
+the same (read-only) RGB buffer and their outputs are merged into one
+:class:`LandmarkResult` per frame.
+
+Each solution instance is created *and* used on its executor's thread only,
+so no MediaPipe object is ever shared between threads.
+
+:class:`HandScheduler` decides per frame whether the Hands model needs to
+run at all: while no phone is suspected it only runs every Nth frame.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+import mediapipe as mp
+
+
+@dataclass
+class LandmarkResult:
+    """Merged FaceMesh + Hands output for a single frame.
+
+    Attributes
+    ----------
+    face
+        Landmark sequence of the first detected face (``.landmark`` of the
+        MediaPipe ``NormalizedLandmarkList``), or ``None``.
+    hands
+        List of MediaPipe hand ``NormalizedLandmarkList`` objects.
+    face_ms, hands_ms
+        Wall-clock time spent in each model.
+    hands_ran
+        ``False`` when the Hands model was skipped for this frame.
+    """
+
+    face: Optional[Any] = None
+    hands: List[Any] = field(default_factory=list)
+    face_ms: float = 0.0
+    hands_ms: float = 0.0
+    hands_ran: bool = True
+
+
+def create_face_mesh(static_image_mode: bool = False):
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=static_image_mode, max_num_faces=1, refine_landmarks=True,
+        min_detection_confidence=0.5, min_tracking_confidence=0.5,
+    )
+
+
+def create_hands():
+    return mp.solutions.hands.Hands(
+        max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.5,
+    )
+
+
+def _timed(fn, rgb):
+    t0 = time.perf_counter()
+    res = fn(rgb)
+    return res, (time.perf_counter() - t0) * 1000.0
+
+
+class ConcurrentLandmarker:
+    """Run FaceMesh and Hands in parallel on two dedicated worker threads.
+
+    Parameters
+    ----------
+    face_factory, hands_factory
+        Zero-argument callables returning objects with ``process(rgb)`` and
+        ``close()``.  They are invoked on the worker threads.
+    """
+
+    def __init__(
+        self,
+        face_factory: Callable[[], Any] = create_face_mesh,
+        hands_factory: Callable[[], Any] = create_hands,
+    ):
+        self._face_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="safedrive-face")
+        self._hands_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="safedrive-hands")
+        face_future = self._face_pool.submit(face_factory)
+        hands_future = self._hands_pool.submit(hands_factory)
+        self._face_model = face_future.result()
+        self._hands_model = hands_future.result()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Close both models on their own threads and stop the workers."""
+        for pool, model in ((self._face_pool, self._face_model), (self._hands_pool, self._hands_model)):
+            if model is not None:
+                pool.submit(model.close).result()
+            pool.shutdown(wait=True)
+        self._face_model = None
+        self._hands_model = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Runtime
+    # ------------------------------------------------------------------
+
+    def process(self, rgb, run_hands: bool = True) -> LandmarkResult:
+        """Run both models on *rgb* concurrently and merge their outputs.
+
+        *rgb* must not be modified until this call returns.  When
+        *run_hands* is ``False`` only FaceMesh runs and ``hands`` is empty.
+        """
+        face_future = self._face_pool.submit(_timed, self._face_model.process, rgb)
+        hands_future = None
+        if run_hands:
+            hands_future = self._hands_pool.submit(_timed, self._hands_model.process, rgb)
+        face_res, face_ms = face_future.result()
+
+        result = LandmarkResult(face_ms=face_ms, hands_ran=run_hands)
+        if face_res.multi_face_landmarks:
+            result.face = face_res.multi_face_landmarks[0].landmark
+        if hands_future is not None:
+            hand_res, result.hands_ms = hands_future.result()
+            if hand_res.multi_hand_landmarks:
+                result.hands = list(hand_res.multi_hand_landmarks)
+        return result
+
+
+def landmark_bbox(landmarks, margin: float = 0.0) -> Tuple[float, float, float, float]:
+    """Return the normalised ``(x_min, y_min, x_max, y_max)`` of *landmarks*.
+
+    The box is grown by *margin* times its width/height on every side.
+    """
+    xs = [p.x for p in landmarks]
+    ys = [p.y for p in landmarks]
+    x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+    mx, my = (x1 - x0) * margin, (y1 - y0) * margin
+    return (x0 - mx, y0 - my, x1 + mx, y1 + my)
+
+
+class HandScheduler:
+    """Decide whether the Hands model should run on the current frame.
+
+    While no phone is suspected Hands runs on every *interval*-th frame,
+    and at least every *max_gap* seconds, which bounds the extra detection
+    latency.  It runs on every frame while the phone timer is armed or
+    while a hand seen on the last run lies inside the (margin-grown) face
+    bounding box.
+
+    Parameters
+    ----------
+    interval : int
+        Run every Nth frame when idle (``1`` = every frame).
+    max_gap : float
+        Upper bound, in seconds, between two Hands runs.
+    face_margin : float
+        Relative margin added around the face box for the proximity test.
+    """
+
+    def __init__(self, interval: int = 1, max_gap: float = 0.0, face_margin: float = 0.25):
+        self.interval = max(1, int(interval))
+        self.max_gap = max_gap
+        self.face_margin = face_margin
+        self._skipped = 0
+        self._last_run: Optional[float] = None
+        self._face_box: Optional[Tuple[float, float, float, float]] = None
+        self._hand_near_face = False
+
+    @property
+    def hand_near_face(self) -> bool:
+        return self._hand_near_face
+
+    def should_run(self, now: float, phone_armed: bool) -> bool:
+        """Return ``True`` if Hands must run for the frame taken at *now*."""
+        run = (
+            phone_armed
+            or self._hand_near_face
+            or self._last_run is None
+            or self._skipped + 1 >= self.interval
+            or (self.max_gap > 0 and now - self._last_run >= self.max_gap)
+        )
+        if run:
+            self._skipped = 0
+            self._last_run = now
+        else:
+            self._skipped += 1
+        return run
+
+    def observe(self, result: LandmarkResult) -> None:
+        """Update the face box and hand proximity from a frame's landmarks."""
+        if result.face is None:
+            # No face: forget its box rather than test hands against a stale one.
+            self._face_box = None
+            self._hand_near_face = False
+            return
+        self._face_box = landmark_bbox(result.face, self.face_margin)
+        if not result.hands_ran:
+            return
+        self._hand_near_face = False
+        if self._face_box is None:
+            return
+        x0, y0, x1, y1 = self._face_box
+        for hand in result.hands:
+            if any(x0 <= p.x <= x1 and y0 <= p.y <= y1 for p in hand.landmark):
+                self._hand_near_face = True
+                return
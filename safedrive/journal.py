@@ -0,0 +1,215 @@
+"""Append-only binary journal of per-frame driver events.
+
+Each event is a fixed 24-byte little-endian record (:data:`RECORD`)::
+
+    float64 timestamp   source clock (PTS for replays)
+    uint8   kind        KIND_SAMPLE (per-frame values) or KIND_LEVEL (level change)
+    uint8   level       index in LEVELS (0 = no face)
+    2 bytes padding
+    float32 eye_left, eye_right, mar
+
+The detection loop only packs records into an in-memory buffer
+(:meth:`EventJournal.write`, about a microsecond); a background thread
+writes the buffer in batches, fsyncs and rotates the files by size and
+age, so the loop never waits on storage (SD cards can stall for
+hundreds of milliseconds).  If the buffer grows past ``max_buffer`` bytes
+(storage gone), new events are counted in :attr:`EventJournal.dropped`
+instead of queued.
+
+Files are named ``journal-<YYYYmmdd-HHMMSS>-<seq>.sdj`` and start with an
+8-byte header (magic, version, record size).  :func:`read_journal` loads
+one file or a whole directory into a NumPy structured array, ignoring a
+truncated last record.
+"""
+
+import glob
+import logging
+import os
+import struct
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SDJ1"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<dBBxxfff")
+
+KIND_SAMPLE = 1
+KIND_LEVEL = 2
+#: Alert level codes (index = stored value).
+LEVELS = (None, "NORMAL", "WARNING", "DANGER")
+_LEVEL_CODES = {name: i for i, name in enumerate(LEVELS)}
+
+#: NumPy view of :data:`RECORD`.
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"), ("kind", "u1"), ("level", "u1"), ("_pad", "V2"),
+    ("eye_left", "<f4"), ("eye_right", "<f4"), ("mar", "<f4"),
+])
+
+
+class EventJournal:
+    """Batched, rotating writer of :data:`RECORD` events.
+
+    Parameters
+    ----------
+    directory : str
+        Destination directory (created on :meth:`start`).
+    max_bytes : int
+        Rotate when the current file would exceed this size.
+    max_age : float
+        Rotate when the current file is older than this many seconds.
+    max_files : int
+        Delete the oldest files beyond this count; 0 keeps everything.
+    flush_interval : float
+        Seconds between background writes.
+    fsync : bool
+        ``os.fsync`` each batch (on the writer thread).
+    max_buffer : int
+        Bytes buffered in memory before new events are dropped.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 8 << 20, max_age: float = 3600.0,
+                 max_files: int = 0, flush_interval: float = 1.0, fsync: bool = True,
+                 max_buffer: int = 4 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.written = 0
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fh = None
+        self._opened = 0.0
+        self._size = 0
+        self._seq = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "EventJournal":
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="safedrive-journal", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Write what is buffered and close the current file."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Runtime
+    # ------------------------------------------------------------------
+
+    def write(self, kind: int, timestamp: float, level: Optional[str],
+              eye_left: float = float("nan"), eye_right: float = float("nan"),
+              mar: float = float("nan")) -> None:
+        """Queue one event; never blocks on I/O."""
+        record = RECORD.pack(timestamp, kind, _LEVEL_CODES.get(level, 0), eye_left, eye_right, mar)
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer += record
+
+    def sample(self, timestamp: float, level: Optional[str], eye_left: float, eye_right: float,
+               mar: float) -> None:
+        """Queue the per-frame values (:data:`KIND_SAMPLE`)."""
+        self.write(KIND_SAMPLE, timestamp, level, eye_left, eye_right, mar)
+
+    def level_change(self, timestamp: float, level: Optional[str]) -> None:
+        """Queue an alert level transition (:data:`KIND_LEVEL`)."""
+        self.write(KIND_LEVEL, timestamp, level)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self) -> None:
+        with self._lock:
+            if not self._buffer:
+                return
+            data, self._buffer = self._buffer, bytearray()
+        try:
+            self._write_batch(data)
+        except OSError:
+            with self._lock:
+                self.dropped += len(data) // RECORD.size
+            logger.exception("Journal write to %s failed", self.directory)
+
+    def _write_batch(self, data: bytearray) -> None:
+        if self._fh is None or self._size + len(data) > self.max_bytes \
+                or time.monotonic() - self._opened >= self.max_age:
+            self._rotate()
+        self._fh.write(data)
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self._size += len(data)
+        self.written += len(data) // RECORD.size
+
+    def _rotate(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        name = f"journal-{time.strftime('%Y%m%d-%H%M%S')}-{self._seq:04d}.sdj"
+        self._seq += 1
+        self._fh = open(os.path.join(self.directory, name), "wb")
+        self._fh.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self._size = HEADER.size
+        self._opened = time.monotonic()
+        if self.max_files > 0:
+            for old in journal_files(self.directory)[:-self.max_files]:
+                os.remove(old)
+
+
+def journal_files(path: str) -> List[str]:
+    """Return the journal files of *path* (a file or a directory), oldest first."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "journal-*.sdj")))
+    return [path]
+
+
+def read_journal(path: str) -> np.ndarray:
+    """Load every event of *path* (file or directory) as a :data:`RECORD_DTYPE` array.
+
+    ``np.array(LEVELS)[events["level"]]`` gives the level names back.
+    """
+    parts = []
+    for name in journal_files(path):
+        with open(name, "rb") as fh:
+            header = fh.read(HEADER.size)
+            if len(header) < HEADER.size:
+                continue
+            magic, version, size = HEADER.unpack(header)
+            if magic != MAGIC or size != RECORD.size:
+                raise ValueError(f"{name}: not a version {VERSION} journal")
+            raw = fh.read()
+        usable = len(raw) - len(raw) % RECORD.size  # crash mid-write
+        parts.append(np.frombuffer(raw[:usable], dtype=RECORD_DTYPE))
+    if not parts:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.concatenate(parts)
@@ -0,0 +1,46 @@
+"""Compact NumPy representation of MediaPipe landmarks.
+
+Each frame's landmarks are converted once into contiguous ``float32``
+arrays — ``(478, 3)`` for the face and ``(21, 3)`` per hand, columns
+``x, y, z`` — so the detectors can work with fancy indexing instead of
+walking protobuf objects attribute by attribute.
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+FACE_LANDMARKS = 478
+HAND_LANDMARKS = 21
+
+
+def landmarks_to_array(landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return an ``(N, 3)`` ``float32`` array of ``(x, y, z)`` for *landmarks*.
+
+    Parameters
+    ----------
+    landmarks
+        A sequence of objects with ``x``, ``y`` and ``z`` attributes (e.g.
+        ``NormalizedLandmarkList.landmark``).
+    out : np.ndarray | None
+        Optional preallocated ``(N, 3)`` ``float32`` destination.
+    """
+    n = len(landmarks)
+    flat = np.fromiter(
+        (v for p in landmarks for v in (p.x, p.y, p.z)),
+        dtype=np.float32, count=n * 3,
+    ).reshape(n, 3)
+    if out is None:
+        return flat
+    out[...] = flat
+    return out
+
+
+def face_to_array(landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert FaceMesh landmarks to a ``(478, 3)`` array."""
+    return landmarks_to_array(landmarks, out)
+
+
+def hands_to_arrays(hands: Iterable) -> List[np.ndarray]:
+    """Convert MediaPipe hand landmark lists to ``(21, 3)`` arrays."""
+    return [landmarks_to_array(h.landmark) for h in hands]
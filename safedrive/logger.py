@@ -1,14 +1,21 @@
 """Logging setup for SafeDrive.
 
 Replaces the old ``log_detection`` function (bug #6) with Python's
-standard ``logging`` module.
+standard ``logging`` module.  In asynchronous mode the root logger only
+enqueues records (``QueueHandler``); a ``QueueListener`` thread formats
+them and does the console / file I/O, so logging from the detection loop
+never waits on the disk.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 
 
-def setup_logging(log_dir: str | None = None, level: int = logging.INFO) -> None:
+def setup_logging(log_dir: str | None = None, level: int = logging.INFO,
+                  asynchronous: bool = False) -> logging.handlers.QueueListener | None:
     """Configure the root logger with a console and optional file handler.
 
     Parameters
@@ -18,6 +25,9 @@ def setup_logging(log_dir: str | None = None, level: int = logging.INFO) -> None
         is created there.
     level : int
         Logging level (default ``INFO``).
+    asynchronous : bool
+        Route records through a queue to a listener thread.  The listener
+        is returned and stopped (flushing pending records) at exit.
     """
     fmt = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     datefmt = "%Y-%m-%d %H:%M:%S"
@@ -31,4 +41,20 @@ def setup_logging(log_dir: str | None = None, level: int = logging.INFO) -> None
         )
         handlers.append(fh)
 
-    logging.basicConfig(level=level, format=fmt, datefmt=datefmt, handlers=handlers)
+    if not asynchronous:
+        logging.basicConfig(level=level, format=fmt, datefmt=datefmt, handlers=handlers)
+        return None
+
+    formatter = logging.Formatter(fmt, datefmt)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    # The queue carries the bare message (with any traceback merged into it
+    # by QueueHandler.prepare); the listener's handlers add the prefix.
+    enqueue = logging.handlers.QueueHandler(records)
+    enqueue.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[enqueue])
+    return listener
@@ -0,0 +1,404 @@
+"""ONNX Runtime phone classifier.
+
+Confirms the finger-tip heuristic of
+:mod:`safedrive.detectors.phone_detector` with the MobileNetV2 exported by
+``training/export_onnx.py``, run on a square crop around the hand.
+
+The heuristic stays in front as a cheap pre-filter: the CNN only runs for
+hands that pass it *and* lie near the face, so an idle driver costs
+nothing.  When the per-frame latency budget is used up, the remaining
+candidates keep their heuristic verdict.
+
+:class:`BatchedPhoneClassifier` is a micro-batching service: crops
+submitted by several hands and/or camera streams within a short window are
+classified in a single session run (the exported model has a dynamic batch
+axis).
+
+``onnxruntime`` is an optional dependency; it is only imported when a model
+path is configured.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from safedrive.detectors.phone_detector import detect_phone_usage_array
+from safedrive.pipeline import LatencyStats
+
+try:
+    import onnxruntime as ort
+except ImportError:  # optional dependency
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+# Same normalisation as training/dataset.py (ImageNet statistics).
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+# x / 255 normalised with mean/std, folded into one multiply-add on CHW.
+_SCALE = (1.0 / (255.0 * _STD)).reshape(3, 1, 1)
+_BIAS = (-_MEAN / _STD).reshape(3, 1, 1)
+
+
+def _create_session(model_path: str, threads: int):
+    if ort is None:
+        raise ImportError("onnxruntime is required for the phone classifier (pip install onnxruntime)")
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = max(1, int(threads))
+    opts.inter_op_num_threads = 1
+    opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(model_path, opts, providers=["CPUExecutionProvider"])
+
+
+def _normalize_into(crop: np.ndarray, out: np.ndarray) -> None:
+    """Write the ``(S, S, 3)`` uint8 *crop* into the ``(3, S, S)`` *out*."""
+    np.multiply(crop.transpose(2, 0, 1), _SCALE, out=out)
+    out += _BIAS
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def hand_crop_box(hand: np.ndarray, image_height: int, image_width: int,
+                  scale: float = 1.6) -> Optional[Tuple[int, int, int, int]]:
+    """Return a square pixel box ``(x0, y0, x1, y1)`` centred on *hand*.
+
+    The side is *scale* times the larger extent of the ``(21, 3)`` landmark
+    array, clipped to the image.  Returns ``None`` for an empty crop.
+    """
+    xs = hand[:, 0] * image_width
+    ys = hand[:, 1] * image_height
+    cx, cy = (xs.min() + xs.max()) * 0.5, (ys.min() + ys.max()) * 0.5
+    half = max(xs.max() - xs.min(), ys.max() - ys.min()) * scale * 0.5
+    x0, y0 = max(0, int(cx - half)), max(0, int(cy - half))
+    x1, y1 = min(image_width, int(cx + half) + 1), min(image_height, int(cy + half) + 1)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return x0, y0, x1, y1
+
+
+def hand_near_face(hand: np.ndarray, face: np.ndarray, margin: float = 0.25) -> bool:
+    """Return ``True`` if any *hand* landmark lies in the grown *face* box."""
+    lo = face[:, :2].min(axis=0)
+    hi = face[:, :2].max(axis=0)
+    pad = (hi - lo) * margin
+    pts = hand[:, :2]
+    return bool(np.any(np.all((pts >= lo - pad) & (pts <= hi + pad), axis=1)))
+
+
+class OnnxPhoneClassifier:
+    """Single-crop phone/no-phone classifier on one ONNX Runtime session.
+
+    The session is CPU-only with a fixed intra-op thread count, and the
+    input/output tensors are allocated once and bound with I/O binding, so
+    a call performs no allocation besides OpenCV's crop view.
+
+    Parameters
+    ----------
+    model_path : str
+        Path to ``phone_detector.onnx`` (``input`` -> ``logit``).
+    threads : int
+        ONNX Runtime intra-op threads.
+    input_size : int
+        Model input side in pixels.
+    """
+
+    def __init__(self, model_path: str, threads: int = 1, input_size: int = 224):
+        self.session = _create_session(model_path, threads)
+        self.input_size = input_size
+
+        self._crop = np.empty((input_size, input_size, 3), dtype=np.uint8)
+        self._input = np.empty((1, 3, input_size, input_size), dtype=np.float32)
+        self._output = np.empty((1, 1), dtype=np.float32)
+
+        self._binding = self.session.io_binding()
+        self._binding.bind_cpu_input(self.session.get_inputs()[0].name, self._input)
+        self._binding.bind_output(
+            self.session.get_outputs()[0].name, "cpu", 0, np.float32,
+            list(self._output.shape), self._output.ctypes.data,
+        )
+
+    def predict(self, rgb: np.ndarray, box: Tuple[int, int, int, int]) -> float:
+        """Return the phone probability for the *box* crop of *rgb*."""
+        x0, y0, x1, y1 = box
+        size = self.input_size
+        cv2.resize(rgb[y0:y1, x0:x1], (size, size), dst=self._crop, interpolation=cv2.INTER_LINEAR)
+        _normalize_into(self._crop, self._input[0])
+        self.session.run_with_iobinding(self._binding)
+        return float(_sigmoid(self._output[0, 0]))
+
+
+class BatchedPhoneClassifier:
+    """Micro-batching phone classifier shared by several callers.
+
+    Callers resize their crop on their own thread and :meth:`submit` it;
+    one service thread owns the ONNX session and, once a request arrives,
+    keeps collecting for up to *window_ms* (or *max_batch* crops) before
+    running them as one batch into a preallocated input tensor.
+
+    Parameters
+    ----------
+    session
+        ONNX Runtime session (``input`` with a dynamic batch axis).
+    input_size : int
+        Model input side in pixels.
+    max_batch : int
+        Largest batch run at once.
+    window_ms : float
+        Collection window after the first queued crop; ``0`` only batches
+        crops that are already waiting.
+    """
+
+    def __init__(self, session, input_size: int = 224, max_batch: int = 8, window_ms: float = 2.0):
+        self.session = session
+        self.input_size = input_size
+        self.max_batch = max(1, int(max_batch))
+        self.window = window_ms / 1000.0
+        self.stats = LatencyStats()
+        self.batch_sizes: Counter = Counter()
+        self._input_name = session.get_inputs()[0].name
+        self._input = np.empty((self.max_batch, 3, input_size, input_size), dtype=np.float32)
+        self._requests: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._serve, name="safedrive-phone", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_path(cls, model_path: str, threads: int = 1, input_size: int = 224, **kwargs):
+        return cls(_create_session(model_path, threads), input_size, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Stop the service thread; pending requests are cancelled."""
+        self._requests.put(None)
+        self._thread.join(timeout=1.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Runtime
+    # ------------------------------------------------------------------
+
+    def submit(self, rgb: np.ndarray, box: Tuple[int, int, int, int]) -> Future:
+        """Queue the *box* crop of *rgb*; the future yields its probability.
+
+        The crop is copied here, so *rgb* may be reused once this returns.
+        """
+        x0, y0, x1, y1 = box
+        size = self.input_size
+        crop = cv2.resize(rgb[y0:y1, x0:x1], (size, size), interpolation=cv2.INTER_LINEAR)
+        future: Future = Future()
+        self._requests.put((crop, future, time.perf_counter()))
+        return future
+
+    def predict(self, rgb: np.ndarray, box: Tuple[int, int, int, int]) -> float:
+        return self.submit(rgb, box).result()
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._requests.put(None)  # re-queue the stop marker for _serve
+                break
+            batch.append(item)
+        return batch
+
+    def _serve(self) -> None:
+        while True:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+            n = len(batch)
+            t0 = time.perf_counter()
+            for k, (crop, _, queued) in enumerate(batch):
+                self.stats.record("phone_queue", t0 - queued)
+                _normalize_into(crop, self._input[k])
+            try:
+                logits = self.session.run(None, {self._input_name: self._input[:n]})[0].reshape(-1)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            self.stats.record("phone_batch", time.perf_counter() - t0)
+            self.batch_sizes[n] += 1
+            for (_, future, _), logit in zip(batch, logits):
+                future.set_result(float(_sigmoid(logit)))
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].cancel()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> str:
+        """One-line batch-size / queueing-delay report for logging."""
+        batches = sum(self.batch_sizes.values())
+        crops = sum(size * count for size, count in self.batch_sizes.items())
+        snap = self.stats.snapshot()
+        queue_ms = snap.get("phone_queue", {})
+        run_ms = snap.get("phone_batch", {})
+        return (
+            f"phone batches={batches} crops={crops} mean_size={crops / batches if batches else 0.0:.2f} "
+            f"sizes={dict(sorted(self.batch_sizes.items()))} "
+            f"queue={queue_ms.get('mean', 0.0):.1f}/{queue_ms.get('max', 0.0):.1f}ms "
+            f"run={run_ms.get('mean', 0.0):.1f}/{run_ms.get('max', 0.0):.1f}ms"
+        )
+
+
+class PhoneDetector:
+    """Heuristic pre-filter + CNN confirmation under a latency budget.
+
+    With a :class:`BatchedPhoneClassifier` all candidate hands of a frame
+    are submitted together (one batch) and the budget becomes a deadline
+    for their results.
+
+    Parameters
+    ----------
+    classifier : OnnxPhoneClassifier | BatchedPhoneClassifier
+        Crop classifier (``predict(rgb, box) -> float``, optionally
+        ``submit(rgb, box) -> Future``).
+    threshold : float
+        Probability above which a crop counts as a phone.
+    budget_ms : float
+        CNN time allowed per frame; ``0`` = unlimited.
+    face_margin : float
+        Relative margin added around the face box for the proximity test.
+    """
+
+    def __init__(self, classifier, threshold: float = 0.5, budget_ms: float = 0.0, face_margin: float = 0.25):
+        self.classifier = classifier
+        self.threshold = threshold
+        self.budget = budget_ms / 1000.0
+        self.face_margin = face_margin
+        self.runs = 0
+        self.over_budget = 0
+        self._cost = 0.0
+
+    def detect(self, rgb: np.ndarray, face: Optional[np.ndarray], hands: Sequence[np.ndarray]) -> List[bool]:
+        """Return one phone verdict per ``(21, 3)`` hand array.
+
+        Hands failing the heuristic, or far from a detected face, are
+        ``False`` without running the CNN.  Without a face there is nothing
+        to be near, so heuristic-positive hands keep the heuristic verdict.
+        """
+        h, w = rgb.shape[:2]
+        verdicts = [False] * len(hands)
+        candidates = []
+        for i, hand in enumerate(hands):
+            if not detect_phone_usage_array(hand, h, w):
+                continue
+            if face is None:
+                verdicts[i] = True
+                continue
+            if not hand_near_face(hand, face, self.face_margin):
+                continue
+            box = hand_crop_box(hand, h, w)
+            if box is not None:
+                candidates.append((i, box))
+        if not candidates:
+            return verdicts
+        if hasattr(self.classifier, "submit"):
+            self._detect_batched(rgb, candidates, verdicts)
+        else:
+            self._detect_sequential(rgb, candidates, verdicts)
+        return verdicts
+
+    def _detect_sequential(self, rgb, candidates, verdicts) -> None:
+        spent = 0.0
+        for i, box in candidates:
+            if self.budget > 0 and spent + self._cost > self.budget:
+                # Out of budget: keep the heuristic verdict for this hand.
+                self.over_budget += 1
+                verdicts[i] = True
+                continue
+            t0 = time.perf_counter()
+            prob = self.classifier.predict(rgb, box)
+            elapsed = time.perf_counter() - t0
+            spent += elapsed
+            # Smoothed per-crop cost, used to predict whether the next one fits.
+            self._cost = elapsed if self.runs == 0 else 0.8 * self._cost + 0.2 * elapsed
+            self.runs += 1
+            verdicts[i] = prob >= self.threshold
+
+    def _detect_batched(self, rgb, candidates, verdicts) -> None:
+        deadline = time.perf_counter() + self.budget
+        futures = [(i, self.classifier.submit(rgb, box)) for i, box in candidates]
+        for i, future in futures:
+            timeout = max(0.0, deadline - time.perf_counter()) if self.budget > 0 else None
+            try:
+                prob = future.result(timeout=timeout)
+            except FutureTimeout:
+                self.over_budget += 1
+                verdicts[i] = True
+                continue
+            except CancelledError:
+                # Service shut down before running the crop: heuristic verdict.
+                verdicts[i] = True
+                continue
+            self.runs += 1
+            verdicts[i] = prob >= self.threshold
+
+
+def create_phone_classifier(pcfg, batched: bool = False):
+    """Build the classifier described by a ``PhoneModelConfig``.
+
+    A :class:`BatchedPhoneClassifier` is used when *batched* is set (it is
+    the only one safe to share between threads) or when
+    ``batch_window_ms > 0``.  Returns ``None`` when no model is configured
+    or it cannot be loaded.
+    """
+    if not pcfg.path:
+        return None
+    try:
+        if batched or pcfg.batch_window_ms > 0:
+            return BatchedPhoneClassifier.from_path(
+                pcfg.path, pcfg.threads, pcfg.input_size,
+                max_batch=pcfg.max_batch, window_ms=pcfg.batch_window_ms,
+            )
+        return OnnxPhoneClassifier(pcfg.path, pcfg.threads, pcfg.input_size)
+    except Exception as exc:
+        logger.warning("Phone model disabled (%s); using the heuristic only", exc)
+        return None
+
+
+def create_phone_detector(pcfg, classifier=None) -> Optional[PhoneDetector]:
+    """Build a :class:`PhoneDetector` from a ``PhoneModelConfig``.
+
+    *classifier* may be a shared :class:`BatchedPhoneClassifier`; by
+    default one is created from the config.  Returns ``None`` (heuristic
+    only) when no model is configured or it cannot be loaded.
+    """
+    if classifier is None:
+        classifier = create_phone_classifier(pcfg)
+    if classifier is None:
+        return None
+    logger.info("Phone model loaded: %s (%d thread(s), budget %.1f ms)",
+                pcfg.path, pcfg.threads, pcfg.latency_budget_ms)
+    return PhoneDetector(classifier, pcfg.threshold, pcfg.latency_budget_ms)
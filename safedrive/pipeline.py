@@ -0,0 +1,339 @@
+"""Threaded capture / inference / render pipeline.
+
+The detection loop is split into three stages joined by bounded queues:
+
+* a capture thread that reads frames from the camera,
+* an inference thread that runs MediaPipe, the detectors and the alarm,
+* the render stage (HUD + ``imshow``), which stays on the main thread
+  because most OpenCV GUI backends require it.
+
+Queues drop the *oldest* item when full so each stage always works on
+the freshest frame; a slow display can never delay the alarm decision.
+For offline replay, non-dropping queues are used instead so that every
+frame is processed, and the end of the stream is signalled with
+:data:`EOS`.
+
+Frame images can come from a :class:`FramePool` so that steady-state
+capture allocates nothing: the capture thread reads into a free buffer
+(``cap.read(image=buf)``) and ownership then travels with the
+:class:`Frame` — capture, inference, render — until the last stage (or a
+queue evicting the frame) calls :meth:`Frame.release`.  A buffer is
+therefore never overwritten while a later stage still reads or draws on
+it.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+#: End-of-stream marker pushed by :class:`CaptureThread` and forwarded by
+#: :class:`StageWorker` when the source is exhausted.
+EOS = object()
+
+
+@dataclass
+class Frame:
+    """A captured frame travelling through the pipeline.
+
+    ``timestamp`` is the capture time from the source clock (wall clock for
+    a camera, PTS for a file) and is used by the detectors' timers.
+    ``stamps`` records ``time.perf_counter()`` when the frame leaves each
+    stage, for latency accounting.
+    """
+
+    index: int
+    timestamp: float
+    image: Any
+    result: Any = None
+    stamps: Dict[str, float] = field(default_factory=dict)
+    pool: Any = None
+
+    def release(self) -> None:
+        """Return :attr:`image` to its :class:`FramePool` (idempotent).
+
+        Called by whichever stage owns the frame last; the image must not
+        be used afterwards.
+        """
+        pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.release(self.image)
+
+
+def release_frame(item) -> None:
+    """``on_drop`` callback for :class:`DropQueue`: release evicted frames."""
+    if isinstance(item, Frame):
+        item.release()
+
+
+class FramePool:
+    """Free list of reusable frame buffers.
+
+    Buffers are not allocated up front: the first frames are read into new
+    arrays which, once released, are kept for reuse (up to *size*).  When
+    every buffer is in flight :meth:`acquire` returns ``None`` and the
+    caller allocates a new frame rather than waiting, so a stalled
+    consumer can never block capture.  :attr:`allocations` counts those
+    new frames; it stops growing once the pool has warmed up.
+
+    Parameters
+    ----------
+    size : int
+        Buffers kept; should cover every frame that can be in flight at
+        once (queued, being read, processed or rendered).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._free: List[Any] = []
+        self._lock = threading.Lock()
+        self.allocations = 0
+
+    def acquire(self):
+        """Return a free buffer, or ``None`` if there is none."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            self.allocations += 1
+            return None
+
+    def release(self, buf) -> None:
+        """Give *buf* back; extra buffers beyond *size* are discarded."""
+        if buf is None:
+            return
+        with self._lock:
+            if len(self._free) < self.size:
+                self._free.append(buf)
+
+
+class DropQueue:
+    """Bounded FIFO that discards the oldest item instead of blocking.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of queued items (default 1: latest frame only).
+    drop : bool
+        If ``False`` the queue never drops: :meth:`put` blocks instead
+        (used for offline replay, where every frame must be processed).
+    on_drop : callable | None
+        Called with each evicted item (e.g. :func:`release_frame`).
+    """
+
+    def __init__(self, maxsize: int = 1, drop: bool = True,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._drop = drop
+        self._on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item, timeout: Optional[float] = None) -> bool:
+        """Enqueue *item*, evicting the oldest entry if the queue is full.
+
+        In non-dropping mode this blocks for up to *timeout* seconds and
+        returns ``False`` if the item could not be queued.
+        """
+        if not self._drop:
+            try:
+                self._queue.put(item, timeout=timeout)
+                return True
+            except queue.Full:
+                return False
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return True
+                except queue.Full:
+                    try:
+                        evicted = self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        continue
+                    if self._on_drop is not None:
+                        self._on_drop(evicted)
+
+    def get(self, timeout: Optional[float] = None):
+        """Return the next item, or ``None`` if *timeout* expires."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LatencyStats:
+    """Thread-safe per-stage latency counters (milliseconds).
+
+    Parameters
+    ----------
+    telemetry : Telemetry | None
+        Also receives every sample, for its per-stage histograms.
+    """
+
+    def __init__(self, telemetry=None):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._telemetry = telemetry
+
+    def record(self, stage: str, seconds: float) -> None:
+        if self._telemetry is not None:
+            self._telemetry.record(stage, seconds)
+        ms = seconds * 1000.0
+        with self._lock:
+            s = self._stats.get(stage)
+            if s is None:
+                s = self._stats[stage] = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            s["count"] += 1
+            s["total"] += ms
+            s["last"] = ms
+            if ms > s["max"]:
+                s["max"] = ms
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a copy of the counters with a derived ``mean`` entry."""
+        with self._lock:
+            out = {}
+            for stage, s in self._stats.items():
+                out[stage] = dict(s, mean=s["total"] / s["count"] if s["count"] else 0.0)
+            return out
+
+    def summary(self) -> str:
+        """Return a one-line ``stage=mean/max ms`` summary for logging."""
+        parts = [
+            f"{stage}={s['mean']:.1f}/{s['max']:.1f}ms"
+            for stage, s in sorted(self.snapshot().items())
+        ]
+        return " ".join(parts)
+
+
+class CaptureThread(threading.Thread):
+    """Read frames from a ``cv2.VideoCapture``-like object into a queue.
+
+    Parameters
+    ----------
+    cap
+        Object exposing ``read() -> (ok, image)`` (and ``read(image=buf)``
+        when *pool* is given).
+    out_queue : DropQueue
+        Destination for captured :class:`Frame` objects.
+    stats : LatencyStats
+        Receives the ``capture`` stage timing.
+    clock : callable
+        Returns the timestamp of the frame just read (default
+        ``time.time``; offline sources pass their PTS clock).
+    pool : FramePool | None
+        Read into buffers from this pool (``cap.read(image=buf)``); the
+        frames then own their buffer until :meth:`Frame.release`.
+    """
+
+    def __init__(self, cap, out_queue: DropQueue, stats: LatencyStats,
+                 clock: Callable[[], float] = time.time, pool: Optional[FramePool] = None):
+        super().__init__(name="safedrive-capture", daemon=True)
+        self._cap = cap
+        self._out = out_queue
+        self._stats = stats
+        self._clock = clock
+        self._pool = pool
+        self._stop_event = threading.Event()
+        self.finished = threading.Event()
+
+    def _put(self, item) -> None:
+        while not self._out.put(item, timeout=0.1):
+            if self._stop_event.is_set():
+                release_frame(item)
+                return
+
+    def run(self) -> None:
+        index = 0
+        pool = self._pool
+        try:
+            while not self._stop_event.is_set():
+                t0 = time.perf_counter()
+                if pool is None:
+                    ok, image = self._cap.read()
+                else:
+                    buf = pool.acquire()
+                    ok, image = self._cap.read() if buf is None else self._cap.read(image=buf)
+                    if not ok:
+                        pool.release(buf)
+                    # A source returning another array (size change, decoder
+                    # without image=) drops *buf*; the new array joins the pool.
+                if not ok:
+                    break
+                t1 = time.perf_counter()
+                self._stats.record("capture", t1 - t0)
+                frame = Frame(index=index, timestamp=self._clock(), image=image, pool=pool)
+                frame.stamps["captured"] = t1
+                self._put(frame)
+                index += 1
+        finally:
+            self._put(EOS)
+            self.finished.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class StageWorker(threading.Thread):
+    """Pull frames from *in_queue*, apply *fn* and push them to *out_queue*.
+
+    *fn* receives the :class:`Frame` and may mutate it (typically by setting
+    ``frame.result``).  Its execution time is recorded under *name*.  The
+    worker exits after forwarding :data:`EOS`.  Without *out_queue* it is
+    the last stage and releases each frame once *fn* returns.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Frame], None],
+        in_queue: DropQueue,
+        out_queue: Optional[DropQueue],
+        stats: LatencyStats,
+    ):
+        super().__init__(name=f"safedrive-{name}", daemon=True)
+        self._stage = name
+        self._fn = fn
+        self._in = in_queue
+        self._out = out_queue
+        self._stats = stats
+        self._stop_event = threading.Event()
+
+    def _forward(self, item) -> None:
+        if self._out is None:
+            release_frame(item)
+            return
+        while not self._out.put(item, timeout=0.1):
+            if self._stop_event.is_set():
+                release_frame(item)
+                return
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            frame = self._in.get(timeout=0.1)
+            if frame is None:
+                continue
+            if frame is EOS:
+                self._forward(EOS)
+                return
+            t0 = time.perf_counter()
+            try:
+                self._fn(frame)
+            except Exception:
+                logger.exception("Stage %s failed on frame %d", self._stage, frame.index)
+                frame.release()
+                continue
+            t1 = time.perf_counter()
+            self._stats.record(self._stage, t1 - t0)
+            frame.stamps[self._stage] = t1
+            if "captured" in frame.stamps:
+                self._stats.record(f"capture_to_{self._stage}", t1 - frame.stamps["captured"])
+            self._forward(frame)
+
+    def stop(self) -> None:
+        self._stop_event.set()
@@ -0,0 +1,228 @@
+"""Landmark session recorder: a compact alternative to recording video.
+
+Each frame's landmarks (``(478, 3)`` face, up to ``max_hands`` ``(21, 3)``
+hands), timestamp and alert level are copied into preallocated chunk
+arrays; full chunks are handed to a writer thread that saves them as
+compressed ``.npz`` shards, so the detection loop only pays for a few
+small ``memcpy`` s per frame.  A session directory looks like::
+
+    session-20240101-120000/
+        meta.json          # image size, max_hands, chunk_frames
+        chunk-00000.npz    # timestamp (C,), level (C,), face (C, 478, 3), hands (C, H, 21, 3)
+        chunk-00001.npz
+        ...
+
+Missing faces / hand slots are ``NaN`` and levels use the codes of
+:data:`safedrive.journal.LEVELS` (0 = no face), so :func:`load_session`
+returns exactly what :func:`safedrive.detectors.batch.score_sequence` and
+the detectors' ``*_array`` functions take — sessions can be replayed
+without MediaPipe.
+
+Usage::
+
+    recorder = SessionRecorder("recordings", image_height=480, image_width=640).start()
+    recorder.record(timestamp, face, hands, level)
+    recorder.close()
+    session = load_session(recorder.session_dir)
+"""
+
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from safedrive.journal import LEVELS
+from safedrive.landmarks import FACE_LANDMARKS, HAND_LANDMARKS
+
+logger = logging.getLogger(__name__)
+
+_LEVEL_CODES = {name: i for i, name in enumerate(LEVELS)}
+
+
+class _Chunk:
+    """Preallocated arrays for *size* frames."""
+
+    __slots__ = ("timestamp", "level", "face", "hands", "n")
+
+    def __init__(self, size: int, max_hands: int):
+        self.timestamp = np.empty(size, dtype=np.float64)
+        self.level = np.empty(size, dtype=np.uint8)
+        self.face = np.empty((size, FACE_LANDMARKS, 3), dtype=np.float32)
+        self.hands = np.empty((size, max_hands, HAND_LANDMARKS, 3), dtype=np.float32)
+        self.n = 0
+
+
+class SessionRecorder:
+    """Record per-frame landmarks into compressed ``.npz`` shards.
+
+    Parameters
+    ----------
+    directory : str
+        Parent directory; a ``session-<date>-<time>`` sub-directory is
+        created on :meth:`start`.
+    image_height, image_width : int
+        Frame size, stored in ``meta.json`` (the phone heuristic needs it).
+    chunk_frames : int
+        Frames per shard (default: 30 s at 30 FPS).
+    max_hands : int
+        Hand slots per frame; extra hands are not recorded.
+    max_pending : int
+        Full chunks allowed to wait for the writer; beyond that, frames are
+        counted in :attr:`dropped` instead of recorded.
+    """
+
+    def __init__(self, directory: str, image_height: int = 0, image_width: int = 0,
+                 chunk_frames: int = 900, max_hands: int = 2, max_pending: int = 2):
+        self.directory = directory
+        self.image_height = image_height
+        self.image_width = image_width
+        self.chunk_frames = chunk_frames
+        self.max_hands = max_hands
+        self.session_dir: Optional[str] = None
+        self.recorded = 0
+        self.dropped = 0
+        # Chunk pool: the one being filled plus max_pending for the writer.
+        self._free: "queue.Queue[_Chunk]" = queue.Queue()
+        for _ in range(max_pending + 1):
+            self._free.put(_Chunk(chunk_frames, max_hands))
+        self._full: "queue.Queue[Optional[_Chunk]]" = queue.Queue()
+        self._current: Optional[_Chunk] = None
+        self._index = 0
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "SessionRecorder":
+        self.session_dir = os.path.join(self.directory, time.strftime("session-%Y%m%d-%H%M%S"))
+        os.makedirs(self.session_dir, exist_ok=True)
+        meta = {
+            "image_height": self.image_height,
+            "image_width": self.image_width,
+            "chunk_frames": self.chunk_frames,
+            "max_hands": self.max_hands,
+            "levels": list(LEVELS),
+        }
+        with open(os.path.join(self.session_dir, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+        self._current = self._free.get_nowait()
+        self._thread = threading.Thread(target=self._run, name="safedrive-recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Write the partial last chunk and wait for the writer."""
+        if self._thread is None:
+            return
+        if self._current is not None and self._current.n:
+            self._full.put(self._current)
+        self._current = None
+        self._full.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Runtime
+    # ------------------------------------------------------------------
+
+    def record(self, timestamp: float, face: Optional[np.ndarray], hands: Sequence[np.ndarray],
+               level: Optional[str]) -> None:
+        """Copy one frame into the current chunk; never blocks on I/O.
+
+        Frames arriving while every chunk waits for the writer, or outside
+        :meth:`start` / :meth:`close`, are counted in :attr:`dropped`.
+        """
+        chunk = self._current
+        if chunk is None:
+            if self._thread is None:
+                self.dropped += 1
+                return
+            try:  # writer was behind: resume as soon as a chunk is free
+                chunk = self._current = self._free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return
+        i = chunk.n
+        chunk.timestamp[i] = timestamp
+        chunk.level[i] = _LEVEL_CODES.get(level, 0)
+        if face is None:
+            chunk.face[i] = np.nan
+        else:
+            chunk.face[i] = face
+        slots = chunk.hands[i]
+        k = min(len(hands), self.max_hands)
+        for j in range(k):
+            slots[j] = hands[j]
+        if k < self.max_hands:
+            slots[k:] = np.nan
+        chunk.n = i + 1
+        self.recorded += 1
+        if chunk.n == self.chunk_frames:
+            self._full.put(chunk)
+            try:
+                self._current = self._free.get_nowait()
+            except queue.Empty:
+                self._current = None
+
+    def _run(self) -> None:
+        while True:
+            chunk = self._full.get()
+            if chunk is None:
+                return
+            try:
+                self._write(chunk)
+            except OSError:
+                logger.exception("Cannot write chunk %d to %s", self._index, self.session_dir)
+            self._index += 1
+            chunk.n = 0
+            self._free.put(chunk)
+
+    def _write(self, chunk: _Chunk) -> None:
+        n = chunk.n
+        path = os.path.join(self.session_dir, f"chunk-{self._index:05d}.npz")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(
+                fh, timestamp=chunk.timestamp[:n], level=chunk.level[:n],
+                face=chunk.face[:n], hands=chunk.hands[:n],
+            )
+        os.replace(tmp, path)
+
+
+def load_session(session_dir: str) -> Dict[str, object]:
+    """Load a recorded session.
+
+    Returns a dict with ``meta`` (the ``meta.json`` content) and the
+    concatenated ``timestamp`` ``(T,)``, ``level`` ``(T,)``, ``face``
+    ``(T, 478, 3)`` and ``hands`` ``(T, H, 21, 3)`` arrays.
+    """
+    with open(os.path.join(session_dir, "meta.json"), "r", encoding="utf-8") as fh:
+        meta = json.load(fh)
+    columns = {"timestamp": [], "level": [], "face": [], "hands": []}
+    for path in sorted(glob.glob(os.path.join(session_dir, "chunk-*.npz"))):
+        with np.load(path) as chunk:
+            for name, parts in columns.items():
+                parts.append(chunk[name])
+    out: Dict[str, object] = {"meta": meta}
+    h = meta["max_hands"]
+    empty = {
+        "timestamp": np.empty(0, np.float64), "level": np.empty(0, np.uint8),
+        "face": np.empty((0, FACE_LANDMARKS, 3), np.float32),
+        "hands": np.empty((0, h, HAND_LANDMARKS, 3), np.float32),
+    }
+    for name, parts in columns.items():
+        out[name] = np.concatenate(parts) if parts else empty[name]
+    return out
@@ -0,0 +1,264 @@
+"""Landmark replay and threshold tuning without MediaPipe.
+
+Replays sessions written by :class:`~safedrive.recorder.SessionRecorder`
+through the detectors and the driver state machine, with the recorded
+timestamps:
+
+* per-frame features come from
+  :func:`~safedrive.detectors.batch.score_sequence` (the vectorised
+  equivalents of ``detect_eyes_closed``, ``detect_yawning``,
+  ``check_head_position`` and ``detect_phone_usage``, tested to agree
+  with them);
+* :class:`~safedrive.session.DriverState` then advances the timers frame
+  by frame and applies ``determine_alert_level``.
+
+An hour of driving replays in well under a second, so
+:func:`grid_search` can sweep :class:`~safedrive.config.DetectionConfig`
+thresholds over a process pool.  Alerts are the contiguous runs at or
+above ``--min-level``; when a session directory holds a ``labels.json``
+(``{"events": [{"start": s, "end": s}, ...]}``, times on the recording
+clock) they are scored against those events: an alert is a true positive
+if it overlaps an event (within ``--slack`` seconds), and an event is
+recalled if any alert overlaps it.
+
+Usage::
+
+    python -m safedrive replay --session recordings/session-20240101-120000 \\
+        --grid eye_closed_threshold=0.015,0.02,0.025 --grid eyes_closed_time_threshold=1:4:1
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from safedrive.config import DetectionConfig, load_config
+from safedrive.detectors.batch import score_sequence
+from safedrive.detectors.head_detector import HeadState
+from safedrive.journal import LEVELS
+from safedrive.recorder import load_session
+from safedrive.session import DriverState, FrameFeatures
+
+logger = logging.getLogger(__name__)
+
+_LEVEL_CODES = {name: i for i, name in enumerate(LEVELS)}
+LABELS_FILE = "labels.json"
+
+# Sessions loaded once per worker process by _init_worker().
+_worker: Dict[str, object] = {}
+
+
+def load_labels(session_dir: str) -> Optional[np.ndarray]:
+    """Return the ``(N, 2)`` labelled ``(start, end)`` events of a session, or ``None``."""
+    path = os.path.join(session_dir, LABELS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as fh:
+        events = json.load(fh)["events"]
+    return np.array([[e["start"], e["end"]] for e in events], dtype=np.float64).reshape(-1, 2)
+
+
+def replay(session: Dict[str, object], det) -> Dict[str, np.ndarray]:
+    """Replay one loaded session with the thresholds of *det*.
+
+    Returns ``(T,)`` arrays: ``timestamp``, ``level`` (codes of
+    :data:`safedrive.journal.LEVELS`, 0 = no face), ``eyes_closed``,
+    ``yawning`` and ``phone``.
+    """
+    meta = session["meta"]
+    ts = session["timestamp"]
+    scores = score_sequence(session["face"], session["hands"], det,
+                            meta["image_height"] or 480, meta["image_width"] or 640)
+    # Python lists: per-element reads are much cheaper than on arrays.
+    face, eyes, yawning, phone = (scores[k].tolist() for k in ("face", "eyes_closed", "yawning", "phone"))
+    turned, tilted = scores["turned"].tolist(), scores["tilted"].tolist()
+
+    state = DriverState(det)
+    head = HeadState()  # determine_alert_level only reads turned / tilted
+    features = FrameFeatures(head_state=head)
+    level_codes = _LEVEL_CODES
+    levels = np.zeros(len(ts), dtype=np.uint8)
+    for i, now in enumerate(ts.tolist()):
+        features.face = face[i]
+        features.eyes_closed = eyes[i]
+        features.is_yawning = yawning[i]
+        features.phone = phone[i]
+        head.turned = turned[i]
+        head.tilted = tilted[i]
+        levels[i] = level_codes[state.update(features, now)]
+    return {
+        "timestamp": ts,
+        "level": levels,
+        "eyes_closed": scores["eyes_closed"],
+        "yawning": scores["yawning"],
+        "phone": scores["phone"],
+    }
+
+
+def episodes(mask: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """Return the ``(N, 2)`` ``(start, end)`` timestamps of the ``True`` runs of *mask*."""
+    if not mask.any():
+        return np.empty((0, 2))
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return np.stack([ts[starts], ts[ends]], axis=1)
+
+
+def match_events(alerts: np.ndarray, labels: np.ndarray, slack: float = 0.0) -> Tuple[int, int]:
+    """Return ``(alerts overlapping a label, labels overlapped by an alert)``."""
+    if not len(alerts) or not len(labels):
+        return 0, 0
+    overlap = ((alerts[:, None, 0] <= labels[None, :, 1] + slack)
+               & (alerts[:, None, 1] >= labels[None, :, 0] - slack))
+    return int(overlap.any(axis=1).sum()), int(overlap.any(axis=0).sum())
+
+
+def evaluate(sessions: Sequence[Tuple[Dict[str, object], Optional[np.ndarray]]], det,
+             min_level: str = "DANGER", slack: float = 1.0) -> Dict[str, float]:
+    """Replay every ``(session, labels)`` pair and aggregate alert metrics.
+
+    Returns ``alerts``, ``alert_seconds``, ``labels``, ``true_alerts``,
+    ``recalled``, ``precision``, ``recall`` and ``f1`` (``NaN`` without
+    labels).
+    """
+    min_code = _LEVEL_CODES[min_level]
+    alerts = alert_seconds = n_labels = true_alerts = recalled = 0
+    labelled = False
+    for session, labels in sessions:
+        result = replay(session, det)
+        runs = episodes(result["level"] >= min_code, result["timestamp"])
+        alerts += len(runs)
+        alert_seconds += float((runs[:, 1] - runs[:, 0]).sum())
+        if labels is not None:
+            labelled = True
+            tp, hit = match_events(runs, labels, slack)
+            true_alerts += tp
+            recalled += hit
+            n_labels += len(labels)
+
+    nan = float("nan")
+    precision = true_alerts / alerts if labelled and alerts else nan
+    recall = recalled / n_labels if labelled and n_labels else nan
+    f1 = nan
+    if precision == precision and recall == recall:  # neither is NaN
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "alerts": alerts, "alert_seconds": alert_seconds, "labels": n_labels,
+        "true_alerts": true_alerts, "recalled": recalled,
+        "precision": precision, "recall": recall, "f1": f1,
+    }
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[float]]:
+    """Parse ``name=v1,v2,...`` or ``name=start:stop:step`` (stop included) specs."""
+    valid = {f.name for f in fields(DetectionConfig)}
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in valid:
+            raise ValueError(f"unknown DetectionConfig field: {name!r}")
+        if ":" in values:
+            start, stop, step = (float(v) for v in values.split(":"))
+            count = int(round((stop - start) / step)) + 1
+            grid[name] = [round(start + i * step, 10) for i in range(count)]
+        else:
+            grid[name] = [float(v) for v in values.split(",")]
+    return grid
+
+
+def combinations(base, grid: Dict[str, List[float]]) -> List:
+    """Return one :class:`DetectionConfig` per point of *grid* around *base*."""
+    names = list(grid)
+    return [replace(base, **dict(zip(names, point))) for point in itertools.product(*grid.values())]
+
+
+def _load(session_dirs: Sequence[str]):
+    return [(load_session(d), load_labels(d)) for d in session_dirs]
+
+
+def _init_worker(session_dirs: Sequence[str], min_level: str, slack: float) -> None:
+    _worker["sessions"] = _load(session_dirs)
+    _worker["min_level"] = min_level
+    _worker["slack"] = slack
+
+
+def _evaluate_in_worker(det) -> Dict[str, float]:
+    return evaluate(_worker["sessions"], det, _worker["min_level"], _worker["slack"])
+
+
+def grid_search(session_dirs: Sequence[str], base, grid: Dict[str, List[float]],
+                workers: Optional[int] = None, min_level: str = "DANGER",
+                slack: float = 1.0) -> List[Dict[str, object]]:
+    """Evaluate every point of *grid* on a process pool.
+
+    Each worker loads the sessions once; ``workers=1`` runs in-process.
+    Returns one row per point: the swept values followed by the
+    :func:`evaluate` metrics.
+    """
+    configs = combinations(base, grid)
+    if workers == 1:
+        sessions = _load(session_dirs)
+        metrics = [evaluate(sessions, det, min_level, slack) for det in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(list(session_dirs), min_level, slack)) as pool:
+            chunk = max(1, len(configs) // (4 * (workers or os.cpu_count() or 1)))
+            metrics = list(pool.map(_evaluate_in_worker, configs, chunksize=chunk))
+    return [
+        dict({name: getattr(det, name) for name in grid}, **m)
+        for det, m in zip(configs, metrics)
+    ]
+
+
+def format_table(rows: List[Dict[str, object]]) -> str:
+    if not rows:
+        return "(no results)"
+    keys = list(rows[0])
+    lines = ["  ".join(f"{k:>14}" for k in keys)]
+    for row in rows:
+        lines.append("  ".join(
+            f"{v:>14.4g}" if isinstance(v, float) else f"{v:>14}" for v in row.values()
+        ))
+    return "\n".join(lines)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--session", action="append", required=True,
+                        help="Recorded session directory (repeatable)")
+    parser.add_argument("--config", default=None, help="Path to config.yaml (base thresholds)")
+    parser.add_argument("--grid", action="append", default=[],
+                        help="Threshold sweep: name=v1,v2,... or name=start:stop:step (repeatable)")
+    parser.add_argument("--min-level", choices=("WARNING", "DANGER"), default="DANGER",
+                        help="Lowest level counted as an alert")
+    parser.add_argument("--slack", type=float, default=1.0, help="Event matching tolerance (s)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", default=None, help="Write all rows to this CSV file")
+    parser.add_argument("--top", type=int, default=20, help="Rows printed (best F1, then fewest alerts)")
+
+
+def run(args: argparse.Namespace) -> None:
+    cfg = load_config(args.config)
+    grid = parse_grid(args.grid)
+    n = int(np.prod([len(v) for v in grid.values()])) if grid else 1
+    logger.info("Replaying %d session(s) for %d threshold combination(s)", len(args.session), n)
+    t0 = time.perf_counter()
+    rows = grid_search(args.session, cfg.detection, grid, args.workers, args.min_level, args.slack)
+    logger.info("Sweep done in %.1fs", time.perf_counter() - t0)
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        logger.info("Wrote %s", args.output)
+    ranked = sorted(rows, key=lambda r: (-(r["f1"] if r["f1"] == r["f1"] else -1.0), r["alerts"]))
+    print(format_table(ranked[:args.top]))
@@ -0,0 +1,164 @@
+"""Face-ROI cropping and downscaled inference.
+
+At high capture resolutions most of the CPU goes into running MediaPipe on
+pixels that are not the driver's face.  The adapters below wrap a MediaPipe
+solution (anything with ``process(rgb)``/``close()``) so they can be passed
+to :class:`~safedrive.inference.ConcurrentLandmarker` unchanged:
+
+* :class:`RoiFaceMesh` crops a square around the face found on the previous
+  frame, upscales it to a fixed size, runs FaceMesh on the crop and remaps
+  the landmarks to full-frame normalised coordinates in place.  A full-frame
+  (optionally downscaled) search is only done when tracking is lost, with a
+  separate model so the tracking model only ever sees crops.
+* :class:`DownscaledSolution` feeds a resized frame to a model whose outputs
+  are normalised coordinates (e.g. Hands), which is resolution-independent.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+
+from safedrive.inference import landmark_bbox
+
+
+def downscale(rgb, max_width: int):
+    """Return *rgb* resized to *max_width* (aspect kept), or *rgb* itself."""
+    h, w = rgb.shape[:2]
+    if max_width <= 0 or w <= max_width:
+        return rgb
+    new_h = max(1, round(h * max_width / w))
+    return cv2.resize(rgb, (max_width, new_h), interpolation=cv2.INTER_AREA)
+
+
+class FaceRoiTracker:
+    """Keep a square face region of interest from the last landmarks.
+
+    Near the frame edges the box is shifted (not clipped) so it stays
+    square: a clipped box would be stretched when resized for inference.
+
+    Parameters
+    ----------
+    margin : float
+        Extra space around the landmark bounding box, relative to its size.
+    min_size : int
+        Minimum side of the ROI in pixels.
+    """
+
+    def __init__(self, margin: float = 0.3, min_size: int = 64):
+        self.margin = margin
+        self.min_size = min_size
+        self._bbox: Optional[Tuple[float, float, float, float]] = None
+
+    @property
+    def tracking(self) -> bool:
+        return self._bbox is not None
+
+    def update(self, landmarks) -> None:
+        """Store the face box from *landmarks* (``None`` = tracking lost)."""
+        self._bbox = landmark_bbox(landmarks) if landmarks is not None else None
+
+    def reset(self) -> None:
+        self._bbox = None
+
+    def box(self, width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+        """Return the pixel ROI ``(x0, y0, x1, y1)`` for a *width* x *height* frame."""
+        if self._bbox is None:
+            return None
+        bx0, by0, bx1, by1 = self._bbox
+        cx = (bx0 + bx1) / 2 * width
+        cy = (by0 + by1) / 2 * height
+        side = max((bx1 - bx0) * width, (by1 - by0) * height) * (1 + 2 * self.margin)
+        side = min(round(max(side, self.min_size)), width, height)
+        if side < 2:
+            return None
+        x0 = min(max(0, round(cx - side / 2)), width - side)
+        y0 = min(max(0, round(cy - side / 2)), height - side)
+        return (x0, y0, x0 + side, y0 + side)
+
+
+def remap_landmarks(landmarks, box: Tuple[int, int, int, int], width: int, height: int) -> None:
+    """Convert crop-normalised *landmarks* to full-frame coordinates in place.
+
+    MediaPipe's ``z`` uses the same scale as ``x`` so it is rescaled by the
+    crop-to-frame width ratio.
+    """
+    x0, y0, x1, y1 = box
+    sx = (x1 - x0) / width
+    sy = (y1 - y0) / height
+    ox = x0 / width
+    oy = y0 / height
+    for p in landmarks:
+        p.x = p.x * sx + ox
+        p.y = p.y * sy + oy
+        p.z = p.z * sx
+
+
+class RoiFaceMesh:
+    """FaceMesh adapter that runs on a tracked, upscaled face crop.
+
+    Parameters
+    ----------
+    model
+        A FaceMesh-like object with ``process(rgb)`` and ``close()``, fed
+        the face crops only.
+    search_model
+        Model for the full-frame search when tracking is lost, typically a
+        ``static_image_mode`` FaceMesh: feeding it the full frame keeps the
+        crop model's internal tracking in one coordinate frame.
+    roi_size : int
+        Side, in pixels, the face crop is resized to before inference.
+    margin : float
+        See :class:`FaceRoiTracker`.
+    search_width : int
+        Width the full frame is downscaled to for the fallback search
+        (``0`` = full resolution).
+    """
+
+    def __init__(self, model, search_model, roi_size: int = 256, margin: float = 0.3,
+                 search_width: int = 0):
+        self._model = model
+        self._search_model = search_model
+        self.roi_size = roi_size
+        self.search_width = search_width
+        self.tracker = FaceRoiTracker(margin)
+        self.roi_hits = 0
+        self.full_searches = 0
+
+    def process(self, rgb):
+        h, w = rgb.shape[:2]
+        box = self.tracker.box(w, h)
+        if box is not None:
+            x0, y0, x1, y1 = box
+            crop = cv2.resize(rgb[y0:y1, x0:x1], (self.roi_size, self.roi_size),
+                              interpolation=cv2.INTER_LINEAR)
+            res = self._model.process(crop)
+            if res.multi_face_landmarks:
+                lm = res.multi_face_landmarks[0].landmark
+                remap_landmarks(lm, box, w, h)
+                self.tracker.update(lm)
+                self.roi_hits += 1
+                return res
+
+        # Tracking lost (or never acquired): search the whole frame.
+        self.full_searches += 1
+        res = self._search_model.process(downscale(rgb, self.search_width))
+        self.tracker.update(res.multi_face_landmarks[0].landmark if res.multi_face_landmarks else None)
+        return res
+
+    def close(self) -> None:
+        self._model.close()
+        self._search_model.close()
+
+
+class DownscaledSolution:
+    """Run a normalised-output MediaPipe model on a downscaled frame."""
+
+    def __init__(self, model, max_width: int):
+        self._model = model
+        self.max_width = max_width
+
+    def process(self, rgb):
+        return self._model.process(downscale(rgb, self.max_width))
+
+    def close(self) -> None:
+        self._model.close()
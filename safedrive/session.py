@@ -0,0 +1,178 @@
+"""Per-driver session state: eye-closure, yawn and phone timers.
+
+The per-frame pipeline is split in two:
+
+* :func:`extract_features` turns one frame's landmark arrays into a
+  :class:`FrameFeatures` record (stateless);
+* :class:`DriverState` advances the timers with that record and a
+  timestamp and returns the alert level (stateful, no I/O).
+
+Both classes use ``__slots__`` and plain attribute access so the state
+machine is cheap enough for offline replays of millions of frames, and can
+be reused by the live loop, batch workers, the multi-stream supervisor and
+tests alike.
+"""
+
+from typing import Dict, Optional, Sequence
+
+from safedrive.detectors.eye_detector import detect_eyes_closed_array
+from safedrive.detectors.head_detector import check_head_position_array
+from safedrive.detectors.mouth_detector import detect_yawning_array
+from safedrive.detectors.phone_detector import detect_phone_usage_array
+
+
+def determine_alert_level(eyes_closed_time, is_yawning, head_state, phone_time, cfg):
+    danger = 0
+    if eyes_closed_time > cfg.eyes_closed_time_threshold * 0.8:
+        danger += 2
+    elif eyes_closed_time > cfg.eyes_closed_time_threshold * 0.5:
+        danger += 1
+    if is_yawning:
+        danger += 1
+    if head_state["turned"] and head_state["tilted"]:
+        danger += 2
+    elif head_state["turned"] or head_state["tilted"]:
+        danger += 1
+    if phone_time > cfg.phone_detection_threshold:
+        danger += 3
+    elif phone_time > 0:
+        danger += 1
+    if danger >= 3:
+        return "DANGER"
+    if danger >= 1:
+        return "WARNING"
+    return "NORMAL"
+
+
+class FrameFeatures:
+    """Detector outputs for one frame.
+
+    Attributes
+    ----------
+    face : bool
+        Whether a face was found (the other face fields are meaningless
+        otherwise).
+    eyes_closed, is_yawning : bool
+    head_state : HeadState | None
+        As returned by :func:`check_head_position` (reads like a dict).
+    phone : bool
+        Whether any hand was flagged as holding a phone.
+    """
+
+    __slots__ = ("face", "eyes_closed", "is_yawning", "head_state", "phone")
+
+    def __init__(self, face: bool = False, eyes_closed: bool = False, is_yawning: bool = False,
+                 head_state: Optional[Dict[str, object]] = None, phone: bool = False):
+        self.face = face
+        self.eyes_closed = eyes_closed
+        self.is_yawning = is_yawning
+        self.head_state = head_state
+        self.phone = phone
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"FrameFeatures({fields})"
+
+
+def extract_features(face, hands: Sequence, image_height: int, image_width: int, det,
+                     phone: Optional[bool] = None) -> FrameFeatures:
+    """Run the detectors on one frame's landmark arrays.
+
+    Parameters
+    ----------
+    face : np.ndarray | None
+        ``(478, 3)`` face landmarks, or ``None`` when no face was found.
+    hands : sequence of np.ndarray
+        ``(21, 3)`` arrays, one per detected hand.
+    image_height, image_width : int
+        Frame size (for the phone heuristic).
+    det : DetectionConfig
+        Detection thresholds.
+    phone : bool | None
+        Phone verdict computed by the caller (e.g. the ONNX classifier);
+        ``None`` runs the finger-tip heuristic on *hands*.
+    """
+    if phone is None:
+        phone = any(detect_phone_usage_array(hand, image_height, image_width) for hand in hands)
+    if face is None:
+        return FrameFeatures(phone=phone)
+    return FrameFeatures(
+        True,
+        detect_eyes_closed_array(face, det.eye_closed_threshold),
+        detect_yawning_array(face, det.mouth_aspect_ratio_threshold, det.mouth_open_threshold),
+        check_head_position_array(face, det.head_rotation_threshold, det.head_tilt_threshold),
+        phone,
+    )
+
+
+class DriverState:
+    """Timers and counters for one driver.
+
+    Parameters
+    ----------
+    det : DetectionConfig
+        Thresholds passed to :func:`determine_alert_level`.
+    """
+
+    __slots__ = (
+        "det", "eyes_closed_start", "eyes_closed_time", "yawn_count",
+        "consecutive_yawns", "last_yawn_time", "phone_start", "phone_time",
+    )
+
+    def __init__(self, det):
+        self.det = det
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all timers and counters (e.g. driver change)."""
+        self.eyes_closed_start: Optional[float] = None
+        self.eyes_closed_time = 0.0
+        self.yawn_count = 0
+        self.consecutive_yawns = 0
+        self.last_yawn_time: Optional[float] = None
+        self.phone_start: Optional[float] = None
+        self.phone_time = 0.0
+
+    def update(self, features: FrameFeatures, now: float) -> Optional[str]:
+        """Advance the timers to *now* and return the alert level.
+
+        Returns ``None`` when no face was found (the level is undefined).
+        Timestamps are compared with ``is not None`` because replayed
+        recordings legitimately start at ``0.0``.
+        """
+        if self.last_yawn_time is None:
+            self.last_yawn_time = now
+
+        if features.phone:
+            if self.phone_start is None:
+                self.phone_start = now
+            self.phone_time = now - self.phone_start
+        else:
+            self.phone_start = None
+            self.phone_time = 0.0
+
+        if not features.face:
+            self.eyes_closed_start = None
+            self.eyes_closed_time = 0.0
+            return None
+
+        if features.is_yawning:
+            if now - self.last_yawn_time > 3.0:
+                self.yawn_count += 1
+                self.consecutive_yawns += 1
+                self.last_yawn_time = now
+        elif now - self.last_yawn_time > 10.0:
+            self.consecutive_yawns = 0
+
+        if features.eyes_closed:
+            if self.eyes_closed_start is None:
+                self.eyes_closed_start = now
+            self.eyes_closed_time = now - self.eyes_closed_start
+        else:
+            self.eyes_closed_start = None
+            self.eyes_closed_time = 0.0
+
+        return determine_alert_level(
+            self.eyes_closed_time, self.consecutive_yawns >= 2,
+            features.head_state, self.phone_time, self.det,
+        )
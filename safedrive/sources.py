@@ -0,0 +1,131 @@
+"""Frame sources: live camera, video file and image-sequence directory.
+
+All sources expose the subset of the ``cv2.VideoCapture`` API used by the
+pipeline (``read``, ``isOpened``, ``release``, ``set``, ``get``) plus
+``timestamp()``, which returns the time of the frame last returned by
+``read()``.  ``read(image=buf)`` decodes into *buf* when its size matches,
+as ``cv2.VideoCapture.read`` does, so captured frames can be recycled
+(:class:`~safedrive.pipeline.FramePool`):
+
+* :class:`CameraSource` — wall-clock time, as in the live loop.
+* :class:`VideoFileSource` — the decoder's presentation timestamp, so
+  timers stay correct when a file is processed faster than real time.
+* :class:`ImageDirSource` — ``index / fps``.
+"""
+
+import logging
+import os
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class CameraSource:
+    """Live camera; timestamps are ``time.time()`` at capture."""
+
+    live = True
+
+    def __init__(self, index: int):
+        self._cap = cv2.VideoCapture(index)
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def read(self, image=None):
+        return self._cap.read(image)
+
+    def timestamp(self) -> float:
+        return time.time()
+
+    def set(self, prop, value):
+        return self._cap.set(prop, value)
+
+    def get(self, prop):
+        return self._cap.get(prop)
+
+    def release(self) -> None:
+        self._cap.release()
+
+
+class VideoFileSource(CameraSource):
+    """Video file; timestamps come from the stream's PTS.
+
+    If the container reports no usable position, timestamps fall back to
+    ``frame_index / fps``.
+    """
+
+    live = False
+
+    def __init__(self, path: str):
+        self._cap = cv2.VideoCapture(path)
+        self._fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._index = -1
+        self._ts = 0.0
+
+    def read(self, image=None):
+        ok, image = self._cap.read(image)
+        if ok:
+            self._index += 1
+            pos_ms = self._cap.get(cv2.CAP_PROP_POS_MSEC)
+            if pos_ms > 0 or self._index == 0:
+                self._ts = pos_ms / 1000.0
+            else:
+                self._ts = self._index / self._fps
+        return ok, image
+
+    def timestamp(self) -> float:
+        return self._ts
+
+
+class ImageDirSource:
+    """Sorted image files from a directory, played back at *fps*."""
+
+    live = False
+
+    def __init__(self, path: str, fps: float = 30.0):
+        self._files = sorted(
+            os.path.join(path, f) for f in os.listdir(path)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._fps = fps
+        self._index = -1
+
+    def isOpened(self) -> bool:
+        return bool(self._files)
+
+    def read(self, image=None):
+        # imread cannot decode into an existing buffer: *image* is ignored.
+        while self._index + 1 < len(self._files):
+            self._index += 1
+            image = cv2.imread(self._files[self._index])
+            if image is not None:
+                return True, image
+            logger.warning("Cannot decode %s, skipping", self._files[self._index])
+        return False, None
+
+    def timestamp(self) -> float:
+        return self._index / self._fps
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self._fps
+        return 0.0
+
+    def release(self) -> None:
+        self._files = []
+
+
+def open_source(input_path: str | None, camera_index: int = 0, fps: float = 30.0):
+    """Return the source for *input_path* (``None`` = live camera)."""
+    if input_path is None:
+        return CameraSource(camera_index)
+    if os.path.isdir(input_path):
+        return ImageDirSource(input_path, fps)
+    return VideoFileSource(input_path)
@@ -0,0 +1,334 @@
+"""Multi-camera / multi-driver supervisor.
+
+Runs N camera streams in one process.  Every stream owns its capture
+thread, MediaPipe models, driver state (:class:`DriverState`) and alert
+channel, while inference for all streams is scheduled on one shared
+thread pool (MediaPipe releases the GIL inside its graphs).
+
+When a phone model is configured, hand crops from all streams go through
+one shared :class:`~safedrive.phone_classifier.BatchedPhoneClassifier`,
+so concurrent streams are classified in a single batch.
+
+A stream never has more than one frame in flight, so its models are never
+used concurrently.  When the pool is saturated the supervisor lowers the
+per-stream frame rate (multiplicative back-off) instead of queueing work;
+capture keeps only the latest frame, so nothing stalls.  When capacity
+frees up the rate climbs back towards ``max_fps``.
+
+Usage::
+
+    python -m safedrive supervise --camera 0 --camera 2 --input bench.mp4 --workers 4
+"""
+
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import cv2
+
+from safedrive.config import load_config
+from safedrive.inference import create_face_mesh, create_hands
+from safedrive.landmarks import face_to_array, hands_to_arrays
+from safedrive.phone_classifier import create_phone_classifier, create_phone_detector
+from safedrive.pipeline import EOS, CaptureThread, DropQueue, FramePool, LatencyStats, release_frame
+from safedrive.session import DriverState, extract_features
+from safedrive.sources import open_source
+
+logger = logging.getLogger(__name__)
+
+
+def log_alert(stream: str, level: Optional[str]) -> None:
+    """Default alert channel: log level transitions."""
+    logger.warning("[%s] alert level -> %s", stream, level or "NO_FACE")
+
+
+class CameraStream:
+    """One camera with its own models, driver state and alert channel.
+
+    Parameters
+    ----------
+    name : str
+        Stream label used in reports.
+    source
+        A frame source from :mod:`safedrive.sources`.
+    det : DetectionConfig
+        Detection thresholds.
+    on_alert : callable
+        Called as ``on_alert(name, level)`` whenever the level changes.
+    face_factory, hands_factory : callable
+        Create this stream's MediaPipe solutions.
+    phone_detector : PhoneDetector | None
+        CNN phone confirmation (typically backed by a shared batched
+        classifier); ``None`` uses the heuristic only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        source,
+        det,
+        on_alert: Callable[[str, Optional[str]], None] = log_alert,
+        face_factory: Callable = create_face_mesh,
+        hands_factory: Callable = create_hands,
+        phone_detector=None,
+    ):
+        self.name = name
+        self.source = source
+        self.det = det
+        self.on_alert = on_alert
+        self.phone_detector = phone_detector
+        self.state = DriverState(det)
+        self.face_mesh = face_factory()
+        self.hands = hands_factory()
+        self.stats = LatencyStats()
+        # Recycled buffers: one queued, one being read, one in inference.
+        self.pool = FramePool(3)
+        # Live: keep only the freshest frame.  File: analyse every frame, so
+        # results do not depend on how fast this machine is.
+        self.frames = DropQueue(maxsize=1, drop=getattr(source, "live", True), on_drop=release_frame)
+        self.capture = CaptureThread(source, self.frames, self.stats, clock=source.timestamp,
+                                     pool=self.pool)
+        self._rgb = None  # one job per stream at a time (``busy``)
+        self.level: Optional[str] = None
+        self.processed = 0
+        self.busy = False
+        self.interval = 0.0
+        self.next_due = 0.0
+        self.last_served = 0.0
+        self.waiting = False
+
+    def process(self, frame) -> None:
+        """Run inference, detectors and alert logic on one frame."""
+        t0 = time.perf_counter()
+        image = frame.image
+        h, w = image.shape[:2]
+        rgb = self._rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        face_res = self.face_mesh.process(rgb)
+        hand_res = self.hands.process(rgb)
+
+        face = None
+        if face_res.multi_face_landmarks:
+            face = face_to_array(face_res.multi_face_landmarks[0].landmark)
+        hands = hands_to_arrays(hand_res.multi_hand_landmarks or [])
+        phone = None
+        if self.phone_detector is not None and hands:
+            phone = any(self.phone_detector.detect(rgb, face, hands))
+        features = extract_features(face, hands, h, w, self.det, phone=phone)
+        level = self.state.update(features, frame.timestamp)
+
+        if level != self.level:
+            self.level = level
+            self.on_alert(self.name, level)
+        self.processed += 1
+        t1 = time.perf_counter()
+        self.stats.record("inference", t1 - t0)
+        self.stats.record("capture_to_alert", t1 - frame.stamps["captured"])
+
+    def close(self) -> None:
+        self.capture.stop()
+        if self.capture.ident is not None:
+            self.capture.join(timeout=1.0)
+        self.source.release()
+        self.face_mesh.close()
+        self.hands.close()
+
+
+class StreamSupervisor:
+    """Schedule inference for several :class:`CameraStream` on a shared pool.
+
+    Parameters
+    ----------
+    streams : list[CameraStream]
+        Streams to supervise.
+    workers : int
+        Size of the shared inference pool.
+    max_fps, min_fps : float
+        Per-stream frame-rate bounds for the adaptive scheduler.
+    phone_service : BatchedPhoneClassifier | None
+        Shared phone classifier, reported and closed with the supervisor.
+    """
+
+    BACKOFF = 1.25
+    RECOVER = 0.95
+
+    def __init__(self, streams: List[CameraStream], workers: int = 2,
+                 max_fps: float = 30.0, min_fps: float = 2.0, phone_service=None):
+        self.streams = streams
+        self.phone_service = phone_service
+        self.workers = workers
+        self.min_interval = 1.0 / max_fps
+        self.max_interval = 1.0 / min_fps
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="safedrive-infer")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._window_start = time.monotonic()
+        self._window_counts: Dict[str, int] = {s.name: 0 for s in streams}
+        for s in streams:
+            s.interval = self.min_interval
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        for s in self.streams:
+            s.capture.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        for s in self.streams:
+            s.close()
+        if self.phone_service is not None:
+            self.phone_service.close()
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _run_job(self, stream: CameraStream, frame) -> None:
+        try:
+            stream.process(frame)
+        except Exception:
+            logger.exception("[%s] inference failed", stream.name)
+        finally:
+            frame.release()
+            with self._lock:
+                self._in_flight -= 1
+                stream.busy = False
+                # Spare capacity (nobody waiting): let this stream speed back up.
+                if not any(s.waiting for s in self.streams):
+                    stream.interval = max(self.min_interval, stream.interval * self.RECOVER)
+            self._wake.set()
+
+    def tick(self, now: float) -> int:
+        """Submit at most one frame per idle, due stream; return submissions."""
+        submitted = 0
+        # Serve the least recently served streams first so none of them starves.
+        for s in sorted(self.streams, key=lambda st: st.last_served):
+            if s.busy or now < s.next_due:
+                continue
+            with self._lock:
+                if self._in_flight >= self.workers:
+                    # No worker free for a due frame: degrade this stream's
+                    # FPS once per missed slot; it stays due and is served
+                    # first (least recently served) when a worker frees up.
+                    if not s.waiting:
+                        s.waiting = True
+                        s.interval = min(self.max_interval, s.interval * self.BACKOFF)
+                    continue
+            frame = s.frames.get(timeout=0)
+            if frame is None or frame is EOS:
+                continue
+            with self._lock:
+                self._in_flight += 1
+                s.busy = True
+                s.waiting = False
+            s.next_due = now + s.interval
+            s.last_served = now
+            self._window_counts[s.name] += 1
+            self._pool.submit(self._run_job, s, frame)
+            submitted += 1
+        return submitted
+
+    def run(self, report_interval: float = 10.0, duration: Optional[float] = None) -> None:
+        """Schedule until stopped, all captures end, or *duration* elapses."""
+        started = last_report = time.monotonic()
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            self.tick(now)
+            if report_interval and now - last_report >= report_interval:
+                for line in self.report_lines():
+                    logger.info(line)
+                last_report = now
+            if duration is not None and now - started >= duration:
+                break
+            if all(s.capture.finished.is_set() and not s.busy for s in self.streams):
+                break
+            self._wake.wait(timeout=0.005)
+            self._wake.clear()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def throughput(self) -> Dict[str, Dict[str, float]]:
+        """Return per-stream achieved/target FPS since the last call."""
+        now = time.monotonic()
+        elapsed = max(now - self._window_start, 1e-6)
+        out = {}
+        for s in self.streams:
+            snap = s.stats.snapshot()
+            out[s.name] = {
+                "fps": self._window_counts[s.name] / elapsed,
+                "target_fps": 1.0 / s.interval,
+                "processed": s.processed,
+                "dropped": s.frames.dropped,
+                "latency_ms": snap.get("capture_to_alert", {}).get("mean", 0.0),
+            }
+            self._window_counts[s.name] = 0
+        self._window_start = now
+        return out
+
+    def report_lines(self) -> List[str]:
+        lines = [
+            f"[{name}] {t['fps']:.1f} FPS (target {t['target_fps']:.1f}) "
+            f"processed={t['processed']} dropped={t['dropped']} latency={t['latency_ms']:.1f}ms"
+            for name, t in self.throughput().items()
+        ]
+        if self.phone_service is not None:
+            lines.append(self.phone_service.summary())
+        return lines
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--camera", type=int, action="append", default=[], help="Camera index (repeatable)")
+    parser.add_argument("--input", action="append", default=[], help="Video file or image dir (repeatable)")
+    parser.add_argument("--config", default=None, help="Path to config.yaml")
+    parser.add_argument("--workers", type=int, default=2, help="Shared inference threads")
+    parser.add_argument("--max-fps", type=float, default=30.0, help="Per-stream frame-rate ceiling")
+    parser.add_argument("--min-fps", type=float, default=2.0, help="Per-stream frame-rate floor")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between reports")
+
+
+def run(args: argparse.Namespace) -> None:
+    cfg = load_config(args.config)
+    specs = [(f"cam{i}", open_source(None, i)) for i in args.camera]
+    specs += [(path, open_source(path)) for path in args.input]
+    # One batching service for every stream (the only thread-safe variant).
+    phone_service = create_phone_classifier(cfg.phone_model, batched=True)
+    streams = []
+    for name, source in specs:
+        if not source.isOpened():
+            logger.error("Cannot open stream %s", name)
+            continue
+        phone_detector = None
+        if phone_service is not None:
+            phone_detector = create_phone_detector(cfg.phone_model, phone_service)
+        streams.append(CameraStream(name, source, cfg.detection, phone_detector=phone_detector))
+    if not streams:
+        logger.error("No stream available.")
+        if phone_service is not None:
+            phone_service.close()
+        return
+
+    sup = StreamSupervisor(streams, args.workers, args.max_fps, args.min_fps, phone_service)
+    logger.info("Supervising %d streams on %d workers", len(streams), args.workers)
+    sup.start()
+    try:
+        sup.run(report_interval=args.report_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sup.stop()
+        for line in sup.report_lines():
+            logger.info(line)
+        sup.close()
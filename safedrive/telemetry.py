@@ -0,0 +1,327 @@
+"""Per-frame telemetry: stage histograms and event counters.
+
+:class:`Telemetry` aggregates, in constant memory:
+
+* per-stage latency histograms (log-spaced buckets, p50/p95/p99 within one
+  bucket width, about 19 %), fed by :meth:`Telemetry.stage` timers or by
+  :class:`~safedrive.pipeline.LatencyStats`;
+* counters — frames processed, dropped, without a face, alert
+  transitions — optionally labelled.
+
+When disabled every call returns immediately (the timer is a shared no-op
+object), so the instrumentation can stay in the hot path.
+:class:`TelemetryExporter` flushes the aggregates from a background thread,
+as JSON lines appended to a local file and/or as Prometheus text served on
+``127.0.0.1``, so the detection loop never does the I/O.
+
+Usage::
+
+    telemetry = Telemetry()
+    with telemetry.stage("cvtColor"):
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    telemetry.incr("alert_transitions", level="DANGER")
+    exporter = TelemetryExporter(telemetry, path="data/telemetry.jsonl", port=9108)
+    exporter.start()
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+#: Histogram bucket upper bounds in seconds: 10 µs to ~10 s, four per octave.
+BUCKETS: Tuple[float, ...] = tuple(1e-5 * 2 ** (i / 4) for i in range(81))
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _prom_value(value: float) -> str:
+    """Exact sample value: ``{:g}`` would round counters past 999999."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds); not thread-safe by itself."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the *q* quantile (capped at ``max``)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Return ``count``, ``mean_ms``, ``max_ms`` and ``p50_ms``/``p95_ms``/``p99_ms``."""
+        out = {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000.0 if self.count else 0.0,
+            "max_ms": self.max * 1000.0,
+        }
+        for q in QUANTILES:
+            out[f"p{round(q * 100)}_ms"] = self.quantile(q) * 1000.0
+        return out
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("_telemetry", "_stage", "_t0")
+
+    def __init__(self, telemetry: "Telemetry", stage: str):
+        self._telemetry = telemetry
+        self._stage = stage
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._telemetry.record(self._stage, time.perf_counter() - self._t0)
+        return False
+
+
+def _counter_key(name: str, labels: Dict[str, str]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_key(key) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+class Telemetry:
+    """Thread-safe stage histograms and counters.
+
+    Parameters
+    ----------
+    enabled : bool
+        When ``False`` every method is a no-op.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[tuple, float] = {}
+        self._collectors: List[Callable[["Telemetry"], None]] = []
+        self.started = time.time()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def stage(self, name: str):
+        """Context manager timing one execution of stage *name*."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one *seconds* sample to the histogram of stage *name*."""
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._stages.get(name)
+            if hist is None:
+                hist = self._stages[name] = Histogram()
+            hist.record(seconds)
+
+    def incr(self, name: str, n: float = 1, **labels: str) -> None:
+        """Increase counter *name* (with optional *labels*) by *n*."""
+        if not self.enabled:
+            return
+        key = _counter_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Overwrite counter *name*, for totals kept elsewhere (e.g. queue drops)."""
+        if not self.enabled:
+            return
+        key = _counter_key(name, labels)
+        with self._lock:
+            self._counters[key] = value
+
+    def add_collector(self, fn: Callable[["Telemetry"], None]) -> None:
+        """Call ``fn(telemetry)`` before each snapshot, to :meth:`set` external totals."""
+        self._collectors.append(fn)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def _collect(self) -> Tuple[Dict[str, Dict[str, float]], Dict[tuple, float]]:
+        for fn in self._collectors:
+            fn(self)
+        with self._lock:
+            stages = {name: hist.summary() for name, hist in self._stages.items()}
+            counters = dict(self._counters)
+        return stages, counters
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return ``{"time", "uptime_s", "counters", "stages"}`` (JSON-serialisable)."""
+        stages, counters = self._collect()
+        now = time.time()
+        return {
+            "time": now,
+            "uptime_s": now - self.started,
+            "counters": {_format_key(k): v for k, v in sorted(counters.items())},
+            "stages": stages,
+        }
+
+    def prometheus_text(self, prefix: str = "safedrive") -> str:
+        """Return the aggregates in the Prometheus text exposition format."""
+        stages, counters = self._collect()
+        lines = []
+        for name in sorted({k[0] for k in counters}):
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (cname, labels), value in sorted(counters.items()):
+                if cname != name:
+                    continue
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                value = _prom_value(value)
+                lines.append(f"{metric}{{{label_text}}} {value}" if labels else f"{metric} {value}")
+        if stages:
+            metric = f"{prefix}_stage_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for name, s in sorted(stages.items()):
+                for q in QUANTILES:
+                    value = s[f"p{round(q * 100)}_ms"] / 1000.0
+                    lines.append(f'{metric}{{stage="{name}",quantile="{q:g}"}} {value:.6g}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {_prom_value(s["mean_ms"] * s["count"] / 1000.0)}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+class TelemetryExporter:
+    """Publish a :class:`Telemetry` from a background thread.
+
+    Parameters
+    ----------
+    telemetry : Telemetry
+        Aggregates to publish.
+    path : str | None
+        JSON-lines file receiving one :meth:`Telemetry.snapshot` every
+        *interval* seconds (and a last one on :meth:`stop`).
+    interval : float
+        Seconds between file flushes.
+    port : int
+        Serve ``/metrics`` (Prometheus text) on ``127.0.0.1:port``; 0 = off.
+    """
+
+    def __init__(self, telemetry: Telemetry, path: Optional[str] = None, interval: float = 10.0,
+                 port: int = 0):
+        self.telemetry = telemetry
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="safedrive-telemetry", daemon=True)
+            self._thread.start()
+        if self.port:
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, name="safedrive-metrics", daemon=True).start()
+            logger.info("Telemetry served on http://127.0.0.1:%d/metrics", self.port)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ------------------------------------------------------------------
+    # Runtime
+    # ------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Append one snapshot to :attr:`path`."""
+        line = json.dumps(self.telemetry.snapshot())
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._safe_flush()
+        self._safe_flush()
+
+    def _safe_flush(self) -> None:
+        try:
+            self.flush()
+        except OSError:
+            logger.exception("Telemetry flush to %s failed", self.path)
+
+    def _handler(self):
+        telemetry = self.telemetry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                logger.debug("metrics: " + fmt, *args)
+
+        return Handler
@@ -0,0 +1,108 @@
+"""Tests for the batch processor (fake MediaPipe models, no process pool)."""
+
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from tests.conftest import make_landmark
+from safedrive import batch
+from safedrive.config import AppConfig
+
+
+class _FakeModel:
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+class _FakeFaceMesh(_FakeModel):
+    def process(self, rgb):
+        lm = [make_landmark(0.5, 0.5) for _ in range(478)]
+        return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=lm)])
+
+
+class _FakeHands(_FakeModel):
+    """Reports a phone-like hand on frames whose pixel value is odd."""
+
+    def process(self, rgb):
+        if int(rgb[0, 0, 0]) % 2 == 0:
+            return SimpleNamespace(multi_hand_landmarks=None)
+        lm = [make_landmark(0.5, 0.5) for _ in range(21)]
+        return SimpleNamespace(multi_hand_landmarks=[SimpleNamespace(landmark=lm)])
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    drive = tmp_path / "drive_a"
+    drive.mkdir()
+    for i, value in enumerate([0, 1, 1, 0, 1]):
+        cv2.imwrite(str(drive / f"{i:03d}.png"), np.full((8, 8, 3), value, np.uint8))
+    (tmp_path / "empty").mkdir()
+    (tmp_path / "notes.txt").write_text("ignored")
+    (tmp_path / "clip.mp4").write_bytes(b"")
+    return tmp_path
+
+
+@pytest.fixture
+def fake_worker(monkeypatch):
+    worker = {"cfg": AppConfig(), "face_mesh": _FakeFaceMesh(), "hands": _FakeHands()}
+    monkeypatch.setattr(batch, "_worker", worker)
+    return worker
+
+
+class TestFindDrives:
+    def test_videos_and_image_dirs(self, recordings):
+        names = [p.rsplit("/", 1)[-1] for p in batch.find_drives(str(recordings))]
+        assert names == ["clip.mp4", "drive_a"]
+
+
+class TestEpisodes:
+    def test_counts_runs(self):
+        mask = np.array([0, 1, 1, 0, 1, 0], dtype=bool)
+        ts = np.arange(6, dtype=float)
+        assert batch._episodes(mask, ts) == (2, 1.0)
+
+    def test_empty(self):
+        assert batch._episodes(np.zeros(3, bool), np.arange(3.0)) == (0, 0.0)
+
+
+class TestProcessDrive:
+    def test_timeline(self, recordings, fake_worker):
+        res = batch.process_drive(str(recordings / "drive_a"), fps=10.0)
+        assert res["error"] == ""
+        assert res["phone"].tolist() == [False, True, True, False, True]
+        assert res["timestamp"] == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+        assert all(batch.LEVELS[c] in ("NORMAL", "WARNING") for c in res["level"])
+
+    def test_models_reset_per_drive(self, recordings, fake_worker):
+        batch.process_drive(str(recordings / "drive_a"), fps=10.0)
+        batch.process_drive(str(recordings / "drive_a"), fps=10.0)
+        assert fake_worker["face_mesh"].resets == 2
+        assert fake_worker["hands"].resets == 2
+
+    def test_unreadable_drive_reports_error(self, recordings, fake_worker):
+        res = batch.process_drive(str(recordings / "clip.mp4"))
+        assert "cannot open" in res["error"]
+        assert len(res["timestamp"]) == 0
+
+
+class TestWriteResults:
+    def test_columnar_output(self, recordings, fake_worker, tmp_path):
+        results = [
+            batch.process_drive(str(recordings / "drive_a"), fps=10.0),
+            batch.process_drive(str(recordings / "clip.mp4")),
+        ]
+        out = tmp_path / "out" / "results.npz"
+        batch.write_results(results, str(out))
+
+        data = np.load(out)
+        assert list(data["level_names"]) == list(batch.LEVELS)
+        assert len(data["frame_timestamp"]) == 5
+        assert data["frame_drive"].tolist() == [1] * 5
+        assert data["drive_frames"].tolist() == [0, 5]
+        assert data["drive_phone_episodes"].tolist() == [0, 2]
+        assert data["drive_error"][0] != "" and data["drive_error"][1] == ""
@@ -0,0 +1,99 @@
+"""Batch detector entry points must agree with the scalar functions."""
+
+import numpy as np
+import pytest
+
+from tests.conftest import make_landmark
+from safedrive.config import DetectionConfig
+from safedrive.detectors.batch import score_sequence
+from safedrive.detectors.eye_detector import detect_eyes_closed, detect_eyes_closed_batch
+from safedrive.detectors.head_detector import check_head_position, check_head_position_batch
+from safedrive.detectors.mouth_detector import (
+    calculate_mouth_opening, detect_yawning, detect_yawning_batch,
+)
+from safedrive.detectors.phone_detector import detect_phone_usage, detect_phone_usage_batch
+from safedrive.constants import (
+    LEFT_EYE_BOTTOM, LEFT_EYE_TOP, MOUTH_INNER_BOTTOM, MOUTH_INNER_TOP, MOUTH_LEFT, MOUTH_RIGHT,
+    RIGHT_EYE_BOTTOM, RIGHT_EYE_TOP,
+)
+
+T = 200
+
+
+@pytest.fixture
+def faces():
+    """Random face sequence spread around the default thresholds."""
+    rng = np.random.default_rng(0)
+    base = rng.uniform(0.3, 0.7, size=(T, 478, 3)).astype(np.float32)
+    # Make a good share of frames closed-eyed / yawning / neutral.
+    base[: T // 2, [LEFT_EYE_TOP, RIGHT_EYE_TOP], 1] = base[: T // 2, [LEFT_EYE_BOTTOM, RIGHT_EYE_BOTTOM], 1] + rng.uniform(-0.03, 0.03, (T // 2, 2))
+    return base
+
+
+@pytest.fixture
+def hands():
+    rng = np.random.default_rng(1)
+    out = rng.uniform(0.3, 0.7, size=(T, 21, 3)).astype(np.float32)
+    tips = [4, 8, 12, 16, 20]
+    out[: T // 2, tips, :2] = 0.5 + rng.uniform(-0.05, 0.05, (T // 2, 5, 2))
+    return out
+
+
+def _as_landmarks(frame):
+    return [make_landmark(float(x), float(y), float(z)) for x, y, z in frame]
+
+
+class _Hand:
+    def __init__(self, frame):
+        self.landmark = _as_landmarks(frame)
+
+
+class TestBatchMatchesScalar:
+    def test_eyes(self, faces):
+        batch = detect_eyes_closed_batch(faces, 0.02)
+        expected = [detect_eyes_closed(_as_landmarks(f), 0.02) for f in faces]
+        assert batch.tolist() == expected
+        assert 0 < batch.sum() < T
+
+    def test_mouth(self, faces):
+        batch = detect_yawning_batch(faces, 0.6, 0.1)
+        expected = [detect_yawning(_as_landmarks(f), 0.6, 0.1) for f in faces]
+        assert batch.tolist() == expected
+
+    def test_head(self, faces):
+        batch = check_head_position_batch(faces, 0.2, 0.1)
+        for i, f in enumerate(faces):
+            state = check_head_position(_as_landmarks(f), 0.2, 0.1)
+            assert bool(batch["turned"][i]) is state["turned"]
+            assert bool(batch["tilted"][i]) is state["tilted"]
+            if state["turned"]:
+                assert (state["direction_h"] == "gauche") == bool(batch["turned_left"][i])
+            if state["tilted"]:
+                assert (state["direction_v"] == "bas") == bool(batch["tilted_down"][i])
+
+    def test_phone(self, hands):
+        batch = detect_phone_usage_batch(hands, 480, 640)
+        expected = [detect_phone_usage(_Hand(h), 480, 640) for h in hands]
+        assert batch.tolist() == expected
+        assert 0 < batch.sum() < T
+
+
+class TestScoreSequence:
+    def test_missing_frames_are_false(self, faces, hands):
+        faces = faces.copy()
+        faces[5] = np.nan
+        scores = score_sequence(faces, hands[:, None], DetectionConfig(), 480, 640)
+        assert scores["face"][5] == False  # noqa: E712
+        for key in ("eyes_closed", "yawning", "turned", "tilted"):
+            assert scores[key][5] == False  # noqa: E712
+        assert scores["phone"].shape == (T,)
+
+    def test_mar_matches_scalar(self, faces):
+        scores = score_sequence(faces, None, DetectionConfig(), 480, 640)
+        for i in (0, 50, 150):
+            mar, height = calculate_mouth_opening(
+                _as_landmarks(faces[i]), MOUTH_INNER_TOP, MOUTH_INNER_BOTTOM, MOUTH_LEFT, MOUTH_RIGHT
+            )
+            assert scores["mar"][i] == pytest.approx(mar, rel=1e-5)
+            assert scores["mouth_height"][i] == pytest.approx(height, rel=1e-5)
+        assert not scores["phone"].any()
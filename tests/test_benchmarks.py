@@ -0,0 +1,73 @@
+"""Tests for the benchmark harnesses (synthetic frames, no models)."""
+
+from safedrive.config import AppConfig
+from benchmarks import detectors
+from benchmarks.pipeline import STAGES, SyntheticSource, compare, run
+
+
+def _results(p50=1.0, fps=100.0, rss=100.0):
+    return {"fps": fps, "peak_rss_mb": rss,
+            "stages": {"render": {"p50_ms": p50, "mean_ms": p50, "p95_ms": p50}}}
+
+
+class TestRun:
+    def test_synthetic_run_reports_every_stage(self):
+        results = run(SyntheticSource(30), AppConfig(), synthetic=True, warmup=5)
+        assert results["frames"] == 25
+        assert results["fps"] > 0
+        # No MediaPipe objects to convert in synthetic mode.
+        assert set(results["stages"]) == set(STAGES) - {"landmarks"}
+        for stage in results["stages"].values():
+            assert 0 <= stage["p50_ms"] <= stage["p95_ms"]
+
+    def test_frame_limit(self):
+        results = run(SyntheticSource(100), AppConfig(), frames=20, synthetic=True, warmup=0)
+        assert results["frames"] == 20
+
+
+class TestCompare:
+    def test_within_tolerance(self):
+        assert compare(_results(1.2, 90.0), _results(1.0, 100.0), tolerance=0.25) == []
+
+    def test_stage_regression(self):
+        failures = compare(_results(2.0), _results(1.0), tolerance=0.25)
+        assert len(failures) == 1 and failures[0].startswith("render")
+
+    def test_tiny_absolute_change_ignored(self):
+        assert compare(_results(0.004), _results(0.002), tolerance=0.25) == []
+
+    def test_detector_sized_regression_caught(self):
+        # A fast path falling back to the vectorised code: ~0.003 -> ~0.02 ms.
+        assert len(compare(_results(0.02), _results(0.003), tolerance=0.25)) == 1
+
+    def test_fps_and_memory_regressions(self):
+        failures = compare(_results(fps=50.0, rss=200.0), _results(fps=100.0, rss=100.0))
+        assert any(f.startswith("fps") for f in failures)
+        assert any(f.startswith("peak_rss") for f in failures)
+
+
+class TestDetectorBenchmarks:
+    def test_fast_paths_agree_with_reference(self):
+        for name, flavours in detectors.cases().items():
+            results = []
+            for versions in flavours.values():
+                for fn in versions.values():
+                    result = fn()
+                    # The current head functions reuse one HeadState: snapshot it.
+                    results.append(result.to_dict() if hasattr(result, "to_dict") else result)
+            assert all(r == results[0] for r in results), name
+
+    def test_run_reports_every_case(self):
+        results = detectors.run(number=10, repeat=1)
+        assert set(results) == {"eyes", "mouth", "head", "phone"}
+        for row in results.values():
+            assert set(row) == set(detectors.FLAVOURS)
+            for versions in row.values():
+                assert set(versions) == set(detectors.VERSIONS)
+                assert all(r["us"] > 0 for r in versions.values())
+                assert detectors.speedup(versions) > 0
+        assert "speedup" in detectors.format_report(results)
+
+    def test_session_update_benchmark(self):
+        result = detectors.run_session(number=100, repeat=1)
+        assert result["us"] > 0 and result["frames_per_s"] > 0
@@ -17,6 +17,8 @@ class TestDefaults:
         assert cfg.head_tilt_threshold == 0.1
         assert cfg.eyes_closed_time_threshold == 20.0
         assert cfg.phone_detection_threshold == 5.0
+        assert cfg.hand_model_interval == 1
+        assert cfg.hand_model_max_gap == 0.0
 
     def test_camera_defaults(self):
         cfg = CameraConfig()
@@ -85,3 +87,45 @@ class TestLoadConfig:
 
         cfg = load_config(str(yaml_file))
         assert cfg.detection.eye_closed_threshold == 0.02
+
+
+class TestTelemetryConfig:
+    def test_disabled_by_default(self):
+        assert AppConfig().telemetry.enabled is False
+
+    def test_section_loaded_and_path_resolved(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump({"telemetry": {"enabled": True, "path": "data/t.jsonl", "port": 9108}}))
+        cfg = load_config(str(config_file), project_root=str(tmp_path))
+        assert cfg.telemetry.enabled is True
+        assert cfg.telemetry.port == 9108
+        assert cfg.telemetry.path == os.path.join(str(tmp_path), "data/t.jsonl")
+
+
+class TestLoggingConfig:
+    def test_logging_and_journal_sections(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump({
+            "logging": {"dir": "logs", "asynchronous": True},
+            "journal": {"path": "data/journal", "max_files": 10},
+        }))
+        cfg = load_config(str(config_file), project_root=str(tmp_path))
+        assert cfg.logging.asynchronous is True
+        assert cfg.logging.dir == os.path.join(str(tmp_path), "logs")
+        assert cfg.journal.path == os.path.join(str(tmp_path), "data/journal")
+        assert cfg.journal.max_files == 10
+        assert cfg.journal.max_age == 3600.0
+
+    def test_journal_off_by_default(self):
+        cfg = load_config()
+        assert cfg.journal.path == "" and cfg.logging.asynchronous is False
+
+
+class TestRecorderConfig:
+    def test_section_loaded_and_path_resolved(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump({"recorder": {"path": "recordings", "chunk_frames": 300}}))
+        cfg = load_config(str(config_file), project_root=str(tmp_path))
+        assert cfg.recorder.path == os.path.join(str(tmp_path), "recordings")
+        assert cfg.recorder.chunk_frames == 300
+        assert cfg.recorder.max_hands == 2
@@ -0,0 +1,85 @@
+"""Tests for the decoded-image cache of training/dataset.py."""
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+from PIL import Image  # noqa: E402
+
+from training import dataset  # noqa: E402
+from training.dataset import CACHE_VERSION, build_cache  # noqa: E402
+
+
+def _write_image(path, width, height, value):
+    rng = np.random.default_rng(value)
+    Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)).save(path)
+    return str(path)
+
+
+@pytest.fixture
+def samples(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    # Landscape and portrait frames: the canvas must fit both.
+    return [
+        (_write_image(src / "a.png", 40, 30, 0), 0),
+        (_write_image(src / "b.png", 30, 40, 1), 1),
+    ]
+
+
+class TestBuildCache:
+    def test_layout_matches_uncached_resize(self, samples, tmp_path):
+        cache = tmp_path / "cache"
+        build_cache(samples, str(cache), size=20, workers=2)
+
+        images = np.load(cache / "images.npy")
+        shapes = np.load(cache / "shapes.npy")
+        assert np.load(cache / "labels.npy").tolist() == [0, 1]
+        assert shapes.tolist() == [[20, 26], [26, 20]]
+        assert images.shape == (2, 26, 26, 3)
+        for i, (path, _) in enumerate(samples):
+            h, w = shapes[i]
+            np.testing.assert_array_equal(images[i, :h, :w], dataset._load_resized(path, 20))
+        index = json.loads((cache / "index.json").read_text())
+        assert index["version"] == CACHE_VERSION and index["size"] == 20
+
+    def test_up_to_date_cache_is_reused(self, samples, tmp_path, monkeypatch):
+        cache = str(tmp_path / "cache")
+        build_cache(samples, cache, size=20, workers=1)
+
+        def fail(path, size):
+            raise AssertionError("cache rebuilt")
+
+        monkeypatch.setattr(dataset, "_load_resized", fail)
+        build_cache(samples, cache, size=20, workers=1)
+
+    def test_rebuilt_on_version_size_or_sample_change(self, samples, tmp_path, monkeypatch):
+        cache = tmp_path / "cache"
+        build_cache(samples, str(cache), size=20, workers=1)
+        calls = []
+        load = dataset._load_resized
+        monkeypatch.setattr(dataset, "_load_resized", lambda path, size: calls.append(path) or load(path, size))
+
+        index = json.loads((cache / "index.json").read_text())
+        index["version"] = CACHE_VERSION - 1
+        (cache / "index.json").write_text(json.dumps(index))
+        build_cache(samples, str(cache), size=20, workers=1)
+        assert len(calls) == 2
+        assert json.loads((cache / "index.json").read_text())["version"] == CACHE_VERSION
+
+        build_cache(samples, str(cache), size=24, workers=1)
+        assert len(calls) == 4
+        build_cache(samples[:1], str(cache), size=24, workers=1)
+        assert len(calls) == 5
+        assert np.load(cache / "images.npy").shape == (1, 24, 32, 3)
+
+    def test_missing_index_rebuilds(self, samples, tmp_path):
+        cache = tmp_path / "cache"
+        build_cache(samples, str(cache), size=20, workers=1)
+        (cache / "index.json").unlink()
+        (cache / "images.npy").unlink()
+        build_cache(samples, str(cache), size=20, workers=1)
+        assert np.load(cache / "images.npy").shape == (2, 26, 26, 3)
@@ -0,0 +1,59 @@
+"""Vectorised threshold sweep of training/evaluate.py, against a naive reference."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("sklearn")
+from training.evaluate import summarize, sweep_thresholds, threshold_metrics  # noqa: E402
+
+
+def _naive(probs, labels, t):
+    pred = probs >= t
+    tp = int(np.sum(pred & (labels == 1)))
+    fp = int(np.sum(pred & (labels == 0)))
+    fn = int(np.sum(~pred & (labels == 1)))
+    tn = int(np.sum(~pred & (labels == 0)))
+    return {
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "f1": 2 * tp / (2 * tp + fp + fn) if 2 * tp + fp + fn else 0.0,
+        "accuracy": (tp + tn) / len(probs),
+    }
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 2, 200)
+    probs = np.clip(rng.normal(0.35 + 0.3 * labels, 0.2), 0.0, 1.0)
+    # Ties on a threshold must count as positive (pred = prob >= t).
+    probs[:10] = 0.5
+    return probs, labels
+
+
+class TestThresholdMetrics:
+    def test_matches_naive_reference(self, scores):
+        probs, labels = scores
+        thresholds = np.concatenate(([0.0, 0.5, 1.0, 1.5], np.linspace(0.05, 0.95, 19), probs[10:20]))
+        metrics = threshold_metrics(probs, labels, thresholds)
+        for k, t in enumerate(thresholds):
+            ref = _naive(probs, labels, t)
+            for name, value in ref.items():
+                assert float(metrics[name][k]) == pytest.approx(value), (name, t)
+
+    def test_single_class(self):
+        metrics = threshold_metrics(np.array([0.2, 0.7]), np.array([0, 0]), [0.5])
+        assert float(metrics["recall"][0]) == 0.0 and float(metrics["f1"][0]) == 0.0
+        assert float(metrics["accuracy"][0]) == 0.5
+
+    def test_sweep_picks_best_distinct_score(self, scores):
+        probs, labels = scores
+        best_t, best_f1 = sweep_thresholds(probs, labels)
+        ref = max(_naive(probs, labels, t)["f1"] for t in np.unique(probs))
+        assert best_f1 == pytest.approx(ref)
+        assert _naive(probs, labels, best_t)["f1"] == pytest.approx(ref)
+        summary = summarize(probs, labels)
+        assert summary["f1"] == pytest.approx(_naive(probs, labels, 0.5)["f1"])
+        assert summary["best_f1"] == pytest.approx(best_f1)
@@ -1,6 +1,7 @@
 from tests.conftest import make_landmark
 from safedrive.constants import LEFT_EYE_TOP, LEFT_EYE_BOTTOM, RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM
-from safedrive.detectors.eye_detector import calculate_eye_opening, detect_eyes_closed
+from safedrive.detectors.eye_detector import calculate_eye_opening, detect_eyes_closed, detect_eyes_closed_array
+from safedrive.landmarks import face_to_array
 
 
 class TestCalculateEyeOpening:
@@ -44,3 +45,14 @@ class TestDetectEyesClosed:
         fake_landmarks[RIGHT_EYE_TOP] = make_landmark(y=0.500)
         fake_landmarks[RIGHT_EYE_BOTTOM] = make_landmark(y=0.505)
         assert detect_eyes_closed(fake_landmarks, threshold=0.02) is False
+
+
+class TestDetectEyesClosedArray:
+    def test_matches_scalar(self, fake_landmarks):
+        for left, right in [((0.3, 0.5), (0.3, 0.5)), ((0.5, 0.505), (0.5, 0.505)), ((0.3, 0.5), (0.5, 0.505))]:
+            fake_landmarks[LEFT_EYE_TOP] = make_landmark(y=left[0])
+            fake_landmarks[LEFT_EYE_BOTTOM] = make_landmark(y=left[1])
+            fake_landmarks[RIGHT_EYE_TOP] = make_landmark(y=right[0])
+            fake_landmarks[RIGHT_EYE_BOTTOM] = make_landmark(y=right[1])
+            expected = detect_eyes_closed(fake_landmarks, threshold=0.02)
+            assert detect_eyes_closed_array(face_to_array(fake_landmarks), threshold=0.02) is expected
@@ -1,9 +1,12 @@
+import pytest
+
 from tests.conftest import make_landmark
 from safedrive.constants import (
     NOSE_TIP, LEFT_EAR, RIGHT_EAR,
     FOREHEAD, CHIN, LEFT_TEMPLE, RIGHT_TEMPLE,
 )
-from safedrive.detectors.head_detector import check_head_position
+from safedrive.detectors.head_detector import HeadState, check_head_position, check_head_position_array
+from safedrive.landmarks import face_to_array
 
 
 class TestCheckHeadPosition:
@@ -79,3 +82,42 @@ class TestCheckHeadPosition:
         # With very low thresholds, even a neutral pose triggers
         state = check_head_position(fake_landmarks, rotation_threshold=0.01, tilt_threshold=0.01)
         assert state["turned"] is True or state["tilted"] is True
+
+
+class TestCheckHeadPositionArray:
+    SCENARIOS = [
+        {},
+        {LEFT_EAR: (0.9, 0.5), RIGHT_EAR: (0.1, 0.5), LEFT_TEMPLE: (0.85, 0.45), RIGHT_TEMPLE: (0.15, 0.45)},
+        {LEFT_EAR: (0.1, 0.5), RIGHT_EAR: (0.9, 0.5), LEFT_TEMPLE: (0.15, 0.45), RIGHT_TEMPLE: (0.85, 0.45)},
+        {FOREHEAD: (0.5, 0.1), CHIN: (0.5, 0.9), NOSE_TIP: (0.5, 0.6)},
+        {FOREHEAD: (0.5, 0.1), CHIN: (0.5, 0.9), NOSE_TIP: (0.5, 0.4)},
+        {LEFT_EAR: (0.9, 0.5), RIGHT_EAR: (0.1, 0.5), FOREHEAD: (0.5, 0.1), CHIN: (0.5, 0.9)},
+    ]
+
+    def test_matches_scalar(self, fake_landmarks):
+        for overrides in self.SCENARIOS:
+            lm = list(fake_landmarks)
+            TestCheckHeadPosition()._set_neutral(lm)
+            for idx, (x, y) in overrides.items():
+                lm[idx] = make_landmark(x=x, y=y)
+            expected = check_head_position(lm, rotation_threshold=0.2, tilt_threshold=0.1)
+            assert check_head_position_array(face_to_array(lm), 0.2, 0.1) == expected
+
+
+class TestHeadState:
+    def test_dict_compatible(self):
+        state = HeadState(turned=True, direction_h="gauche")
+        assert state["turned"] is True
+        assert state.get("direction_v") is None
+        assert state.get("missing", 1) == 1
+        assert state == {"turned": True, "tilted": False, "direction_h": "gauche", "direction_v": None}
+        with pytest.raises(KeyError):
+            state["missing"]
+
+    def test_out_is_reused(self, fake_landmarks):
+        TestCheckHeadPosition()._set_neutral(fake_landmarks)
+        out = HeadState(turned=True, tilted=True, direction_h="droite", direction_v="bas")
+        state = check_head_position(fake_landmarks, 0.2, 0.1, out=out)
+        assert state is out
+        assert state == HeadState()
+        assert check_head_position_array(face_to_array(fake_landmarks), 0.2, 0.1, out=out) is out
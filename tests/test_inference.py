@@ -0,0 +1,154 @@
+"""Tests for ConcurrentLandmarker and HandScheduler using fake MediaPipe solutions."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from safedrive.inference import ConcurrentLandmarker, HandScheduler, LandmarkResult, landmark_bbox
+
+
+class _FakeModel:
+    def __init__(self, kind, delay=0.0):
+        self.kind = kind
+        self.delay = delay
+        self.threads = set()
+        self.closed = False
+
+    def process(self, rgb):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        if self.kind == "face":
+            return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=["face", rgb])])
+        return SimpleNamespace(multi_hand_landmarks=["left", "right"])
+
+    def close(self):
+        self.closed = True
+
+
+class _RendezvousModel(_FakeModel):
+    """Blocks until the other model is inside ``process`` too."""
+
+    def __init__(self, kind, barrier):
+        super().__init__(kind)
+        self.barrier = barrier
+        self.met = False
+
+    def process(self, rgb):
+        # Raises BrokenBarrierError unless both models run at the same time.
+        self.barrier.wait(timeout=5.0)
+        self.met = True
+        return super().process(rgb)
+
+
+class _EmptyModel:
+    def process(self, rgb):
+        return SimpleNamespace(multi_face_landmarks=None, multi_hand_landmarks=None)
+
+    def close(self):
+        pass
+
+
+class TestConcurrentLandmarker:
+    def test_merges_results(self):
+        with ConcurrentLandmarker(lambda: _FakeModel("face"), lambda: _FakeModel("hands")) as lm:
+            res = lm.process("frame")
+        assert res.face == ["face", "frame"]
+        assert res.hands == ["left", "right"]
+
+    def test_empty_results(self):
+        with ConcurrentLandmarker(_EmptyModel, _EmptyModel) as lm:
+            res = lm.process("frame")
+        assert res.face is None
+        assert res.hands == []
+
+    def test_models_run_concurrently(self):
+        barrier = threading.Barrier(2)
+        face, hands = _RendezvousModel("face", barrier), _RendezvousModel("hands", barrier)
+        with ConcurrentLandmarker(lambda: face, lambda: hands) as lm:
+            res = lm.process("frame")
+        assert face.met and hands.met
+        assert res.face == ["face", "frame"]
+        assert res.face_ms >= 0 and res.hands_ms >= 0
+
+    def test_each_model_pinned_to_one_thread(self):
+        face, hands = _FakeModel("face"), _FakeModel("hands")
+        lm = ConcurrentLandmarker(lambda: face, lambda: hands)
+        for _ in range(5):
+            lm.process("frame")
+        lm.close()
+        assert len(face.threads) == 1 and len(hands.threads) == 1
+        assert face.threads != hands.threads
+        assert face.closed and hands.closed
+
+
+def _face(x0, y0, x1, y1):
+    return [SimpleNamespace(x=x0, y=y0), SimpleNamespace(x=x1, y=y1)]
+
+
+def _hand_at(x, y):
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y)] * 21)
+
+
+class TestHandScheduler:
+    def test_runs_every_nth_frame_when_idle(self):
+        sched = HandScheduler(interval=3)
+        runs = [sched.should_run(i * 0.01, phone_armed=False) for i in range(7)]
+        assert runs == [True, False, False, True, False, False, True]
+
+    def test_interval_one_always_runs(self):
+        sched = HandScheduler(interval=1)
+        assert all(sched.should_run(i, False) for i in range(5))
+
+    def test_phone_armed_forces_run(self):
+        sched = HandScheduler(interval=10)
+        sched.should_run(0.0, False)
+        assert sched.should_run(0.01, phone_armed=True) is True
+
+    def test_max_gap_bounds_latency(self):
+        sched = HandScheduler(interval=100, max_gap=0.2)
+        assert sched.should_run(0.0, False) is True
+        assert sched.should_run(0.1, False) is False
+        assert sched.should_run(0.25, False) is True
+
+    def test_hand_near_face_forces_run(self):
+        sched = HandScheduler(interval=10, face_margin=0.0)
+        sched.should_run(0.0, False)
+        sched.observe(LandmarkResult(face=_face(0.4, 0.2, 0.6, 0.5), hands=[_hand_at(0.5, 0.4)]))
+        assert sched.hand_near_face is True
+        assert sched.should_run(0.01, False) is True
+
+        sched.observe(LandmarkResult(face=_face(0.4, 0.2, 0.6, 0.5), hands=[_hand_at(0.9, 0.9)]))
+        assert sched.hand_near_face is False
+        assert sched.should_run(0.02, False) is False
+
+    def test_skipped_frame_keeps_proximity(self):
+        sched = HandScheduler(interval=10, face_margin=0.0)
+        sched.observe(LandmarkResult(face=_face(0.4, 0.2, 0.6, 0.5), hands=[_hand_at(0.5, 0.4)]))
+        sched.observe(LandmarkResult(face=_face(0.4, 0.2, 0.6, 0.5), hands_ran=False))
+        assert sched.hand_near_face is True
+
+    def test_face_lost_clears_stale_box(self):
+        sched = HandScheduler(interval=10, face_margin=0.0)
+        sched.observe(LandmarkResult(face=_face(0.4, 0.2, 0.6, 0.5), hands=[_hand_at(0.5, 0.4)]))
+        sched.observe(LandmarkResult(face=None, hands=[_hand_at(0.5, 0.4)]))
+        assert sched.hand_near_face is False
+        # The old box is gone: a hand where the face used to be is not "near".
+        sched.observe(LandmarkResult(face=None, hands=[_hand_at(0.5, 0.4)]))
+        assert sched.hand_near_face is False
+
+
+class TestLandmarkBbox:
+    def test_margin(self):
+        box = landmark_bbox(_face(0.4, 0.2, 0.6, 0.6), margin=0.5)
+        assert box == pytest.approx((0.3, 0.0, 0.7, 0.8))
+
+
+class TestSkipHands:
+    def test_skip_hands(self):
+        hands = _FakeModel("hands")
+        with ConcurrentLandmarker(lambda: _FakeModel("face"), lambda: hands) as lm:
+            res = lm.process("frame", run_hands=False)
+        assert res.hands == [] and res.hands_ran is False
+        assert hands.threads == set()
@@ -0,0 +1,68 @@
+"""Tests for the binary event journal (temporary directories only)."""
+
+import os
+
+import numpy as np
+import pytest
+
+from safedrive.journal import (
+    HEADER, KIND_LEVEL, KIND_SAMPLE, LEVELS, RECORD, EventJournal, journal_files, read_journal,
+)
+
+
+class TestEventJournal:
+    def test_round_trip(self, tmp_path):
+        with EventJournal(str(tmp_path), fsync=False) as journal:
+            journal.level_change(0.0, "NORMAL")
+            journal.sample(0.5, "NORMAL", 0.03, 0.031, 0.2)
+            journal.level_change(1.0, None)
+        events = read_journal(str(tmp_path))
+        assert events["kind"].tolist() == [KIND_LEVEL, KIND_SAMPLE, KIND_LEVEL]
+        assert events["timestamp"].tolist() == [0.0, 0.5, 1.0]
+        assert np.array(LEVELS)[events["level"]].tolist() == ["NORMAL", "NORMAL", None]
+        assert events["eye_left"][1] == pytest.approx(0.03)
+        assert events["mar"][1] == pytest.approx(0.2)
+        assert np.isnan(events["mar"][0])
+        assert journal.written == 3 and journal.dropped == 0
+
+    def test_rotation_by_size_and_retention(self, tmp_path):
+        journal = EventJournal(str(tmp_path), max_bytes=HEADER.size + 10 * RECORD.size,
+                               max_files=2, flush_interval=60.0, fsync=False).start()
+        for batch in range(4):
+            for i in range(10):
+                journal.sample(batch * 10 + i, "NORMAL", 0.03, 0.03, 0.1)
+            journal._flush()
+        journal.close()
+        files = journal_files(str(tmp_path))
+        assert len(files) == 2
+        assert all(os.path.getsize(f) == HEADER.size + 10 * RECORD.size for f in files)
+        assert read_journal(str(tmp_path))["timestamp"].tolist() == list(range(20, 40))
+
+    def test_rotation_by_age(self, tmp_path):
+        journal = EventJournal(str(tmp_path), max_age=0.0, flush_interval=60.0, fsync=False).start()
+        journal.level_change(0.0, "NORMAL")
+        journal._flush()
+        journal.level_change(1.0, "WARNING")
+        journal.close()
+        assert len(journal_files(str(tmp_path))) == 2
+
+    def test_full_buffer_drops_instead_of_blocking(self, tmp_path):
+        journal = EventJournal(str(tmp_path), max_buffer=2 * RECORD.size)
+        for t in range(5):
+            journal.level_change(float(t), "DANGER")
+        assert journal.dropped == 3
+
+    def test_truncated_record_ignored(self, tmp_path):
+        with EventJournal(str(tmp_path), fsync=False) as journal:
+            journal.level_change(0.0, "NORMAL")
+            journal.level_change(1.0, "DANGER")
+        path = journal_files(str(tmp_path))[0]
+        with open(path, "ab") as fh:
+            fh.write(b"\x00" * 5)
+        assert len(read_journal(path)) == 2
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "journal-x.sdj"
+        path.write_bytes(b"NOPE" + b"\x00" * 40)
+        with pytest.raises(ValueError):
+            read_journal(str(path))
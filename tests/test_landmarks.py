@@ -0,0 +1,26 @@
+import numpy as np
+
+from tests.conftest import make_landmark
+from safedrive.landmarks import FACE_LANDMARKS, face_to_array, hands_to_arrays, landmarks_to_array
+
+
+class TestLandmarksToArray:
+    def test_face_shape_and_dtype(self, fake_landmarks):
+        arr = face_to_array(fake_landmarks)
+        assert arr.shape == (FACE_LANDMARKS, 3)
+        assert arr.dtype == np.float32
+        assert arr.flags["C_CONTIGUOUS"]
+
+    def test_values(self):
+        arr = landmarks_to_array([make_landmark(0.1, 0.2, 0.3), make_landmark(0.4, 0.5, 0.6)])
+        np.testing.assert_allclose(arr, [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], rtol=1e-6)
+
+    def test_out_buffer_reused(self, fake_landmarks):
+        out = np.empty((FACE_LANDMARKS, 3), np.float32)
+        assert face_to_array(fake_landmarks, out=out) is out
+        assert out[0, 0] == np.float32(0.5)
+
+    def test_hands(self, fake_hand_landmarks):
+        arrays = hands_to_arrays([fake_hand_landmarks, fake_hand_landmarks])
+        assert len(arrays) == 2
+        assert arrays[0].shape == (21, 3)
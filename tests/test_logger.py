@@ -0,0 +1,26 @@
+"""Tests for the logging setup (run in a subprocess: it configures the root logger)."""
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_file_log(tmp_path, asynchronous):
+    script = textwrap.dedent(f"""
+        import logging
+        from safedrive.logger import setup_logging
+        setup_logging({str(tmp_path)!r}, asynchronous={asynchronous})
+        logging.getLogger("safedrive.test").info("frame %d", 7)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logging.getLogger("safedrive.test").exception("failed")
+    """)
+    subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+    lines = (tmp_path / "safedrive.log").read_text(encoding="utf-8").splitlines()
+    assert lines[0].endswith("[INFO] safedrive.test: frame 7")
+    assert lines[1].endswith("[ERROR] safedrive.test: failed")
+    assert lines[-1] == "ZeroDivisionError: division by zero"
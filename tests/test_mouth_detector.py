@@ -1,6 +1,9 @@
 from tests.conftest import make_landmark
 from safedrive.constants import MOUTH_INNER_TOP, MOUTH_INNER_BOTTOM, MOUTH_LEFT, MOUTH_RIGHT
-from safedrive.detectors.mouth_detector import calculate_mouth_opening, detect_yawning
+from safedrive.detectors.mouth_detector import (
+    calculate_mouth_opening, detect_yawning, detect_yawning_array, mouth_opening_array,
+)
+from safedrive.landmarks import face_to_array
 
 
 class TestCalculateMouthOpening:
@@ -62,3 +65,25 @@ class TestDetectYawning:
         fake_landmarks[MOUTH_LEFT] = make_landmark(x=0.3)
         fake_landmarks[MOUTH_RIGHT] = make_landmark(x=0.7)
         assert detect_yawning(fake_landmarks, mar_threshold=0.6, open_threshold=0.4) is False
+
+
+class TestMouthArray:
+    def test_zero_horizontal(self, fake_landmarks):
+        fake_landmarks[MOUTH_LEFT] = make_landmark(x=0.5)
+        fake_landmarks[MOUTH_RIGHT] = make_landmark(x=0.5)
+        mar, height = mouth_opening_array(face_to_array(fake_landmarks))
+        assert (float(mar), float(height)) == (0.0, 0.0)
+
+    def test_matches_scalar(self, fake_landmarks):
+        for top, bottom, left, right in [(0.2, 0.8, 0.4, 0.6), (0.49, 0.51, 0.3, 0.7), (0.3, 0.7, 0.4, 0.6)]:
+            fake_landmarks[MOUTH_INNER_TOP] = make_landmark(y=top)
+            fake_landmarks[MOUTH_INNER_BOTTOM] = make_landmark(y=bottom)
+            fake_landmarks[MOUTH_LEFT] = make_landmark(x=left)
+            fake_landmarks[MOUTH_RIGHT] = make_landmark(x=right)
+            face = face_to_array(fake_landmarks)
+            mar, height = calculate_mouth_opening(
+                fake_landmarks, MOUTH_INNER_TOP, MOUTH_INNER_BOTTOM, MOUTH_LEFT, MOUTH_RIGHT
+            )
+            amar, aheight = mouth_opening_array(face)
+            assert abs(float(amar) - mar) < 1e-5 and abs(float(aheight) - height) < 1e-6
+            assert detect_yawning_array(face, 0.6, 0.4) is detect_yawning(fake_landmarks, 0.6, 0.4)
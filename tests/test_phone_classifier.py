@@ -0,0 +1,244 @@
+"""Tests for the ONNX phone classifier and its heuristic pre-filter."""
+
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from safedrive.config import PhoneModelConfig
+from safedrive.phone_classifier import (
+    BatchedPhoneClassifier, PhoneDetector, create_phone_detector, hand_crop_box, hand_near_face,
+)
+
+
+def _hand(cx=0.5, cy=0.5, spread=0.01):
+    """A (21, 3) hand whose finger tips are *spread* apart around (cx, cy)."""
+    hand = np.zeros((21, 3), dtype=np.float32)
+    hand[:, 0] = cx + np.linspace(-spread, spread, 21)
+    hand[:, 1] = cy
+    return hand
+
+
+def _face(x0=0.4, y0=0.3, x1=0.6, y1=0.6):
+    face = np.zeros((478, 3), dtype=np.float32)
+    face[:, 0] = np.linspace(x0, x1, 478)
+    face[:, 1] = np.linspace(y0, y1, 478)
+    return face
+
+
+class _FakeClassifier:
+    def __init__(self, prob=0.9, delay=0.0):
+        self.prob = prob
+        self.delay = delay
+        self.boxes = []
+
+    def predict(self, rgb, box):
+        self.boxes.append(box)
+        if self.delay:
+            time.sleep(self.delay)
+        return self.prob
+
+
+class TestGeometry:
+    def test_crop_box_square_and_clipped(self):
+        box = hand_crop_box(_hand(0.5, 0.5, 0.05), 480, 640)
+        x0, y0, x1, y1 = box
+        assert abs((x1 - x0) - (y1 - y0)) <= 1
+        assert x0 < 320 < x1 and y0 < 240 < y1
+        x0, y0, x1, y1 = hand_crop_box(_hand(0.99, 0.01, 0.05), 480, 640)
+        assert x1 <= 640 and y0 >= 0
+
+    def test_degenerate_crop(self):
+        assert hand_crop_box(_hand(spread=0.0), 480, 640) is None
+
+    def test_hand_near_face(self):
+        face = _face()
+        assert hand_near_face(_hand(0.5, 0.5), face)
+        assert not hand_near_face(_hand(0.1, 0.9), face)
+
+
+class TestPhoneDetector:
+    def test_heuristic_rejects_without_cnn(self):
+        clf = _FakeClassifier()
+        det = PhoneDetector(clf)
+        rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+        # Spread-out finger tips fail the heuristic.
+        assert det.detect(rgb, _face(), [_hand(spread=0.4)]) == [False]
+        assert clf.boxes == []
+
+    def test_far_from_face_skips_cnn(self):
+        clf = _FakeClassifier()
+        det = PhoneDetector(clf)
+        rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+        assert det.detect(rgb, _face(), [_hand(0.1, 0.9)]) == [False]
+        assert det.runs == 0
+
+    def test_no_face_keeps_heuristic_verdict(self):
+        clf = _FakeClassifier(prob=0.1)
+        det = PhoneDetector(clf)
+        rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+        assert det.detect(rgb, None, [_hand(), _hand(spread=0.4)]) == [True, False]
+        assert clf.boxes == [] and det.runs == 0
+
+    def test_cancelled_future_keeps_heuristic_verdict(self):
+        class _ClosedService:
+            def submit(self, rgb, box):
+                future = Future()
+                future.cancel()
+                return future
+
+        det = PhoneDetector(_ClosedService(), threshold=2.0)
+        rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+        assert det.detect(rgb, _face(), [_hand()]) == [True]
+        assert det.runs == 0
+
+    def test_cnn_decides_near_face(self):
+        rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+        assert PhoneDetector(_FakeClassifier(0.9)).detect(rgb, _face(), [_hand()]) == [True]
+        assert PhoneDetector(_FakeClassifier(0.1)).detect(rgb, _face(), [_hand()]) == [False]
+
+    def test_budget_falls_back_to_heuristic(self):
+        clf = _FakeClassifier(prob=0.1, delay=0.01)
+        det = PhoneDetector(clf, budget_ms=5.0)
+        rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+        hands = [_hand(0.45), _hand(0.55)]
+        # First crop runs (cost unknown), the second no longer fits.
+        assert det.detect(rgb, _face(), hands) == [False, True]
+        assert det.runs == 1 and det.over_budget == 1
+
+    def test_disabled_without_path(self):
+        assert create_phone_detector(PhoneModelConfig()) is None
+
+    def test_missing_model_falls_back(self, tmp_path):
+        cfg = PhoneModelConfig(path=str(tmp_path / "missing.onnx"))
+        assert create_phone_detector(cfg) is None
+
+
+class TestOnnxPhoneClassifier:
+    @pytest.fixture
+    def model_path(self, tmp_path):
+        """Tiny stand-in model: logit = mean of the normalised input."""
+        onnx = pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+        from onnx import TensorProto, helper
+
+        graph = helper.make_graph(
+            [helper.make_node("ReduceMean", ["input"], ["mean"], axes=[1, 2, 3], keepdims=0),
+             helper.make_node("Unsqueeze", ["mean", "axis"], ["logit"])],
+            "tiny",
+            [helper.make_tensor_value_info("input", TensorProto.FLOAT, ["batch", 3, 32, 32])],
+            [helper.make_tensor_value_info("logit", TensorProto.FLOAT, ["batch", 1])],
+            [helper.make_tensor("axis", TensorProto.INT64, [1], [1])],
+        )
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=7)
+        path = tmp_path / "tiny.onnx"
+        onnx.save(model, str(path))
+        return str(path)
+
+    def test_predict_matches_normalisation(self, model_path):
+        from safedrive.phone_classifier import OnnxPhoneClassifier
+
+        clf = OnnxPhoneClassifier(model_path, threads=1, input_size=32)
+        rgb = np.full((100, 100, 3), 255, dtype=np.uint8)
+        mean = np.array([0.485, 0.456, 0.406])
+        std = np.array([0.229, 0.224, 0.225])
+        expected = 1.0 / (1.0 + np.exp(-((1.0 - mean) / std).mean()))
+        assert clf.predict(rgb, (10, 10, 60, 60)) == pytest.approx(expected, rel=1e-5)
+        # Buffers are reused across calls.
+        buf = clf._input
+        rgb[:] = 0
+        expected0 = 1.0 / (1.0 + np.exp(-(-mean / std).mean()))
+        assert clf.predict(rgb, (0, 0, 50, 80)) == pytest.approx(expected0, rel=1e-5)
+        assert clf._input is buf
+
+    def test_batched_service_on_real_session(self, model_path):
+        with BatchedPhoneClassifier.from_path(model_path, input_size=32, window_ms=20.0) as svc:
+            futures = [svc.submit(np.full((50, 50, 3), v, np.uint8), (0, 0, 50, 50)) for v in (0, 255)]
+            probs = [f.result(timeout=2.0) for f in futures]
+        assert probs[0] < 0.5 < probs[1]
+        # Batching depends on thread timing; only the total is deterministic.
+        assert sum(size * n for size, n in svc.batch_sizes.items()) == 2
+
+
+class _FakeSession:
+    """Batch session whose logit is the mean normalised pixel of each crop."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input")]
+
+    def run(self, outputs, feeds):
+        x = feeds["input"]
+        self.batches.append(x.shape[0])
+        time.sleep(self.delay)
+        return [x.mean(axis=(1, 2, 3)).reshape(-1, 1)]
+
+
+def _expected(value):
+    mean = np.array([0.485, 0.456, 0.406])
+    std = np.array([0.229, 0.224, 0.225])
+    return 1.0 / (1.0 + np.exp(-((value / 255.0 - mean) / std).mean()))
+
+
+class TestBatchedPhoneClassifier:
+    def test_results_routed_to_callers(self):
+        # A full batch closes the window at once; the long window only
+        # guards against a slow submitting thread.
+        with BatchedPhoneClassifier(_FakeSession(), input_size=8, max_batch=3, window_ms=1000.0) as svc:
+            images = [np.full((40, 40, 3), v, dtype=np.uint8) for v in (0, 100, 255)]
+            futures = [svc.submit(img, (0, 0, 40, 40)) for img in images]
+            probs = [f.result(timeout=1.0) for f in futures]
+        assert probs == [pytest.approx(_expected(v), rel=1e-5) for v in (0, 100, 255)]
+        assert svc.batch_sizes == {3: 1}
+
+    def test_batches_across_threads(self):
+        session = _FakeSession(delay=0.005)
+        with BatchedPhoneClassifier(session, input_size=8, max_batch=8, window_ms=5.0) as svc:
+            image = np.zeros((40, 40, 3), dtype=np.uint8)
+
+            def caller():
+                for _ in range(5):
+                    svc.predict(image, (0, 0, 40, 40))
+
+            threads = [threading.Thread(target=caller) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert sum(size * n for size, n in svc.batch_sizes.items()) == 20
+        assert max(svc.batch_sizes) > 1
+        assert max(session.batches) <= 8
+        summary = svc.summary()
+        assert "crops=20" in summary and "queue=" in summary
+
+    def test_session_error_reaches_caller(self):
+        class _Broken(_FakeSession):
+            def run(self, outputs, feeds):
+                raise RuntimeError("boom")
+
+        with BatchedPhoneClassifier(_Broken(), input_size=8, window_ms=0.0) as svc:
+            future = svc.submit(np.zeros((10, 10, 3), np.uint8), (0, 0, 10, 10))
+            with pytest.raises(RuntimeError):
+                future.result(timeout=1.0)
+
+    def test_detector_submits_all_hands_in_one_batch(self):
+        session = _FakeSession()
+        with BatchedPhoneClassifier(session, input_size=8, window_ms=10.0) as svc:
+            det = PhoneDetector(svc, threshold=0.0)
+            rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+            assert det.detect(rgb, _face(), [_hand(0.45), _hand(0.55)]) == [True, True]
+        assert session.batches == [2]
+
+    def test_detector_budget_deadline(self):
+        with BatchedPhoneClassifier(_FakeSession(delay=0.05), input_size=8, window_ms=0.0) as svc:
+            det = PhoneDetector(svc, threshold=2.0, budget_ms=5.0)
+            rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+            # Too slow for the budget: heuristic verdict kept.
+            assert det.detect(rgb, _face(), [_hand()]) == [True]
+            assert det.over_budget == 1
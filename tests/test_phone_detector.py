@@ -1,7 +1,8 @@
 from types import SimpleNamespace
 
 from tests.conftest import make_landmark
-from safedrive.detectors.phone_detector import detect_phone_usage
+from safedrive.detectors.phone_detector import detect_phone_usage, detect_phone_usage_array
+from safedrive.landmarks import landmarks_to_array
 
 
 def _hand(positions):
@@ -42,3 +43,18 @@ class TestDetectPhoneUsage:
         hand = _hand(positions)
         result = detect_phone_usage(hand, 480, 640)
         assert isinstance(result, bool)
+
+
+class TestDetectPhoneUsageArray:
+    def test_no_hand(self):
+        assert detect_phone_usage_array(None, 480, 640) is False
+
+    def test_matches_scalar(self):
+        close = [(0.5, 0.5)] * 21
+        close[4], close[8], close[12], close[16], close[20] = (0.50, 0.5), (0.51, 0.5), (0.52, 0.5), (0.53, 0.5), (0.54, 0.5)
+        spread = [(0.5, 0.5)] * 21
+        spread[4], spread[8], spread[12], spread[16], spread[20] = (0.1, 0.5), (0.3, 0.5), (0.5, 0.5), (0.7, 0.5), (0.9, 0.5)
+        for positions in (close, spread):
+            hand = _hand(positions)
+            expected = detect_phone_usage(hand, 480, 640)
+            assert detect_phone_usage_array(landmarks_to_array(hand.landmark), 480, 640) is expected
@@ -0,0 +1,163 @@
+"""Tests for the threaded pipeline primitives (no camera, no MediaPipe)."""
+
+import numpy as np
+
+from safedrive.pipeline import (
+    CaptureThread, DropQueue, Frame, FramePool, LatencyStats, StageWorker, release_frame,
+)
+
+
+class _FakeCapture:
+    def __init__(self, n):
+        self._frames = list(range(n))
+
+    def read(self):
+        if not self._frames:
+            return False, None
+        return True, self._frames.pop(0)
+
+
+class _BufferCapture:
+    """Fills the caller's buffer like ``cv2.VideoCapture.read(image=buf)``."""
+
+    def __init__(self, n):
+        self._n = n
+        self._i = 0
+
+    def read(self, image=None):
+        if self._i >= self._n:
+            return False, None
+        if image is None:
+            image = np.empty((4, 4, 3), np.uint8)
+        image[:] = self._i
+        self._i += 1
+        return True, image
+
+
+class TestDropQueue:
+    def test_keeps_latest(self):
+        q = DropQueue(maxsize=1)
+        q.put(1)
+        q.put(2)
+        q.put(3)
+        assert q.get(timeout=0.1) == 3
+        assert q.dropped == 2
+
+    def test_get_timeout_returns_none(self):
+        q = DropQueue()
+        assert q.get(timeout=0.01) is None
+
+    def test_on_drop_receives_evicted_items(self):
+        evicted = []
+        q = DropQueue(maxsize=1, on_drop=evicted.append)
+        q.put(1)
+        q.put(2)
+        assert evicted == [1]
+
+
+class TestFramePool:
+    def test_acquire_release_cycle(self):
+        pool = FramePool(2)
+        assert pool.acquire() is None  # empty: caller allocates
+        buf = np.empty(3)
+        frame = Frame(index=0, timestamp=0.0, image=buf, pool=pool)
+        frame.release()
+        frame.release()  # idempotent
+        assert pool.acquire() is buf
+        assert pool.acquire() is None
+        assert pool.allocations == 2
+
+    def test_keeps_at_most_size_buffers(self):
+        pool = FramePool(1)
+        pool.release(np.empty(1))
+        pool.release(np.empty(1))
+        assert pool.acquire() is not None
+        assert pool.acquire() is None
+
+    def test_release_frame_ignores_eos(self):
+        release_frame(object())
+
+
+class TestLatencyStats:
+    def test_record_and_snapshot(self):
+        stats = LatencyStats()
+        stats.record("inference", 0.010)
+        stats.record("inference", 0.030)
+        snap = stats.snapshot()["inference"]
+        assert snap["count"] == 2
+        assert abs(snap["mean"] - 20.0) < 1e-6
+        assert abs(snap["max"] - 30.0) < 1e-6
+        assert "inference=" in stats.summary()
+
+
+class TestStages:
+    def test_capture_to_worker(self):
+        stats = LatencyStats()
+        capture_q = DropQueue(maxsize=16)
+        out_q = DropQueue(maxsize=16)
+        cap = CaptureThread(_FakeCapture(3), capture_q, stats)
+        cap.start()
+        cap.join(timeout=1.0)
+        assert cap.finished.is_set()
+
+        def double(frame):
+            frame.result = frame.image * 2
+
+        worker = StageWorker("inference", double, capture_q, out_q, stats)
+        worker.start()
+        results = [out_q.get(timeout=1.0) for _ in range(3)]
+        worker.stop()
+        worker.join(timeout=1.0)
+
+        assert [f.result for f in results] == [0, 2, 4]
+        assert [f.index for f in results] == [0, 1, 2]
+        snap = stats.snapshot()
+        assert snap["capture"]["count"] == 3
+        assert snap["capture_to_inference"]["count"] == 3
+
+    def test_worker_survives_stage_error(self):
+        stats = LatencyStats()
+        in_q, out_q = DropQueue(maxsize=4), DropQueue(maxsize=4)
+
+        def flaky(frame):
+            if frame.index == 0:
+                raise RuntimeError("boom")
+            frame.result = "ok"
+
+        worker = StageWorker("inference", flaky, in_q, out_q, stats)
+        worker.start()
+        in_q.put(Frame(index=0, timestamp=0.0, image=None))
+        in_q.put(Frame(index=1, timestamp=0.0, image=None))
+        frame = out_q.get(timeout=1.0)
+        worker.stop()
+        worker.join(timeout=1.0)
+        assert frame.index == 1 and frame.result == "ok"
+
+    def test_pool_buffers_are_reused_once_released(self):
+        stats = LatencyStats()
+        pool = FramePool(2)
+        capture_q = DropQueue(maxsize=1, drop=False)
+        seen = []
+
+        def inspect(frame):
+            seen.append((id(frame.image), int(frame.image[0, 0, 0])))
+
+        cap = CaptureThread(_BufferCapture(20), capture_q, stats, pool=pool)
+        worker = StageWorker("inference", inspect, capture_q, None, stats)
+        worker.start()
+        cap.start()
+        cap.join(timeout=1.0)
+        worker.join(timeout=1.0)
+
+        # Every frame kept its own content until released, from <= 3 buffers.
+        assert [v for _, v in seen] == list(range(20))
+        assert len({i for i, _ in seen}) <= 3
+        assert pool.allocations <= 3
+
+    def test_evicted_frames_return_to_pool(self):
+        pool = FramePool(4)
+        q = DropQueue(maxsize=1, on_drop=release_frame)
+        first = np.empty(1)
+        q.put(Frame(index=0, timestamp=0.0, image=first, pool=pool))
+        q.put(Frame(index=1, timestamp=0.0, image=np.empty(1), pool=pool))
+        assert pool.acquire() is first
@@ -0,0 +1,123 @@
+"""Incremental State Farm preparation (training/prepare_statefarm.py)."""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from training import prepare_statefarm
+from training.prepare_statefarm import load_manifest, prepare
+
+
+@pytest.fixture
+def src(tmp_path):
+    """c0 / c1 / c2 folders of tiny images, plus entries that must be ignored."""
+    root = tmp_path / "imgs"
+    for cls, n in (("c0", 5), ("c1", 3), ("c2", 2)):
+        (root / cls).mkdir(parents=True)
+        for i in range(n):
+            Image.new("RGB", (16, 12), (i * 40, 0, 0)).save(root / cls / f"img_{i}.jpg")
+    (root / "c0" / "notes.txt").write_text("not an image")
+    (root / "extra").mkdir()
+    Image.new("RGB", (16, 12)).save(root / "extra" / "img_0.jpg")
+    return str(root)
+
+
+def _files(dst, split):
+    out = set()
+    for label in ("phone", "no_phone"):
+        out.update(f"{label}/{f}" for f in os.listdir(os.path.join(dst, split, label)))
+    return out
+
+
+def _path(dst, fname):
+    """Destination path of *fname*, in whichever split it was assigned to."""
+    for split in ("train", "val"):
+        if any(e["file"] == fname for e in load_manifest(os.path.join(dst, split)) or []):
+            return os.path.join(dst, split, fname)
+    raise AssertionError(f"{fname} not in any manifest")
+
+
+def _count_places(monkeypatch):
+    placed = []
+    place = prepare_statefarm._place
+
+    def counting(src_file, dst_file, mode, size):
+        placed.append(dst_file)
+        place(src_file, dst_file, mode, size)
+
+    monkeypatch.setattr(prepare_statefarm, "_place", counting)
+    return placed
+
+
+class TestPrepare:
+    def test_first_run_places_and_records_everything(self, src, tmp_path):
+        dst = str(tmp_path / "out")
+        prepare(src, dst, workers=2)
+        train, val = load_manifest(os.path.join(dst, "train")), load_manifest(os.path.join(dst, "val"))
+        assert len(train) + len(val) == 10
+        for split, entries in (("train", train), ("val", val)):
+            # The manifest describes exactly what is on disk.
+            assert {e["file"] for e in entries} == _files(dst, split)
+            for e in entries:
+                cls = e["file"].split("/")[1].split("_")[0]
+                assert e["label"] == ("no_phone" if cls == "c0" else "phone")
+        assert {e["file"] for e in train}.isdisjoint(e["file"] for e in val)
+
+    def test_rerun_places_nothing(self, src, tmp_path, monkeypatch):
+        dst = str(tmp_path / "out")
+        prepare(src, dst, workers=2)
+        before = load_manifest(os.path.join(dst, "train"))
+        placed = _count_places(monkeypatch)
+        prepare(src, dst, workers=2)
+        assert placed == []
+        assert load_manifest(os.path.join(dst, "train")) == before
+
+    def test_changed_or_missing_files_are_replaced(self, src, tmp_path, monkeypatch):
+        dst = str(tmp_path / "out")
+        prepare(src, dst, workers=2)
+        # One source file changes, one placed file disappears.
+        Image.new("RGB", (32, 24), (1, 2, 3)).save(os.path.join(src, "c1", "img_0.jpg"))
+        os.remove(_path(dst, "no_phone/c0_img_0.jpg"))
+
+        placed = _count_places(monkeypatch)
+        prepare(src, dst, workers=2)
+        assert sorted(placed) == sorted([_path(dst, "phone/c1_img_0.jpg"), _path(dst, "no_phone/c0_img_0.jpg")])
+        assert os.path.exists(_path(dst, "no_phone/c0_img_0.jpg"))
+
+    def test_mode_change_replaces_everything(self, src, tmp_path, monkeypatch):
+        dst = str(tmp_path / "out")
+        prepare(src, dst, workers=2)
+        placed = _count_places(monkeypatch)
+        prepare(src, dst, mode="resize", size=8, workers=2)
+        assert len(placed) == 10
+        entries = load_manifest(os.path.join(dst, "train"))
+        assert {e["mode"] for e in entries} == {"resize"}
+        with Image.open(os.path.join(dst, "train", entries[0]["file"])) as img:
+            assert min(img.size) == 8
+
+    def test_split_change_removes_stale_files(self, src, tmp_path):
+        dst = str(tmp_path / "out")
+        prepare(src, dst, val_ratio=0.2, workers=2)
+        prepare(src, dst, val_ratio=0.5, workers=2)
+        for split in ("train", "val"):
+            assert {e["file"] for e in load_manifest(os.path.join(dst, split))} == _files(dst, split)
+        assert len(_files(dst, "train")) + len(_files(dst, "val")) == 10
+
+    def test_resize_requires_size(self, src, tmp_path):
+        with pytest.raises(ValueError):
+            prepare(src, str(tmp_path / "out"), mode="resize")
+
+    def test_dataset_reads_manifest(self, src, tmp_path):
+        pytest.importorskip("torch")
+        pytest.importorskip("torchvision")
+        from training.dataset import scan_samples
+
+        dst = str(tmp_path / "out")
+        prepare(src, dst, workers=2)
+        split_dir = os.path.join(dst, "train")
+        samples = scan_samples(split_dir)
+        entries = load_manifest(split_dir)
+        assert [os.path.relpath(p, split_dir).replace(os.sep, "/") for p, _ in samples] == [e["file"] for e in entries]
+        assert np.array_equal([label for _, label in samples], [e["label"] == "phone" for e in entries])
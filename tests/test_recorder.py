@@ -0,0 +1,71 @@
+"""Tests for the landmark session recorder (temporary directories only)."""
+
+import json
+import os
+
+import numpy as np
+
+from safedrive.recorder import SessionRecorder, load_session
+
+
+def _frame(seed):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0.3, 0.7, (478, 3)).astype(np.float32),
+            [rng.uniform(0.3, 0.7, (21, 3)).astype(np.float32) for _ in range(seed % 4)])
+
+
+class TestSessionRecorder:
+    def test_round_trip_across_chunks(self, tmp_path):
+        frames = [_frame(i) for i in range(25)]
+        with SessionRecorder(str(tmp_path), 480, 640, chunk_frames=10, max_hands=2) as rec:
+            for i, (face, hands) in enumerate(frames):
+                rec.record(i / 30.0, None if i == 3 else face, hands, "WARNING" if i % 2 else "NORMAL")
+        chunks = sorted(f for f in os.listdir(rec.session_dir) if f.endswith(".npz"))
+        assert chunks == ["chunk-00000.npz", "chunk-00001.npz", "chunk-00002.npz"]
+
+        session = load_session(rec.session_dir)
+        assert session["meta"]["image_width"] == 640
+        assert session["face"].shape == (25, 478, 3)
+        assert session["hands"].shape == (25, 2, 21, 3)
+        np.testing.assert_allclose(session["timestamp"], np.arange(25) / 30.0)
+        assert session["level"].tolist() == [2 if i % 2 else 1 for i in range(25)]
+        for i, (face, hands) in enumerate(frames):
+            if i == 3:
+                assert np.isnan(session["face"][i]).all()
+            else:
+                np.testing.assert_array_equal(session["face"][i], face)
+            for slot in range(2):
+                if slot < len(hands):
+                    np.testing.assert_array_equal(session["hands"][i, slot], hands[slot])
+                else:
+                    assert np.isnan(session["hands"][i, slot]).all()
+        assert rec.recorded == 25 and rec.dropped == 0
+
+    def test_no_face_level(self, tmp_path):
+        with SessionRecorder(str(tmp_path), chunk_frames=4) as rec:
+            rec.record(0.0, None, [], None)
+        assert load_session(rec.session_dir)["level"].tolist() == [0]
+
+    def test_meta_written_on_start(self, tmp_path):
+        rec = SessionRecorder(str(tmp_path), 720, 1280, chunk_frames=8, max_hands=1).start()
+        rec.close()
+        with open(os.path.join(rec.session_dir, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        assert meta["image_height"] == 720 and meta["max_hands"] == 1
+        assert load_session(rec.session_dir)["face"].shape == (0, 478, 3)
+
+    def test_drops_when_writer_is_behind(self, tmp_path):
+        rec = SessionRecorder(str(tmp_path), chunk_frames=2, max_pending=0)
+        rec._full.put = lambda chunk: None  # writer never gets the chunk back
+        rec.start()
+        face, hands = _frame(0)
+        for i in range(5):
+            rec.record(float(i), face, hands, "NORMAL")
+        assert rec.recorded == 2 and rec.dropped == 3
+        del rec._full.put
+        rec.close()
+
+    def test_record_outside_session_is_dropped(self, tmp_path):
+        rec = SessionRecorder(str(tmp_path))
+        rec.record(0.0, None, [], None)
+        assert rec.dropped == 1
@@ -0,0 +1,124 @@
+"""Tests for the landmark replay engine and the threshold grid search."""
+
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.detectors import fake_inputs
+from safedrive.config import DetectionConfig
+from safedrive.constants import LEFT_EYE_BOTTOM, LEFT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_TOP
+from safedrive.journal import LEVELS
+from safedrive.recorder import SessionRecorder, load_session
+from safedrive.replay import (
+    episodes, evaluate, grid_search, load_labels, match_events, parse_grid, replay,
+)
+from safedrive.session import DriverState, extract_features
+
+FPS = 10
+DANGER = LEVELS.index("DANGER")
+
+
+def _faces():
+    _, _, open_face, _ = fake_inputs()
+    closed = open_face.copy()
+    closed[LEFT_EYE_BOTTOM, 1] = closed[LEFT_EYE_TOP, 1] + 0.01
+    closed[RIGHT_EYE_BOTTOM, 1] = closed[RIGHT_EYE_TOP, 1] + 0.01
+    return open_face, closed
+
+
+def _record(directory, closed_spans, seconds=60, labels=None):
+    """Record *seconds* of frames with the eyes closed during *closed_spans*."""
+    open_face, closed = _faces()
+    with SessionRecorder(str(directory), 480, 640, chunk_frames=seconds * FPS) as rec:
+        for i in range(seconds * FPS):
+            t = i / FPS
+            shut = any(start <= t < end for start, end in closed_spans)
+            face = None if 5.0 <= t < 6.0 else (closed if shut else open_face)
+            rec.record(t, face, [], None)
+    if labels is not None:
+        with open(f"{rec.session_dir}/labels.json", "w", encoding="utf-8") as fh:
+            json.dump({"events": [{"start": s, "end": e, "label": "drowsy"} for s, e in labels]}, fh)
+    return rec.session_dir
+
+
+@pytest.fixture
+def det():
+    return DetectionConfig(eyes_closed_time_threshold=5.0)
+
+
+class TestReplay:
+    def test_matches_sequential_detectors(self, tmp_path, det):
+        session = load_session(_record(tmp_path, [(10, 20), (30, 32)]))
+        result = replay(session, det)
+
+        state = DriverState(det)
+        expected = []
+        for t, face in zip(session["timestamp"], session["face"]):
+            face = None if np.isnan(face[0, 0]) else face
+            features = extract_features(face, [], 480, 640, det)
+            expected.append(LEVELS.index(state.update(features, float(t))))
+        np.testing.assert_array_equal(result["level"], expected)
+        assert (result["level"] == 0).sum() == FPS  # the one second without a face
+
+    def test_danger_after_long_eye_closure(self, tmp_path, det):
+        session = load_session(_record(tmp_path, [(10, 20)]))
+        result = replay(session, det)
+        runs = episodes(result["level"] >= DANGER, result["timestamp"])
+        assert runs.shape == (1, 2)
+        # eyes_closed_time > 0.8 * 5 s after the closure starts at 10 s
+        assert runs[0, 0] == pytest.approx(14.1)
+        assert runs[0, 1] == pytest.approx(19.9)
+
+
+class TestEpisodes:
+    def test_runs(self):
+        ts = np.arange(8, dtype=float)
+        mask = np.array([0, 1, 1, 0, 0, 1, 0, 1], dtype=bool)
+        np.testing.assert_array_equal(episodes(mask, ts), [[1, 2], [5, 5], [7, 7]])
+
+    def test_empty(self):
+        assert episodes(np.zeros(3, dtype=bool), np.arange(3.0)).shape == (0, 2)
+
+    def test_match_events_with_slack(self):
+        alerts = np.array([[10.0, 12.0], [30.0, 31.0], [50.0, 51.0]])
+        labels = np.array([[11.0, 15.0], [32.5, 40.0], [70.0, 80.0]])
+        assert match_events(alerts, labels) == (1, 1)
+        assert match_events(alerts, labels, slack=2.0) == (2, 2)
+
+
+class TestEvaluate:
+    def test_precision_recall(self, tmp_path, det):
+        path = _record(tmp_path, [(10, 20), (40, 50)], labels=[(12, 20), (25, 30)])
+        metrics = evaluate([(load_session(path), load_labels(path))], det)
+        assert metrics["alerts"] == 2
+        assert metrics["labels"] == 2
+        assert metrics["precision"] == pytest.approx(0.5)
+        assert metrics["recall"] == pytest.approx(0.5)
+        assert metrics["f1"] == pytest.approx(0.5)
+
+    def test_unlabelled_session(self, tmp_path, det):
+        path = _record(tmp_path, [(10, 20)])
+        assert load_labels(path) is None
+        metrics = evaluate([(load_session(path), None)], det)
+        assert metrics["alerts"] == 1
+        assert np.isnan(metrics["precision"]) and np.isnan(metrics["f1"])
+
+
+class TestGridSearch:
+    def test_parse_grid(self):
+        grid = parse_grid(["eye_closed_threshold=0.01,0.02", "eyes_closed_time_threshold=1:3:0.5"])
+        assert grid["eye_closed_threshold"] == [0.01, 0.02]
+        assert grid["eyes_closed_time_threshold"] == [1.0, 1.5, 2.0, 2.5, 3.0]
+
+    def test_parse_grid_rejects_unknown_field(self):
+        with pytest.raises(ValueError):
+            parse_grid(["not_a_threshold=1"])
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_sweep(self, tmp_path, det, workers):
+        path = _record(tmp_path, [(10, 20)], labels=[(12, 20)])
+        rows = grid_search([path], det, {"eyes_closed_time_threshold": [5.0, 30.0]}, workers=workers)
+        assert [r["eyes_closed_time_threshold"] for r in rows] == [5.0, 30.0]
+        assert rows[0]["alerts"] == 1 and rows[0]["recall"] == 1.0
+        assert rows[1]["alerts"] == 0 and rows[1]["recall"] == 0.0
@@ -0,0 +1,131 @@
+"""Tests for face-ROI cropping and downscaled inference adapters."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from tests.conftest import make_landmark
+from safedrive.roi import DownscaledSolution, FaceRoiTracker, RoiFaceMesh, downscale, remap_landmarks
+
+
+def _face_result(points):
+    if points is None:
+        return SimpleNamespace(multi_face_landmarks=None)
+    lm = [make_landmark(x, y, z) for x, y, z in points]
+    return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=lm)])
+
+
+class _ScriptedModel:
+    """Return pre-scripted results and remember input shapes."""
+
+    def __init__(self, results):
+        self._results = list(results)
+        self.shapes = []
+        self.closed = False
+
+    def process(self, rgb):
+        self.shapes.append(rgb.shape)
+        return self._results.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+class TestDownscale:
+    def test_keeps_small_frames(self):
+        img = np.zeros((480, 640, 3), np.uint8)
+        assert downscale(img, 0) is img
+        assert downscale(img, 800) is img
+
+    def test_resizes_keeping_aspect(self):
+        img = np.zeros((1080, 1920, 3), np.uint8)
+        assert downscale(img, 640).shape == (360, 640, 3)
+
+
+class TestFaceRoiTracker:
+    def test_no_box_until_update(self):
+        tracker = FaceRoiTracker()
+        assert tracker.box(640, 480) is None
+        assert tracker.tracking is False
+
+    def test_square_box_around_face(self):
+        tracker = FaceRoiTracker(margin=0.0, min_size=1)
+        tracker.update([make_landmark(0.4, 0.4), make_landmark(0.6, 0.6)])
+        x0, y0, x1, y1 = tracker.box(1000, 1000)
+        assert (x0, y0, x1, y1) == (400, 400, 600, 600)
+
+    def test_box_shifted_inside_frame_stays_square(self):
+        tracker = FaceRoiTracker(margin=0.5, min_size=1)
+        tracker.update([make_landmark(0.0, 0.0), make_landmark(0.2, 0.2)])
+        x0, y0, x1, y1 = tracker.box(100, 100)
+        assert x0 == 0 and y0 == 0
+        assert x1 - x0 == y1 - y0 == 40
+
+    def test_box_larger_than_frame_uses_short_side(self):
+        tracker = FaceRoiTracker(margin=1.0, min_size=1)
+        tracker.update([make_landmark(0.7, 0.1), make_landmark(0.95, 0.9)])
+        x0, y0, x1, y1 = tracker.box(640, 480)
+        assert x1 - x0 == y1 - y0 == 480
+        assert x1 <= 640 and y0 == 0
+
+    def test_lost_tracking(self):
+        tracker = FaceRoiTracker()
+        tracker.update([make_landmark(0.4, 0.4), make_landmark(0.6, 0.6)])
+        tracker.update(None)
+        assert tracker.box(640, 480) is None
+
+
+class TestRemap:
+    def test_crop_to_frame(self):
+        lm = [make_landmark(0.5, 0.5, 0.1), make_landmark(0.0, 1.0, 0.0)]
+        remap_landmarks(lm, (100, 50, 300, 250), 400, 500)
+        assert (lm[0].x, lm[0].y) == pytest.approx((0.5, 0.3))
+        assert lm[0].z == pytest.approx(0.05)
+        assert (lm[1].x, lm[1].y) == pytest.approx((0.25, 0.5))
+
+
+class TestRoiFaceMesh:
+    def test_full_search_then_roi(self):
+        face = [(0.4, 0.4, 0.0), (0.6, 0.6, 0.0)]
+        crop_face = [(0.5, 0.5, 0.0), (0.5, 0.5, 0.0)]
+        model = _ScriptedModel([_face_result(crop_face)])
+        search = _ScriptedModel([_face_result(face)])
+        roi = RoiFaceMesh(model, search, roi_size=128, margin=0.0)
+        img = np.zeros((1000, 1000, 3), np.uint8)
+
+        roi.process(img)
+        res = roi.process(img)
+
+        assert search.shapes == [(1000, 1000, 3)]
+        assert model.shapes == [(128, 128, 3)]
+        assert roi.full_searches == 1 and roi.roi_hits == 1
+        p = res.multi_face_landmarks[0].landmark[0]
+        assert (p.x, p.y) == pytest.approx((0.5, 0.5))
+
+    def test_falls_back_when_tracking_lost(self):
+        face = [(0.4, 0.4, 0.0), (0.6, 0.6, 0.0)]
+        model = _ScriptedModel([_face_result(None)])
+        search = _ScriptedModel([_face_result(face), _face_result(face)])
+        roi = RoiFaceMesh(model, search, roi_size=64, search_width=500)
+        img = np.zeros((1000, 1000, 3), np.uint8)
+
+        roi.process(img)
+        res = roi.process(img)
+
+        assert model.shapes == [(64, 64, 3)]
+        assert search.shapes == [(500, 500, 3), (500, 500, 3)]
+        assert res.multi_face_landmarks is not None
+        assert roi.full_searches == 2
+
+    def test_close(self):
+        model, search = _ScriptedModel([]), _ScriptedModel([])
+        RoiFaceMesh(model, search).close()
+        assert model.closed and search.closed
+
+
+class TestDownscaledSolution:
+    def test_feeds_resized_frame(self):
+        model = _ScriptedModel([None])
+        DownscaledSolution(model, 320).process(np.zeros((480, 640, 3), np.uint8))
+        assert model.shapes == [(240, 320, 3)]
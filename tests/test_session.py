@@ -0,0 +1,96 @@
+from safedrive.config import DetectionConfig
+from safedrive.landmarks import face_to_array, landmarks_to_array
+from safedrive.session import DriverState, FrameFeatures, determine_alert_level, extract_features
+
+NEUTRAL = {"turned": False, "tilted": False, "direction_h": None, "direction_v": None}
+TURNED = {"turned": True, "tilted": False, "direction_h": "gauche", "direction_v": None}
+
+
+class TestDetermineAlertLevel:
+    def test_normal(self, detection_config):
+        assert determine_alert_level(0, False, NEUTRAL, 0, detection_config) == "NORMAL"
+
+    def test_warning(self, detection_config):
+        assert determine_alert_level(0, True, NEUTRAL, 0, detection_config) == "WARNING"
+        assert determine_alert_level(0, False, TURNED, 0, detection_config) == "WARNING"
+
+    def test_danger(self, detection_config):
+        assert determine_alert_level(17.0, False, NEUTRAL, 0, detection_config) == "WARNING"
+        assert determine_alert_level(17.0, True, NEUTRAL, 0, detection_config) == "DANGER"
+        assert determine_alert_level(0, False, NEUTRAL, 6.0, detection_config) == "DANGER"
+
+
+def _f(eyes_closed=False, is_yawning=False, phone=False, face=True, head_state=NEUTRAL):
+    return FrameFeatures(face, eyes_closed, is_yawning, head_state if face else None, phone)
+
+
+class TestDriverState:
+    def test_slots(self, detection_config):
+        state = DriverState(detection_config)
+        assert not hasattr(state, "__dict__")
+        assert not hasattr(FrameFeatures(), "__dict__")
+
+    def test_no_face_returns_none(self, detection_config):
+        state = DriverState(detection_config)
+        assert state.update(_f(face=False), 0.0) is None
+
+    def test_eye_closure_timer(self, detection_config):
+        state = DriverState(detection_config)
+        for t in range(0, 18):
+            level = state.update(_f(eyes_closed=True), float(t))
+        assert state.eyes_closed_time == 17.0
+        assert level == "WARNING"
+        assert state.update(_f(), 18.0) == "NORMAL"
+        assert state.eyes_closed_time == 0.0
+
+    def test_lost_face_resets_eye_timer(self, detection_config):
+        state = DriverState(detection_config)
+        state.update(_f(eyes_closed=True), 0.0)
+        state.update(_f(face=False), 5.0)
+        state.update(_f(eyes_closed=True), 6.0)
+        assert state.eyes_closed_time == 0.0
+
+    def test_yawn_counting(self, detection_config):
+        state = DriverState(detection_config)
+        state.update(_f(), 0.0)
+        for t in (4.0, 5.0, 8.0):
+            state.update(_f(is_yawning=True), t)
+        assert state.yawn_count == 2
+        assert state.consecutive_yawns == 2
+        state.update(_f(), 30.0)
+        assert state.consecutive_yawns == 0
+        assert state.yawn_count == 2
+
+    def test_phone_timer_from_zero_timestamp(self):
+        state = DriverState(DetectionConfig())
+        state.update(_f(phone=True), 0.0)
+        level = state.update(_f(phone=True), 6.0)
+        assert state.phone_time == 6.0
+        assert level == "DANGER"
+        state.update(_f(), 7.0)
+        assert state.phone_time == 0.0
+
+    def test_reset(self, detection_config):
+        state = DriverState(detection_config)
+        state.update(_f(phone=True, eyes_closed=True), 0.0)
+        state.update(_f(phone=True, eyes_closed=True), 5.0)
+        state.reset()
+        assert state.phone_start is None and state.eyes_closed_start is None
+        assert state.yawn_count == 0
+
+
+class TestExtractFeatures:
+    def test_no_face(self, detection_config, fake_hand_landmarks):
+        hand = landmarks_to_array(fake_hand_landmarks.landmark)
+        features = extract_features(None, [hand], 480, 640, detection_config)
+        assert features.face is False
+        assert features.phone is True  # all tips at the same point
+
+    def test_face_features(self, fake_landmarks, detection_config):
+        features = extract_features(face_to_array(fake_landmarks), [], 480, 640, detection_config)
+        assert features.face is True
+        # All landmarks at the same point: zero eyelid distance, degenerate mouth
+        assert features.eyes_closed is True
+        assert features.is_yawning is False
+        assert features.head_state["turned"] is False
+        assert features.phone is False
@@ -0,0 +1,79 @@
+"""Tests for offline frame sources (no camera)."""
+
+import cv2
+import numpy as np
+import pytest
+
+from safedrive.pipeline import EOS, CaptureThread, DropQueue, LatencyStats
+from safedrive.sources import ImageDirSource, VideoFileSource, open_source
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for i in range(3):
+        cv2.imwrite(str(tmp_path / f"frame_{i:03d}.png"), np.full((24, 32, 3), i, np.uint8))
+    (tmp_path / "notes.txt").write_text("ignored")
+    return tmp_path
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (32, 24))
+    if not writer.isOpened():
+        pytest.skip("No video encoder available")
+    for i in range(5):
+        writer.write(np.full((24, 32, 3), i * 40, np.uint8))
+    writer.release()
+    return path
+
+
+class TestImageDirSource:
+    def test_reads_sorted_images_with_fps_timestamps(self, image_dir):
+        src = ImageDirSource(str(image_dir), fps=10.0)
+        assert src.isOpened()
+        values, stamps = [], []
+        while True:
+            ok, img = src.read()
+            if not ok:
+                break
+            values.append(int(img[0, 0, 0]))
+            stamps.append(src.timestamp())
+        assert values == [0, 1, 2]
+        assert stamps == pytest.approx([0.0, 0.1, 0.2])
+
+    def test_empty_dir_not_opened(self, tmp_path):
+        assert ImageDirSource(str(tmp_path)).isOpened() is False
+
+    def test_open_source_picks_dir(self, image_dir):
+        assert isinstance(open_source(str(image_dir)), ImageDirSource)
+
+
+class TestVideoFileSource:
+    def test_pts_timestamps(self, video_file):
+        src = VideoFileSource(video_file)
+        stamps = []
+        while src.read()[0]:
+            stamps.append(src.timestamp())
+        src.release()
+        assert len(stamps) == 5
+        assert stamps == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4], abs=1e-3)
+        assert VideoFileSource.live is False
+
+
+class TestReplayCapture:
+    def test_every_frame_delivered_then_eos(self, image_dir):
+        src = ImageDirSource(str(image_dir), fps=10.0)
+        q = DropQueue(maxsize=1, drop=False)
+        cap = CaptureThread(src, q, LatencyStats(), clock=src.timestamp)
+        cap.start()
+        items = []
+        while True:
+            item = q.get(timeout=1.0)
+            items.append(item)
+            if item is EOS or item is None:
+                break
+        cap.join(timeout=1.0)
+        assert items[-1] is EOS
+        assert [f.timestamp for f in items[:-1]] == pytest.approx([0.0, 0.1, 0.2])
+        assert q.dropped == 0
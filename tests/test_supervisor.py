@@ -0,0 +1,117 @@
+"""Tests for the multi-stream supervisor (fake sources and models)."""
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from tests.conftest import make_landmark
+from safedrive.config import DetectionConfig
+from safedrive.supervisor import CameraStream, StreamSupervisor
+
+
+class _FakeSource:
+    live = True
+
+    def __init__(self, n, delay=0.005):
+        self._n = n
+        self._i = -1
+        self._delay = delay
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        time.sleep(self._delay)
+        if self._i + 1 >= self._n:
+            return False, None
+        self._i += 1
+        if image is None:
+            image = np.empty((8, 8, 3), np.uint8)
+        image[:] = 0
+        return True, image
+
+    def timestamp(self):
+        return self._i * 0.033
+
+    def release(self):
+        pass
+
+
+class _FakeFaceMesh:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.closed = False
+
+    def process(self, rgb):
+        time.sleep(self.delay)
+        lm = [make_landmark(0.5, 0.5) for _ in range(478)]
+        return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=lm)])
+
+    def close(self):
+        self.closed = True
+
+
+class _NoHands:
+    def process(self, rgb):
+        return SimpleNamespace(multi_hand_landmarks=None)
+
+    def close(self):
+        pass
+
+
+def _stream(name, n_frames, alerts, infer_delay=0.0, live=True):
+    source = _FakeSource(n_frames)
+    source.live = live
+    return CameraStream(
+        name, source, DetectionConfig(),
+        on_alert=lambda stream, level: alerts.append((stream, level)),
+        face_factory=lambda: _FakeFaceMesh(infer_delay), hands_factory=_NoHands,
+    )
+
+
+class TestStreamSupervisor:
+    def test_processes_all_streams(self):
+        alerts = []
+        streams = [_stream("a", 20, alerts), _stream("b", 20, alerts)]
+        sup = StreamSupervisor(streams, workers=2, max_fps=1000.0)
+        sup.start()
+        sup.run(report_interval=0, duration=5.0)
+        sup.close()
+
+        assert all(s.processed > 0 for s in streams)
+        # Neutral fake face -> tilted/turned checks fail -> level reported once per stream
+        assert {name for name, _ in alerts} == {"a", "b"}
+        assert all(s.face_mesh.closed for s in streams)
+        report = sup.report_lines()
+        assert len(report) == 2 and "FPS" in report[0]
+
+    def test_degrades_fps_when_saturated(self):
+        alerts = []
+        streams = [_stream(n, 200, alerts, infer_delay=0.03) for n in ("a", "b", "c")]
+        sup = StreamSupervisor(streams, workers=1, max_fps=100.0, min_fps=1.0)
+        sup.start()
+        sup.run(report_interval=0, duration=0.5)
+        sup.stop()
+        sup.close()
+
+        assert any(s.interval > sup.min_interval for s in streams)
+        assert all(s.interval <= sup.max_interval for s in streams)
+        assert all(s.processed > 0 for s in streams)
+
+    def test_file_streams_process_every_frame(self):
+        streams = [_stream("file", 15, [], infer_delay=0.01, live=False)]
+        sup = StreamSupervisor(streams, workers=1, max_fps=1000.0)
+        sup.start()
+        sup.run(report_interval=0, duration=5.0)
+        sup.close()
+
+        assert streams[0].processed == 15
+        assert streams[0].frames.dropped == 0
+
+    def test_throughput_keys(self):
+        streams = [_stream("a", 3, [])]
+        sup = StreamSupervisor(streams, workers=1)
+        stats = sup.throughput()
+        assert set(stats["a"]) == {"fps", "target_fps", "processed", "dropped", "latency_ms"}
+        sup.close()
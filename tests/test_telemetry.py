@@ -0,0 +1,108 @@
+"""Tests for the telemetry aggregates and exporter (local only)."""
+
+import json
+import socket
+import urllib.request
+
+from safedrive.pipeline import LatencyStats
+from safedrive.telemetry import Histogram, Telemetry, TelemetryExporter
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestHistogram:
+    def test_quantiles_within_bucket_width(self):
+        hist = Histogram()
+        for ms in range(1, 101):
+            hist.record(ms / 1000.0)
+        s = hist.summary()
+        assert s["count"] == 100
+        assert abs(s["mean_ms"] - 50.5) < 1e-6
+        assert 50.0 <= s["p50_ms"] <= 50.0 * 1.2
+        assert 95.0 <= s["p95_ms"] <= 100.0
+        assert s["p99_ms"] <= s["max_ms"] == 100.0
+
+    def test_empty(self):
+        assert Histogram().summary()["p50_ms"] == 0.0
+
+
+class TestTelemetry:
+    def test_stage_timer_and_counters(self):
+        t = Telemetry()
+        with t.stage("cvtColor"):
+            pass
+        t.incr("frames")
+        t.incr("frames")
+        t.incr("alert_transitions", level="DANGER")
+        snap = t.snapshot()
+        assert snap["stages"]["cvtColor"]["count"] == 1
+        assert snap["counters"] == {"alert_transitions{level=DANGER}": 1, "frames": 2}
+
+    def test_disabled_is_noop(self):
+        t = Telemetry(enabled=False)
+        with t.stage("cvtColor"):
+            pass
+        t.incr("frames")
+        t.record("inference", 0.01)
+        snap = t.snapshot()
+        assert snap["stages"] == {} and snap["counters"] == {}
+
+    def test_collectors_run_before_snapshot(self):
+        t = Telemetry()
+        t.add_collector(lambda tel: tel.set("frames_dropped", 7, queue="capture"))
+        assert t.snapshot()["counters"] == {"frames_dropped{queue=capture}": 7}
+
+    def test_prometheus_text(self):
+        t = Telemetry()
+        t.incr("frames", 3)
+        t.incr("alert_transitions", level="WARNING")
+        t.record("face_mesh", 0.004)
+        text = t.prometheus_text()
+        assert "# TYPE safedrive_frames_total counter\nsafedrive_frames_total 3\n" in text
+        assert 'safedrive_alert_transitions_total{level="WARNING"} 1' in text
+        assert 'safedrive_stage_seconds{stage="face_mesh",quantile="0.99"}' in text
+        assert 'safedrive_stage_seconds_count{stage="face_mesh"} 1' in text
+
+    def test_prometheus_large_counters_exact(self):
+        t = Telemetry()
+        t.incr("frames", 10 ** 7)
+        t.incr("frames")
+        t.set("fps", 29.97)
+        text = t.prometheus_text()
+        assert "safedrive_frames_total 10000001\n" in text
+        assert "29.97" in text and "e+" not in text
+
+    def test_latency_stats_forwarding(self):
+        t = Telemetry()
+        LatencyStats(t).record("render", 0.002)
+        assert t.snapshot()["stages"]["render"]["count"] == 1
+
+
+class TestTelemetryExporter:
+    def test_flushes_json_lines(self, tmp_path):
+        t = Telemetry()
+        t.incr("frames")
+        path = tmp_path / "telemetry" / "t.jsonl"
+        exporter = TelemetryExporter(t, str(path), interval=60.0)
+        exporter.start()
+        exporter.stop()  # final flush
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["counters"]["frames"] == 1
+
+    def test_serves_metrics(self):
+        t = Telemetry()
+        t.incr("frames")
+        exporter = TelemetryExporter(t, port=_free_port())
+        exporter.start()
+        try:
+            url = f"http://127.0.0.1:{exporter.port}/metrics"
+            with urllib.request.urlopen(url, timeout=2.0) as resp:
+                body = resp.read().decode()
+        finally:
+            exporter.stop()
+        assert "safedrive_frames_total 1" in body
@@ -0,0 +1,86 @@
+"""Streaming metrics and cached-feature batching of training/train.py, against naive references."""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("tqdm")
+from training.train import StreamingMetrics, _head_batches  # noqa: E402
+
+
+def _naive_loss_f1(logits, labels):
+    """Mean BCE-with-logits and F1 at probability 0.5, one sample at a time."""
+    losses = []
+    tp = fp = fn = 0
+    for x, y in zip(logits.tolist(), labels.tolist()):
+        p = 1.0 / (1.0 + np.exp(-x))
+        losses.append(-(y * np.log(p) + (1 - y) * np.log(1 - p)))
+        pred = p >= 0.5
+        tp += pred and y == 1
+        fp += pred and y == 0
+        fn += (not pred) and y == 1
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0
+    return float(np.mean(losses)), f1
+
+
+class TestStreamingMetrics:
+    def test_matches_naive_reference(self):
+        rng = np.random.default_rng(0)
+        criterion = torch.nn.BCEWithLogitsLoss()
+        metrics = StreamingMetrics(torch.device("cpu"))
+        all_logits, all_labels = [], []
+        # Uneven batch sizes: the loss must be weighted by batch size.
+        for n in (7, 16, 1, 9):
+            logits = rng.normal(0.0, 2.0, n).astype(np.float32)
+            labels = rng.integers(0, 2, n).astype(np.float32)
+            x, y = torch.from_numpy(logits), torch.from_numpy(labels)
+            metrics.update(x, y, criterion(x, y))
+            all_logits.append(logits)
+            all_labels.append(labels)
+
+        loss, f1 = metrics.compute()
+        ref_loss, ref_f1 = _naive_loss_f1(np.concatenate(all_logits), np.concatenate(all_labels))
+        assert metrics.seen == 33
+        assert loss == pytest.approx(ref_loss, rel=1e-5)
+        assert f1 == pytest.approx(ref_f1)
+
+    def test_empty(self):
+        assert StreamingMetrics(torch.device("cpu")).compute() == (0.0, 0.0)
+
+
+def _features(views, n, dim=4):
+    """float16 features whose first column encodes ``(view, index)``."""
+    feats = np.zeros((views, n, dim), dtype=np.float16)
+    feats[..., 0] = np.arange(views)[:, None] * 100 + np.arange(n)[None, :]
+    return feats
+
+
+class TestHeadBatches:
+    def test_sequential_single_view(self):
+        feats = _features(1, 10)
+        labels = (np.arange(10) % 2).astype(np.float32)
+        batches = list(_head_batches(feats, labels, 4, False, np.random.default_rng(0)))
+        assert [len(y) for _, y in batches] == [4, 4, 2]
+        x = torch.cat([b[0] for b in batches]).numpy()
+        assert x.dtype == np.float32
+        np.testing.assert_array_equal(x, feats[0].astype(np.float32))
+        np.testing.assert_array_equal(torch.cat([b[1] for b in batches]).numpy(), labels)
+
+    def test_shuffled_views_match_naive_reference(self):
+        views, n, batch_size = 3, 11, 4
+        feats = _features(views, n)
+        labels = np.arange(n, dtype=np.float32)
+        batches = list(_head_batches(feats, labels, batch_size, True, np.random.default_rng(7)))
+
+        # Same draws, one sample at a time.
+        rng = np.random.default_rng(7)
+        order = rng.permutation(n)
+        view_of = rng.integers(0, views, size=n)
+        for b, (x, y) in enumerate(batches):
+            idx = sorted(order[b * batch_size:(b + 1) * batch_size])
+            assert y.tolist() == [float(i) for i in idx]
+            for row, i in enumerate(idx):
+                np.testing.assert_array_equal(x[row].numpy(), feats[view_of[i], i].astype(np.float32))
+        # Every sample seen exactly once per epoch.
+        assert sorted(torch.cat([y for _, y in batches]).tolist()) == list(map(float, range(n)))
@@ -1,17 +1,31 @@
 """Phone detection dataset with augmentations.
 
+With ``cache_dir`` the images are decoded and resized once into a
+memory-mapped ``uint8`` array (``images.npy``, plus ``shapes.npy``,
+``labels.npy`` and an ``index.json`` listing the source files).  The whole
+frame is kept, short side resized like the validation ``Resize``, so
+cached and uncached training see the same pixels.  Later epochs, runs and every
+DataLoader worker read the same pages instead of decoding JPEGs; only the
+random augmentations run per access.
+
 Usage::
 
     from training.dataset import PhoneDataset
     ds = PhoneDataset("dataset/phone/train", train=True)
+    ds = PhoneDataset("dataset/phone/train", train=True, cache_dir="cache/phone/train")
 """
 
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 from PIL import Image
 from torch.utils.data import Dataset
 from torchvision import transforms
 
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+
 
 def get_train_transforms(input_size: int = 224) -> transforms.Compose:
     return transforms.Compose([
@@ -33,6 +47,104 @@ def get_val_transforms(input_size: int = 224) -> transforms.Compose:
     ])
 
 
+def get_cached_val_transforms(input_size: int = 224) -> transforms.Compose:
+    """Validation transforms for cached images (already resized to ``cache_size``)."""
+    return transforms.Compose([
+        transforms.CenterCrop(input_size),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+    ])
+
+
+def cache_size(input_size: int = 224) -> int:
+    """Short side of the cached images: the validation resize (``input_size * 1.14``)."""
+    return int(input_size * 1.14)
+
+
+#: Bumped when the cache layout changes, so older caches are rebuilt.
+CACHE_VERSION = 2
+
+
+def scan_samples(root: str):
+    """Return ``[(path, label)]`` for ``root/no_phone`` (0) and ``root/phone`` (1).
+
+    Uses ``root/manifest.json`` (written by ``prepare_statefarm``) when
+    present instead of listing the folders.
+    """
+    manifest = os.path.join(root, "manifest.json")
+    if os.path.exists(manifest):
+        with open(manifest, "r", encoding="utf-8") as fh:
+            entries = json.load(fh)["entries"]
+        return [(os.path.join(root, e["file"]), int(e["label"] == "phone")) for e in entries]
+
+    samples = []
+    for label_name, label_id in [("no_phone", 0), ("phone", 1)]:
+        folder = os.path.join(root, label_name)
+        if not os.path.isdir(folder):
+            continue
+        for fname in sorted(os.listdir(folder)):
+            if fname.lower().endswith(IMAGE_EXTENSIONS):
+                samples.append((os.path.join(folder, fname), label_id))
+    return samples
+
+
+def _resized_size(width: int, height: int, size: int):
+    """``(width, height)`` with the short side set to *size*, as ``transforms.Resize(size)``."""
+    if width <= height:
+        return size, int(size * height / width)
+    return int(size * width / height), size
+
+
+def _load_resized(path: str, size: int) -> np.ndarray:
+    """Decode *path* and resize its short side to *size* (whole frame kept)."""
+    img = Image.open(path).convert("RGB")
+    return np.asarray(img.resize(_resized_size(*img.size, size), Image.BILINEAR), dtype=np.uint8)
+
+
+def build_cache(samples, cache_dir: str, size: int, workers: int = 8) -> None:
+    """Decode *samples* once into ``cache_dir`` (skipped if already up to date)."""
+    index_path = os.path.join(cache_dir, "index.json")
+    entries = [[path, label, os.path.getsize(path)] for path, label in samples]
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as fh:
+            index = json.load(fh)
+        if (index.get("version") == CACHE_VERSION and index.get("size") == size
+                and index.get("samples") == entries):
+            return
+
+    # Frames may differ in size / orientation: each one is stored top-left
+    # in a canvas fitting the largest, with its real (height, width) in
+    # shapes.npy.  Image.open only reads the header here.
+    shapes = np.empty((len(samples), 2), dtype=np.int32)
+    for i, (path, _) in enumerate(samples):
+        with Image.open(path) as img:
+            w, h = _resized_size(*img.size, size)
+        shapes[i] = h, w
+    height, width = (int(v) for v in shapes.max(axis=0)) if len(samples) else (size, size)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, "images.tmp.npy")
+    images = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8,
+                                       shape=(len(samples), height, width, 3))
+
+    def fill(i):
+        h, w = shapes[i]
+        images[i, :h, :w] = _load_resized(samples[i][0], size)
+
+    # PIL releases the GIL while decoding/resizing.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fill, range(len(samples))))
+    images.flush()
+    del images
+    os.replace(tmp_path, os.path.join(cache_dir, "images.npy"))
+    np.save(os.path.join(cache_dir, "shapes.npy"), shapes)
+    np.save(os.path.join(cache_dir, "labels.npy"), np.array([label for _, label in samples], dtype=np.int64))
+    # The index is written last: a cache without it is rebuilt.
+    with open(index_path, "w", encoding="utf-8") as fh:
+        json.dump({"version": CACHE_VERSION, "size": size, "samples": entries}, fh)
+    print(f"Cached {len(samples)} images (short side {size}) in {cache_dir}")
+
+
 class PhoneDataset(Dataset):
     """Binary dataset: ``phone/`` (label 1) vs ``no_phone/`` (label 0).
 
@@ -44,26 +156,46 @@ class PhoneDataset(Dataset):
         If ``True`` use training augmentations, otherwise validation transforms.
     input_size : int
         Spatial dimension for the model input.
+    cache_dir : str | None
+        If set, read pre-decoded images from a memory-mapped cache in this
+        directory (built on first use).  Cached images are whole frames
+        with their short side at ``cache_size(input_size)`` px, so the
+        augmentations see the same field of view as without the cache.
     """
 
-    def __init__(self, root: str, train: bool = True, input_size: int = 224):
+    def __init__(self, root: str, train: bool = True, input_size: int = 224, cache_dir: str | None = None):
         self.root = root
-        self.transform = get_train_transforms(input_size) if train else get_val_transforms(input_size)
-        self.samples = []
+        self.samples = scan_samples(root)
+        self.cache_dir = cache_dir
+        self._images = None
+        self._shapes = None
 
-        for label_name, label_id in [("no_phone", 0), ("phone", 1)]:
-            folder = os.path.join(root, label_name)
-            if not os.path.isdir(folder):
-                continue
-            for fname in os.listdir(folder):
-                if fname.lower().endswith((".jpg", ".png", ".jpeg")):
-                    self.samples.append((os.path.join(folder, fname), label_id))
+        if cache_dir is not None:
+            if self.samples:
+                build_cache(self.samples, cache_dir, cache_size(input_size))
+            self.transform = get_train_transforms(input_size) if train else get_cached_val_transforms(input_size)
+        else:
+            self.transform = get_train_transforms(input_size) if train else get_val_transforms(input_size)
 
     def __len__(self):
         return len(self.samples)
 
+    def __getstate__(self):
+        # Each DataLoader worker maps the cache itself; the pages are shared.
+        state = self.__dict__.copy()
+        state["_images"] = None
+        state["_shapes"] = None
+        return state
+
     def __getitem__(self, idx):
         path, label = self.samples[idx]
-        img = Image.open(path).convert("RGB")
+        if self.cache_dir is None:
+            img = Image.open(path).convert("RGB")
+        else:
+            if self._images is None:
+                self._images = np.load(os.path.join(self.cache_dir, "images.npy"), mmap_mode="r")
+                self._shapes = np.load(os.path.join(self.cache_dir, "shapes.npy"))
+            h, w = self._shapes[idx]
+            img = Image.fromarray(np.ascontiguousarray(self._images[idx, :h, :w]))
         img = self.transform(img)
         return img, label
@@ -1,19 +1,28 @@
 """Evaluate a trained phone detector checkpoint.
 
 Reports accuracy, precision, recall, F1, and sweeps confidence thresholds.
+Predictions stay in tensors and the metrics of every threshold are
+computed in one vectorized pass.
+
+With ``--latency`` it also benchmarks end-to-end inference latency
+(p50/p95/p99) of the PyTorch checkpoint and, with ``--onnx``, of the
+exported model at batch sizes 1/8/32, against the live loop's per-frame
+budget.
 
 Usage::
 
     python -m training.evaluate --checkpoint models/best.pth --data-dir dataset/phone/val
+    python -m training.evaluate --checkpoint models/best.pth --data-dir dataset/phone/val \\
+        --latency --onnx models/phone_detector.int8.onnx
 """
 
 import argparse
-import os
+import time
 
 import torch
 import numpy as np
 from torch.utils.data import DataLoader
-from sklearn.metrics import classification_report, precision_recall_curve
+from sklearn.metrics import classification_report
 
 from training.dataset import PhoneDataset
 from training.model import build_model
@@ -21,30 +30,128 @@ from training.model import build_model
 
 @torch.no_grad()
 def collect_predictions(model, loader, device):
+    """Return ``(probs, labels)`` tensors for the whole *loader* dataset."""
     model.eval()
-    all_probs, all_labels = [], []
+    n = len(loader.dataset)
+    all_probs = torch.empty(n, dtype=torch.float32)
+    all_labels = torch.empty(n, dtype=torch.int64)
 
+    row = 0
     for images, labels in loader:
         images = images.to(device)
         logits = model(images).squeeze(1)
-        probs = torch.sigmoid(logits)
-        all_probs.extend(probs.cpu().tolist())
-        all_labels.extend(labels.tolist())
-
-    return np.array(all_probs), np.array(all_labels)
+        k = labels.shape[0]
+        all_probs[row:row + k] = torch.sigmoid(logits).float().cpu()
+        all_labels[row:row + k] = labels
+        row += k
+
+    return all_probs, all_labels
+
+
+def threshold_metrics(probs, labels, thresholds):
+    """Metrics for every threshold in one pass (``pred = prob >= t``).
+
+    Returns a dict of ``(T,)`` tensors: ``threshold``, ``precision``,
+    ``recall``, ``f1`` and ``accuracy``.
+    """
+    probs = torch.as_tensor(probs, dtype=torch.float64)
+    labels = torch.as_tensor(labels).bool()
+    thresholds = torch.as_tensor(thresholds, dtype=torch.float64)
+    pos = torch.sort(probs[labels]).values
+    neg = torch.sort(probs[~labels]).values
+    # Scores >= t per class, via binary search on the sorted scores.
+    tp = (pos.numel() - torch.searchsorted(pos, thresholds, right=False)).double()
+    fp = (neg.numel() - torch.searchsorted(neg, thresholds, right=False)).double()
+    fn = pos.numel() - tp
+    tn = neg.numel() - fp
+
+    precision = torch.where(tp + fp > 0, tp / (tp + fp), torch.ones_like(tp))
+    recall = tp / max(pos.numel(), 1)
+    f1 = torch.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), torch.zeros_like(tp))
+    return {
+        "threshold": thresholds,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "accuracy": (tp + tn) / max(probs.numel(), 1),
+    }
 
 
 def sweep_thresholds(probs, labels):
-    """Find the threshold that maximises F1."""
-    precision, recall, thresholds = precision_recall_curve(labels, probs)
-    # F1 = 2 * P * R / (P + R)
-    f1_scores = np.where(
-        (precision + recall) > 0,
-        2 * precision * recall / (precision + recall),
-        0.0,
-    )
-    best_idx = np.argmax(f1_scores[:-1])  # last entry has no threshold
-    return thresholds[best_idx], f1_scores[best_idx]
+    """Find the threshold that maximises F1 (candidates: every distinct score)."""
+    candidates = torch.unique(torch.as_tensor(probs, dtype=torch.float64))
+    metrics = threshold_metrics(probs, labels, candidates)
+    best_idx = int(torch.argmax(metrics["f1"]))
+    return float(candidates[best_idx]), float(metrics["f1"][best_idx])
+
+
+def summarize(probs, labels):
+    """Return accuracy/F1 at 0.5 and the best-F1 threshold as a dict."""
+    at_05 = threshold_metrics(probs, labels, [0.5])
+    best_thresh, best_f1 = sweep_thresholds(probs, labels)
+    return {
+        "accuracy": float(at_05["accuracy"][0]),
+        "f1": float(at_05["f1"][0]),
+        "best_threshold": best_thresh,
+        "best_f1": best_f1,
+    }
+
+
+def _percentiles(times):
+    ms = np.asarray(times) * 1000.0
+    return {f"p{q}": float(np.percentile(ms, q)) for q in (50, 95, 99)}
+
+
+def benchmark_latency(run, input_size=224, batch_sizes=(1, 8, 32), iters=100, warmup=10):
+    """Time ``run(batch)`` on random float32 NCHW batches.
+
+    Returns ``{batch_size: {"p50", "p95", "p99"}}`` in milliseconds per call.
+    """
+    results = {}
+    for bs in batch_sizes:
+        batch = np.random.default_rng(bs).standard_normal((bs, 3, input_size, input_size), dtype=np.float32)
+        for _ in range(warmup):
+            run(batch)
+        times = np.empty(iters)
+        for i in range(iters):
+            t0 = time.perf_counter()
+            run(batch)
+            times[i] = time.perf_counter() - t0
+        results[bs] = _percentiles(times)
+    return results
+
+
+def torch_runner(model, device):
+    model.eval()
+
+    @torch.inference_mode()
+    def run(batch):
+        out = model(torch.from_numpy(batch).to(device))
+        return out.cpu()
+
+    return run
+
+
+def onnx_runner(model_path, threads=1):
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = threads
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    sess = ort.InferenceSession(model_path, opts, providers=["CPUExecutionProvider"])
+    name = sess.get_inputs()[0].name
+    return lambda batch: sess.run(None, {name: batch})
+
+
+def print_latency_table(rows, budget_ms):
+    """Print ``{label: benchmark_latency(...)}`` with a budget verdict at batch 1."""
+    print(f"\n=== Inference latency (ms per call, budget {budget_ms:.1f} ms/frame) ===")
+    print(f"{'model':<10} {'batch':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'p95/img':>8}  fits")
+    for label, by_batch in rows.items():
+        for bs, p in by_batch.items():
+            fits = ("yes" if p["p95"] <= budget_ms else "NO") if bs == 1 else ""
+            print(f"{label:<10} {bs:>5} {p['p50']:>8.2f} {p['p95']:>8.2f} {p['p99']:>8.2f} "
+                  f"{p['p95'] / bs:>8.2f}  {fits}")
 
 
 def main():
@@ -53,6 +160,12 @@ def main():
     parser.add_argument("--data-dir", required=True, help="Validation directory (with phone/ and no_phone/)")
     parser.add_argument("--batch-size", type=int, default=32)
     parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--latency", action="store_true", help="Benchmark inference latency at batch 1/8/32")
+    parser.add_argument("--onnx", default=None, help="Exported ONNX model to benchmark alongside the checkpoint")
+    parser.add_argument("--threads", type=int, default=1, help="CPU threads for the latency benchmark")
+    parser.add_argument("--latency-iters", type=int, default=100)
+    parser.add_argument("--budget-ms", type=float, default=10.0,
+                        help="Per-frame budget of the live loop (phone_model.latency_budget_ms)")
     args = parser.parse_args()
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -66,17 +179,26 @@ def main():
     probs, labels = collect_predictions(model, val_loader, device)
 
     # Classification report at default 0.5 threshold
-    preds_05 = (probs >= 0.5).astype(int)
+    preds_05 = (probs >= 0.5).long()
     print("=== Classification Report (threshold=0.5) ===")
-    print(classification_report(labels, preds_05, target_names=["no_phone", "phone"]))
+    print(classification_report(labels.numpy(), preds_05.numpy(), target_names=["no_phone", "phone"]))
 
     # Threshold sweep
     best_thresh, best_f1 = sweep_thresholds(probs, labels)
     print(f"Best threshold: {best_thresh:.3f} (F1={best_f1:.4f})")
 
-    preds_best = (probs >= best_thresh).astype(int)
+    preds_best = (probs >= best_thresh).long()
     print(f"\n=== Classification Report (threshold={best_thresh:.3f}) ===")
-    print(classification_report(labels, preds_best, target_names=["no_phone", "phone"]))
+    print(classification_report(labels.numpy(), preds_best.numpy(), target_names=["no_phone", "phone"]))
+
+    if args.latency:
+        if device.type == "cpu":
+            torch.set_num_threads(args.threads)
+        rows = {"pytorch": benchmark_latency(torch_runner(model, device), iters=args.latency_iters)}
+        if args.onnx:
+            rows["onnx"] = benchmark_latency(
+                onnx_runner(args.onnx, args.threads), iters=args.latency_iters)
+        print_latency_table(rows, args.budget_ms)
 
 
 if __name__ == "__main__":
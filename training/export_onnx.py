@@ -1,15 +1,29 @@
 """Export a trained PyTorch checkpoint to ONNX format.
 
+Optionally produces an INT8 model for the in-vehicle CPUs:
+
+1. the FP32 graph is optimised offline by ONNX Runtime and saved;
+2. it is statically quantized to INT8 (QDQ, per-channel weights),
+   calibrated on a sample of ``PhoneDataset`` validation images;
+3. FP32 and INT8 are compared on the validation set (latency at batch 1
+   and the :func:`training.evaluate.summarize` metrics).
+
 Usage::
 
     python -m training.export_onnx --checkpoint models/best.pth --output models/phone_detector.onnx
+    python -m training.export_onnx --checkpoint models/best.pth --quantize --data-dir dataset/phone/val
 """
 
 import argparse
+import os
+import random
+import time
 
+import numpy as np
 import torch
 import onnx
 
+from training.dataset import PhoneDataset
 from training.model import build_model
 
 
@@ -36,14 +50,161 @@ def export(checkpoint_path: str, output_path: str, input_size: int = 224):
     print(f"ONNX model exported and validated: {output_path}")
 
 
+def _with_suffix(path: str, suffix: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}{suffix}{ext}"
+
+
+def optimize(model_path: str, output_path: str) -> str:
+    """Save the ONNX Runtime-optimised graph of *model_path* to *output_path*.
+
+    Uses the "extended" level: the fused graph stays portable across CPUs
+    (the "all" level may bake in hardware-specific layouts).
+    """
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    opts.optimized_model_filepath = output_path
+    ort.InferenceSession(model_path, opts, providers=["CPUExecutionProvider"])
+    print(f"Optimized graph saved: {output_path}")
+    return output_path
+
+
+class _CalibrationReader:
+    """Feed validation images one by one to the INT8 calibrator.
+
+    Implements the ``CalibrationDataReader`` protocol (``get_next`` /
+    ``rewind``) of ``onnxruntime.quantization``.
+    """
+
+    def __init__(self, dataset: PhoneDataset, indices, input_name: str = "input"):
+        self.dataset = dataset
+        self.indices = list(indices)
+        self.input_name = input_name
+        self._pos = 0
+
+    def get_next(self):
+        if self._pos >= len(self.indices):
+            return None
+        image, _ = self.dataset[self.indices[self._pos]]
+        self._pos += 1
+        return {self.input_name: image.unsqueeze(0).numpy()}
+
+    def rewind(self):
+        self._pos = 0
+
+
+def quantize(model_path: str, output_path: str, data_dir: str, num_samples: int = 200,
+             input_size: int = 224, seed: int = 0) -> str:
+    """Statically quantize *model_path* to INT8, calibrated on *data_dir*."""
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    dataset = PhoneDataset(data_dir, train=False, input_size=input_size)
+    if len(dataset) == 0:
+        raise ValueError(f"No calibration images in {data_dir}")
+    indices = random.Random(seed).sample(range(len(dataset)), min(num_samples, len(dataset)))
+
+    # Shape inference + ORT-level fusions before inserting Q/DQ nodes.
+    prepared = _with_suffix(output_path, ".prep")
+    quant_pre_process(model_path, prepared)
+    quantize_static(
+        prepared,
+        output_path,
+        _CalibrationReader(dataset, indices),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+    os.remove(prepared)
+    print(f"INT8 model saved: {output_path} (calibrated on {len(indices)} images)")
+    return output_path
+
+
+def _session(model_path: str, threads: int):
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = threads
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(model_path, opts, providers=["CPUExecutionProvider"])
+
+
+def benchmark(model_path: str, images: np.ndarray, labels: np.ndarray, threads: int = 1, warmup: int = 5):
+    """Return validation metrics and batch-1 latency (ms) for *model_path*."""
+    from training.evaluate import summarize
+
+    sess = _session(model_path, threads)
+    name = sess.get_inputs()[0].name
+    for i in range(min(warmup, len(images))):
+        sess.run(None, {name: images[i:i + 1]})
+
+    logits = np.empty(len(images), dtype=np.float32)
+    times = np.empty(len(images))
+    for i in range(len(images)):
+        t0 = time.perf_counter()
+        logits[i] = sess.run(None, {name: images[i:i + 1]})[0].reshape(-1)[0]
+        times[i] = time.perf_counter() - t0
+
+    metrics = summarize(1.0 / (1.0 + np.exp(-logits)), labels)
+    metrics["p50_ms"] = float(np.percentile(times, 50) * 1000.0)
+    metrics["p95_ms"] = float(np.percentile(times, 95) * 1000.0)
+    metrics["size_mb"] = os.path.getsize(model_path) / 1e6
+    return metrics
+
+
+def compare(models, data_dir: str, input_size: int = 224, threads: int = 1, max_images: int = 512):
+    """Print a latency/accuracy table for ``{label: model_path}``.
+
+    Uses *max_images* images spread evenly over the dataset (``0`` = all;
+    each costs ``3 * input_size ** 2`` floats, ~600 KB at 224).
+    """
+    dataset = PhoneDataset(data_dir, train=False, input_size=input_size)
+    n = len(dataset) if max_images <= 0 else min(max_images, len(dataset))
+    # Evenly spaced, not the first n: the files are grouped by class.
+    indices = np.linspace(0, len(dataset) - 1, n).round().astype(np.int64)
+    images = np.empty((n, 3, input_size, input_size), dtype=np.float32)
+    labels = np.empty(n, dtype=np.int64)
+    for i, idx in enumerate(indices):
+        image, labels[i] = dataset[int(idx)]
+        images[i] = image.numpy()
+
+    rows = {label: benchmark(path, images, labels, threads) for label, path in models.items()}
+    print(f"\n=== FP32 vs INT8 ({n} images, {threads} thread(s), batch 1) ===")
+    print(f"{'model':<8} {'size MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'acc':>7} {'F1':>7} {'best F1':>8} {'thresh':>7}")
+    for label, m in rows.items():
+        print(f"{label:<8} {m['size_mb']:>8.2f} {m['p50_ms']:>8.2f} {m['p95_ms']:>8.2f} "
+              f"{m['accuracy']:>7.4f} {m['f1']:>7.4f} {m['best_f1']:>8.4f} {m['best_threshold']:>7.3f}")
+    return rows
+
+
 def main():
     parser = argparse.ArgumentParser(description="Export phone detector to ONNX")
     parser.add_argument("--checkpoint", required=True, help="Path to .pth checkpoint")
     parser.add_argument("--output", default="models/phone_detector.onnx", help="Output ONNX path")
     parser.add_argument("--input-size", type=int, default=224)
+    parser.add_argument("--quantize", action="store_true",
+                        help="Also write an ORT-optimized FP32 graph and a static INT8 model")
+    parser.add_argument("--data-dir", default=None, help="Validation directory for calibration and comparison")
+    parser.add_argument("--calib-samples", type=int, default=200, help="Calibration images")
+    parser.add_argument("--threads", type=int, default=1, help="ONNX Runtime threads for the comparison")
+    parser.add_argument("--compare-images", type=int, default=512,
+                        help="Images used for the comparison (0 = all; ~600 KB each in RAM)")
     args = parser.parse_args()
+    if args.quantize and not args.data_dir:
+        parser.error("--quantize requires --data-dir")
     export(args.checkpoint, args.output, args.input_size)
 
+    if args.quantize:
+        optimized = optimize(args.output, _with_suffix(args.output, ".opt"))
+        int8 = quantize(args.output, _with_suffix(args.output, ".int8"), args.data_dir,
+                        args.calib_samples, args.input_size)
+        compare({"fp32": optimized, "int8": int8}, args.data_dir, args.input_size,
+                args.threads, args.compare_images)
+
 
 if __name__ == "__main__":
     main()
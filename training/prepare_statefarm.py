@@ -17,27 +17,117 @@ Expected input layout (Kaggle download)::
 Output layout::
 
     <dst>/
-        phone/      # c1 + c2 + c3 + c4
-        no_phone/   # c0 + c5 + c6 + c7 + c8 + c9
-
-A random 80/20 train/val split is also created.
+        train/
+            manifest.json
+            phone/      # c1 + c2 + c3 + c4
+            no_phone/   # c0 + c5 + c6 + c7 + c8 + c9
+        val/
+            ...
+
+A seeded 80/20 train/val split is created.  Files are placed by a thread
+pool either as copies, hard links, symbolic links or resized JPEGs (so the
+4 GB of originals need not be duplicated).  Each split gets a
+``manifest.json`` recording every file with its label and source stats:
+``PhoneDataset`` loads it instead of scanning the folders, and a rerun
+only processes files whose source, mode or destination changed.
 
 Usage::
 
     python -m training.prepare_statefarm --src path/to/imgs/train --dst dataset/phone
+    python -m training.prepare_statefarm --src path/to/imgs/train --dst dataset/phone --mode hardlink
+    python -m training.prepare_statefarm --src path/to/imgs/train --dst dataset/phone --mode resize --size 320
 """
 
 import argparse
+import json
 import os
 import random
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PIL import Image
 
 
 PHONE_CLASSES = {"c1", "c2", "c3", "c4"}
 NO_PHONE_CLASSES = {"c0", "c5", "c6", "c7", "c8", "c9"}
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+MODES = ("copy", "hardlink", "symlink", "resize")
+MANIFEST = "manifest.json"
+
+
+def load_manifest(split_dir: str):
+    """Return the manifest entries of *split_dir*, or ``None`` if absent."""
+    path = os.path.join(split_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)["entries"]
+
+
+def _write_manifest(split_dir: str, entries) -> None:
+    tmp = os.path.join(split_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"entries": sorted(entries, key=lambda e: e["file"])}, fh)
+    os.replace(tmp, os.path.join(split_dir, MANIFEST))
+
+
+def _place(src_file: str, dst_file: str, mode: str, size: int) -> None:
+    if os.path.lexists(dst_file):
+        os.remove(dst_file)
+    if mode == "hardlink":
+        try:
+            os.link(src_file, dst_file)
+            return
+        except OSError:  # other filesystem: fall back to a copy
+            pass
+    elif mode == "symlink":
+        os.symlink(os.path.abspath(src_file), dst_file)
+        return
+    elif mode == "resize":
+        img = Image.open(src_file).convert("RGB")
+        w, h = img.size
+        scale = size / min(w, h)
+        if scale < 1.0:
+            img = img.resize((round(w * scale), round(h * scale)), Image.BILINEAR)
+        img.save(dst_file, quality=95)
+        return
+    shutil.copy2(src_file, dst_file)
 
 
-def prepare(src: str, dst: str, val_ratio: float = 0.2, seed: int = 42):
+def _plan(src: str, val_ratio: float, seed: int):
+    """Return the ``(split, entry)`` list for every source image."""
+    rng = random.Random(seed)
+    plan = []
+    for cls in sorted(os.scandir(src), key=lambda e: e.name):
+        if not cls.is_dir():
+            continue
+        if cls.name in PHONE_CLASSES:
+            label = "phone"
+        elif cls.name in NO_PHONE_CLASSES:
+            label = "no_phone"
+        else:
+            continue
+
+        images = sorted(
+            (e for e in os.scandir(cls.path) if e.name.lower().endswith(IMAGE_EXTENSIONS)),
+            key=lambda e: e.name,
+        )
+        rng.shuffle(images)
+        split_idx = int(len(images) * (1 - val_ratio))
+        for i, entry in enumerate(images):
+            st = entry.stat()
+            plan.append(("train" if i < split_idx else "val", {
+                "file": f"{label}/{cls.name}_{entry.name}",
+                "label": label,
+                "src": os.path.abspath(entry.path),
+                "src_size": st.st_size,
+                "src_mtime": st.st_mtime,
+            }))
+    return plan
+
+
+def prepare(src: str, dst: str, val_ratio: float = 0.2, seed: int = 42,
+            mode: str = "copy", size: int = 0, workers: int = 8):
     if not os.path.isdir(src):
         print(
             f"Erreur : le dossier source n'existe pas : {src}\n\n"
@@ -47,38 +137,56 @@ def prepare(src: str, dst: str, val_ratio: float = 0.2, seed: int = 42):
             "  python -m training.prepare_statefarm --src C:\\Users\\vous\\Downloads\\imgs\\train --dst dataset/phone"
         )
         return
-
-    random.seed(seed)
+    if mode == "resize" and size <= 0:
+        raise ValueError("--mode resize requires --size")
 
     for split in ("train", "val"):
         for label in ("phone", "no_phone"):
             os.makedirs(os.path.join(dst, split, label), exist_ok=True)
 
-    for cls_dir in sorted(os.listdir(src)):
-        cls_path = os.path.join(src, cls_dir)
-        if not os.path.isdir(cls_path):
-            continue
-
-        if cls_dir in PHONE_CLASSES:
-            label = "phone"
-        elif cls_dir in NO_PHONE_CLASSES:
-            label = "no_phone"
+    # Previous state: entries already placed with the same source and mode.
+    previous = {}
+    for split in ("train", "val"):
+        for e in load_manifest(os.path.join(dst, split)) or []:
+            previous[(split, e["file"])] = e
+
+    done = {"train": {}, "val": {}}
+    todo = []
+    planned = set()
+    for split, entry in _plan(src, val_ratio, seed):
+        entry["mode"], entry["size"] = mode, size
+        planned.add((split, entry["file"]))
+        old = previous.get((split, entry["file"]))
+        if old == entry and os.path.lexists(os.path.join(dst, split, entry["file"])):
+            done[split][entry["file"]] = entry
         else:
-            continue
-
-        images = [f for f in os.listdir(cls_path) if f.lower().endswith((".jpg", ".png", ".jpeg"))]
-        random.shuffle(images)
-        split_idx = int(len(images) * (1 - val_ratio))
-
-        for i, fname in enumerate(images):
-            split = "train" if i < split_idx else "val"
-            src_file = os.path.join(cls_path, fname)
-            dst_file = os.path.join(dst, split, label, f"{cls_dir}_{fname}")
-            shutil.copy2(src_file, dst_file)
+            todo.append((split, entry))
+
+    # Files of a previous run that are no longer planned (e.g. other split).
+    for split, fname in previous.keys() - planned:
+        path = os.path.join(dst, split, fname)
+        if os.path.lexists(path):
+            os.remove(path)
+
+    print(f"{len(todo)} files to place ({sum(len(d) for d in done.values())} up to date, mode={mode})")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_place, entry["src"], os.path.join(dst, split, entry["file"]), mode, size): (split, entry)
+            for split, entry in todo
+        }
+        for i, fut in enumerate(as_completed(futures), 1):
+            split, entry = futures[fut]
+            fut.result()
+            done[split][entry["file"]] = entry
+            # Checkpoint the manifests so an interrupted run resumes here.
+            if i % 1000 == 0:
+                for s in ("train", "val"):
+                    _write_manifest(os.path.join(dst, s), done[s].values())
 
     for split in ("train", "val"):
+        _write_manifest(os.path.join(dst, split), done[split].values())
         for label in ("phone", "no_phone"):
-            count = len(os.listdir(os.path.join(dst, split, label)))
+            count = sum(1 for e in done[split].values() if e["label"] == label)
             print(f"{split}/{label}: {count} images")
 
 
@@ -87,8 +195,13 @@ def main():
     parser.add_argument("--src", required=True, help="Path to Kaggle imgs/train folder")
     parser.add_argument("--dst", default="dataset/phone", help="Output directory")
     parser.add_argument("--val-ratio", type=float, default=0.2, help="Validation split ratio")
+    parser.add_argument("--seed", type=int, default=42, help="Split seed")
+    parser.add_argument("--mode", choices=MODES, default="copy",
+                        help="How files are placed: copy, hardlink, symlink or resize")
+    parser.add_argument("--size", type=int, default=0, help="Short side (px) for --mode resize")
+    parser.add_argument("--workers", type=int, default=8, help="I/O threads")
     args = parser.parse_args()
-    prepare(args.src, args.dst, args.val_ratio)
+    prepare(args.src, args.dst, args.val_ratio, args.seed, args.mode, args.size, args.workers)
 
 
 if __name__ == "__main__":
@@ -3,72 +3,191 @@
 Phase 1: Backbone frozen, train head only (5 epochs, lr=1e-3).
 Phase 2: Last 4 blocks unfrozen, fine-tune (15 epochs, lr=1e-4, cosine).
 
+With ``--feature-cache`` phase 1 runs the frozen backbone only once: the
+pooled 1280-d embeddings of every image (or of ``--feature-views`` fixed
+augmented views) are stored as memory-mapped float16 arrays and the head
+is trained directly on them.
+
+``--bf16`` / ``--channels-last`` enable bfloat16 autocast and the
+channels-last memory format (fast paths on recent Xeon CPUs).  Each epoch
+reports its training throughput in images/s.
+
 Usage::
 
     python -m training.train --data-dir dataset/phone --epochs 20
+    python -m training.train --data-dir dataset/phone --cache-dir cache/phone
+    python -m training.train --data-dir dataset/phone --feature-cache cache/features --feature-views 4
+    python -m training.train --data-dir dataset/phone --bf16 --channels-last
 """
 
 import argparse
+import json
 import os
+import time
 
+import numpy as np
 import torch
 import torch.nn as nn
 from torch.optim import Adam
 from torch.optim.lr_scheduler import CosineAnnealingLR
 from torch.utils.data import DataLoader
-from sklearn.metrics import f1_score
 from tqdm import tqdm
 
 from training.dataset import PhoneDataset
 from training.model import build_model, unfreeze_last_n_blocks
 
 
-def train_one_epoch(model, loader, criterion, optimizer, device):
+class StreamingMetrics:
+    """Loss and F1 accumulated on-device in preallocated tensors.
+
+    Keeps a running loss sum and ``tp/fp/fn`` counts instead of Python
+    lists of predictions, so a batch costs no host synchronisation.
+    """
+
+    def __init__(self, device):
+        self.loss_sum = torch.zeros((), dtype=torch.float64, device=device)
+        self.counts = torch.zeros(3, dtype=torch.int64, device=device)
+        self.seen = 0
+
+    @torch.no_grad()
+    def update(self, logits, labels, loss) -> None:
+        preds = logits.float() >= 0.0  # sigmoid(x) >= 0.5
+        truth = labels >= 0.5
+        self.loss_sum += loss.detach().double() * labels.numel()
+        self.counts[0] += (preds & truth).sum()
+        self.counts[1] += (preds & ~truth).sum()
+        self.counts[2] += (~preds & truth).sum()
+        self.seen += labels.numel()
+
+    def compute(self):
+        """Return ``(mean_loss, f1)``."""
+        tp, fp, fn = self.counts.tolist()
+        denom = 2 * tp + fp + fn
+        return self.loss_sum.item() / max(self.seen, 1), (2 * tp / denom if denom else 0.0)
+
+
+def _to_device(images, device, channels_last: bool):
+    if channels_last:
+        return images.to(device, memory_format=torch.channels_last, non_blocking=True)
+    return images.to(device, non_blocking=True)
+
+
+def train_one_epoch(model, loader, criterion, optimizer, device, bf16=False, channels_last=False):
+    """Return ``(loss, f1, images_per_second)`` for one training epoch."""
     model.train()
-    running_loss = 0.0
-    all_preds, all_labels = [], []
+    metrics = StreamingMetrics(device)
+    t0 = time.perf_counter()
 
     for images, labels in tqdm(loader, desc="Train", leave=False):
-        images = images.to(device)
-        labels = labels.float().to(device)
+        images = _to_device(images, device, channels_last)
+        labels = labels.float().to(device, non_blocking=True)
 
         optimizer.zero_grad()
-        logits = model(images).squeeze(1)
-        loss = criterion(logits, labels)
+        with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=bf16):
+            logits = model(images).squeeze(1)
+            loss = criterion(logits.float(), labels)
         loss.backward()
         optimizer.step()
+        metrics.update(logits, labels, loss)
 
-        running_loss += loss.item() * images.size(0)
-        preds = (torch.sigmoid(logits) >= 0.5).long()
-        all_preds.extend(preds.cpu().tolist())
-        all_labels.extend(labels.long().cpu().tolist())
-
-    epoch_loss = running_loss / len(loader.dataset)
-    epoch_f1 = f1_score(all_labels, all_preds)
-    return epoch_loss, epoch_f1
+    epoch_loss, epoch_f1 = metrics.compute()
+    return epoch_loss, epoch_f1, metrics.seen / (time.perf_counter() - t0)
 
 
 @torch.no_grad()
-def evaluate(model, loader, criterion, device):
+def evaluate(model, loader, criterion, device, bf16=False, channels_last=False):
+    """Return ``(loss, f1, images_per_second)`` on *loader*."""
     model.eval()
-    running_loss = 0.0
-    all_preds, all_labels = [], []
+    metrics = StreamingMetrics(device)
+    t0 = time.perf_counter()
 
     for images, labels in tqdm(loader, desc="Val", leave=False):
-        images = images.to(device)
-        labels = labels.float().to(device)
+        images = _to_device(images, device, channels_last)
+        labels = labels.float().to(device, non_blocking=True)
+
+        with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=bf16):
+            logits = model(images).squeeze(1)
+            loss = criterion(logits.float(), labels)
+        metrics.update(logits, labels, loss)
+
+    epoch_loss, epoch_f1 = metrics.compute()
+    return epoch_loss, epoch_f1, metrics.seen / (time.perf_counter() - t0)
 
-        logits = model(images).squeeze(1)
-        loss = criterion(logits, labels)
 
-        running_loss += loss.item() * images.size(0)
-        preds = (torch.sigmoid(logits) >= 0.5).long()
-        all_preds.extend(preds.cpu().tolist())
-        all_labels.extend(labels.long().cpu().tolist())
+def embed(model, images):
+    """Pooled backbone embeddings, as computed inside ``MobileNetV2.forward``."""
+    x = model.features(images)
+    x = nn.functional.adaptive_avg_pool2d(x, 1)
+    return torch.flatten(x, 1)
 
-    epoch_loss = running_loss / len(loader.dataset)
-    epoch_f1 = f1_score(all_labels, all_preds)
-    return epoch_loss, epoch_f1
+
+@torch.no_grad()
+def build_feature_cache(model, dataset, path, views, batch_size, num_workers, device):
+    """Return ``(features, labels)``: float16 ``(views, N, D)`` memmap and ``(N,)`` labels.
+
+    The cache at *path* (``.npy`` + ``.json``) is reused when it was built
+    from the same samples, transforms and number of views.
+    """
+    meta_path = path + ".json"
+    meta = {"samples": [p for p, _ in dataset.samples], "transform": repr(dataset.transform), "views": views}
+    labels = np.array([label for _, label in dataset.samples], dtype=np.float32)
+    if os.path.exists(meta_path) and os.path.exists(path + ".npy"):
+        with open(meta_path, "r", encoding="utf-8") as fh:
+            if json.load(fh) == meta:
+                return np.load(path + ".npy", mmap_mode="r"), labels
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    model.eval()
+    # Allocated up front so an empty split still yields a (views, 0, D) cache
+    # (the head epochs then simply see no batch).
+    feats = np.lib.format.open_memmap(path + ".tmp.npy", mode="w+", dtype=np.float16,
+                                      shape=(views, len(dataset), model.last_channel))
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=False, num_workers=num_workers)
+    for view in range(views):
+        row = 0
+        for images, _ in tqdm(loader, desc=f"Features {os.path.basename(path)} [{view + 1}/{views}]", leave=False):
+            out = embed(model, images.to(device)).cpu().numpy()
+            feats[view, row:row + len(out)] = out
+            row += len(out)
+    feats.flush()
+    del feats
+    os.replace(path + ".tmp.npy", path + ".npy")
+    with open(meta_path, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    return np.load(path + ".npy", mmap_mode="r"), labels
+
+
+def _head_batches(feats, labels, batch_size, shuffle, rng):
+    """Yield float32 ``(features, labels)`` tensors, one random view per image."""
+    views, n = feats.shape[:2]
+    order = rng.permutation(n) if shuffle else np.arange(n)
+    view_of = rng.integers(0, views, size=n) if views > 1 else np.zeros(n, dtype=np.int64)
+    for start in range(0, n, batch_size):
+        idx = np.sort(order[start:start + batch_size])
+        x = np.asarray(feats[view_of[idx], idx], dtype=np.float32)
+        yield torch.from_numpy(x), torch.from_numpy(labels[idx])
+
+
+def run_head_epoch(head, feats, labels, criterion, device, batch_size, rng, optimizer=None):
+    """Train (with *optimizer*) or evaluate *head* on cached features.
+
+    Returns ``(loss, f1, samples_per_second)`` like :func:`train_one_epoch`.
+    """
+    head.train(optimizer is not None)
+    metrics = StreamingMetrics(device)
+    t0 = time.perf_counter()
+    with torch.set_grad_enabled(optimizer is not None):
+        for x, y in _head_batches(feats, labels, batch_size, optimizer is not None, rng):
+            x, y = x.to(device), y.to(device)
+            logits = head(x).squeeze(1)
+            loss = criterion(logits, y)
+            if optimizer is not None:
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+            metrics.update(logits, y, loss)
+    loss, f1 = metrics.compute()
+    return loss, f1, metrics.seen / (time.perf_counter() - t0)
 
 
 def main():
@@ -81,13 +200,23 @@ def main():
     parser.add_argument("--lr2", type=float, default=1e-4, help="LR for phase 2")
     parser.add_argument("--output", default="models/best.pth", help="Output checkpoint path")
     parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--cache-dir", default=None,
+                        help="Decode images once into memory-mapped arrays under this directory")
+    parser.add_argument("--feature-cache", default=None,
+                        help="Phase 1 on cached frozen-backbone embeddings stored under this directory")
+    parser.add_argument("--bf16", action="store_true", help="bfloat16 autocast (CPU or GPU)")
+    parser.add_argument("--channels-last", action="store_true", help="channels_last memory format")
+    parser.add_argument("--feature-views", type=int, default=0,
+                        help="Augmented views per training image for the feature cache (0 = one plain view)")
     args = parser.parse_args()
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Using device: {device}")
 
-    train_ds = PhoneDataset(os.path.join(args.data_dir, "train"), train=True)
-    val_ds = PhoneDataset(os.path.join(args.data_dir, "val"), train=False)
+    train_cache = os.path.join(args.cache_dir, "train") if args.cache_dir else None
+    val_cache = os.path.join(args.cache_dir, "val") if args.cache_dir else None
+    train_ds = PhoneDataset(os.path.join(args.data_dir, "train"), train=True, cache_dir=train_cache)
+    val_ds = PhoneDataset(os.path.join(args.data_dir, "val"), train=False, cache_dir=val_cache)
     print(f"Train: {len(train_ds)} | Val: {len(val_ds)}")
 
     if len(train_ds) == 0:
@@ -106,6 +235,9 @@ def main():
     val_loader = DataLoader(val_ds, batch_size=args.batch_size, shuffle=False, num_workers=args.num_workers, pin_memory=True)
 
     model = build_model(freeze_backbone=True).to(device)
+    if args.channels_last:
+        model = model.to(memory_format=torch.channels_last)
+    precision = {"bf16": args.bf16, "channels_last": args.channels_last}
     criterion = nn.BCEWithLogitsLoss()
 
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
@@ -116,10 +248,31 @@ def main():
     phase2_epochs = args.epochs - args.phase1_epochs
 
     print("\n=== Phase 1: Backbone frozen ===")
+    if args.feature_cache:
+        # Embeddings computed once; each epoch only runs the head.
+        if args.feature_views > 0:
+            feat_train_ds, views = train_ds, args.feature_views
+        else:
+            feat_train_ds = PhoneDataset(os.path.join(args.data_dir, "train"), train=False, cache_dir=train_cache)
+            views = 1
+        train_feats, train_labels = build_feature_cache(
+            model, feat_train_ds, os.path.join(args.feature_cache, "train"), views,
+            args.batch_size, args.num_workers, device)
+        val_feats, val_labels = build_feature_cache(
+            model, val_ds, os.path.join(args.feature_cache, "val"), 1,
+            args.batch_size, args.num_workers, device)
+        rng = np.random.default_rng(0)
+
     for epoch in range(1, args.phase1_epochs + 1):
-        train_loss, train_f1 = train_one_epoch(model, train_loader, criterion, optimizer, device)
-        val_loss, val_f1 = evaluate(model, val_loader, criterion, device)
-        print(f"[{epoch}/{args.phase1_epochs}] train_loss={train_loss:.4f} train_f1={train_f1:.4f} | val_loss={val_loss:.4f} val_f1={val_f1:.4f}")
+        if args.feature_cache:
+            train_loss, train_f1, train_ips = run_head_epoch(model.classifier, train_feats, train_labels, criterion,
+                                                             device, args.batch_size, rng, optimizer)
+            val_loss, val_f1, _ = run_head_epoch(model.classifier, val_feats, val_labels, criterion,
+                                                 device, args.batch_size, rng)
+        else:
+            train_loss, train_f1, train_ips = train_one_epoch(model, train_loader, criterion, optimizer, device, **precision)
+            val_loss, val_f1, _ = evaluate(model, val_loader, criterion, device, **precision)
+        print(f"[{epoch}/{args.phase1_epochs}] train_loss={train_loss:.4f} train_f1={train_f1:.4f} | val_loss={val_loss:.4f} val_f1={val_f1:.4f} | {train_ips:.1f} img/s")
         if val_f1 > best_f1:
             best_f1 = val_f1
             torch.save(model.state_dict(), args.output)
@@ -132,10 +285,10 @@ def main():
 
     print(f"\n=== Phase 2: Fine-tuning ({phase2_epochs} epochs) ===")
     for epoch in range(1, phase2_epochs + 1):
-        train_loss, train_f1 = train_one_epoch(model, train_loader, criterion, optimizer, device)
-        val_loss, val_f1 = evaluate(model, val_loader, criterion, device)
+        train_loss, train_f1, train_ips = train_one_epoch(model, train_loader, criterion, optimizer, device, **precision)
+        val_loss, val_f1, _ = evaluate(model, val_loader, criterion, device, **precision)
         scheduler.step()
-        print(f"[{epoch}/{phase2_epochs}] train_loss={train_loss:.4f} train_f1={train_f1:.4f} | val_loss={val_loss:.4f} val_f1={val_f1:.4f}")
+        print(f"[{epoch}/{phase2_epochs}] train_loss={train_loss:.4f} train_f1={train_f1:.4f} | val_loss={val_loss:.4f} val_f1={val_f1:.4f} | {train_ips:.1f} img/s")
         if val_f1 > best_f1:
             best_f1 = val_f1
             torch.save(model.state_dict(), args.output)